@@ -0,0 +1,70 @@
+import re
+import time
+from Engine.Files.british_english import get_converter, load_american_to_british_dict, AMERICAN_TO_BRITISH_PATH
+
+# ─────────────────────────────────────────────
+# Micro-benchmark: python -m Benchmarks.british_english [combine_file] [rounds]
+# ─────────────────────────────────────────────
+def legacy_convert(text: str, mapping: dict) -> str:
+    """The per-call implementation format_combine/format_image_prompts used before (kept for comparison)."""
+    def replace_match(match):
+        us_word = match.group(0)
+        lowercase_us = us_word.lower()
+        if lowercase_us in mapping:
+            british = mapping[lowercase_us]
+            if us_word.isupper():
+                return british.upper()
+            elif us_word[0].isupper():
+                return british.capitalize()
+            else:
+                return british
+        return us_word
+
+    pattern = r'\b(' + '|'.join(re.escape(word) for word in mapping.keys()) + r')\b'
+    return re.sub(pattern, replace_match, text, flags=re.IGNORECASE)
+
+def sample_combine_text(sections: int = 10, sub_sections: int = 10) -> str:
+    paragraph = (
+        "We analyze how organizations prioritize and optimize their behavior; the Center for "
+        "Modeling recognized that color, favor and labor trends are realized across the region. "
+        "ANALYZED figures and Organized programs remain a favorite theme. "
+    )
+    lines = ["Report Title:", "Analyzing Regional Demand", "Executive Summary:", paragraph * 3]
+    for s in range(1, sections + 1):
+        lines += ["", f"Section #: {s}", f"Section Title: Organizing Section {s}", f"Section Summary: {paragraph * 2}"]
+        for sub in range(1, sub_sections + 1):
+            lines += ["", f"Sub-Section #: {s}.{sub}", f"Sub-Section Summary: {paragraph}"]
+    return "\n".join(lines)
+
+def benchmark(text: str = None, rounds: int = 20) -> dict:
+    converter = get_converter()
+    text = text or sample_combine_text()
+    mapping = load_american_to_british_dict(AMERICAN_TO_BRITISH_PATH)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        legacy = legacy_convert(text, mapping)
+    legacy_seconds = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        compiled = converter.convert(text)
+    compiled_seconds = (time.perf_counter() - start) / rounds
+
+    if legacy != compiled:
+        raise AssertionError("Compiled converter output differs from the legacy implementation")
+
+    mb = len(text.encode("utf-8")) / 1e6
+    return {
+        "chars": len(text),
+        "legacy_ms": round(legacy_seconds * 1000, 3),
+        "compiled_ms": round(compiled_seconds * 1000, 3),
+        "legacy_mb_per_s": round(mb / legacy_seconds, 2),
+        "compiled_mb_per_s": round(mb / compiled_seconds, 2),
+        "speedup": round(legacy_seconds / compiled_seconds, 1)
+    }
+
+if __name__ == "__main__":
+    import sys
+    sample = open(sys.argv[1], encoding="utf-8").read() if len(sys.argv) > 1 else None
+    print(benchmark(sample, rounds=int(sys.argv[2]) if len(sys.argv) > 2 else 20))
@@ -0,0 +1,120 @@
+import time
+import numpy as np
+from dataclasses import replace
+from decimal import Decimal, ROUND_HALF_UP
+from Engine.Runtime.structured_output import Prompt1Thinking, ThinkingSection, ThinkingSubSection
+from Engine.Runtime.change_effect import ChangeEffectModel, compute_change_effect, CHANGE_EFFECT_SAMPLES
+
+# ─────────────────────────────────────────────
+# Micro-benchmark: python -m Benchmarks.change_effect [sections] [sub_sections] [samples]
+# ─────────────────────────────────────────────
+def legacy_build_structured_output(prompt_1_thinking: Prompt1Thinking) -> Prompt1Thinking:
+    """
+    The per-value Decimal loop write_change_effect_maths used before, kept as the timing
+    baseline; tests/test_change_effect.py pins the original module's actual output.
+    """
+    def quantize_1dp(value) -> Decimal:
+        return Decimal(value).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+
+    def parse_percent(value: str) -> str:
+        return value.replace('%', '').strip()
+
+    def format_integer_percent(value) -> str:
+        return f"{int(round(Decimal(value)))}%"
+
+    def format_decimal_percent(value) -> str:
+        return f"{quantize_1dp(value)}%"
+
+    sections = []
+    for section in prompt_1_thinking.sections:
+        sub_sections = []
+        sub_section_effects = []
+        try:
+            section_makeup = quantize_1dp(parse_percent(section.makeup))
+        except Exception:
+            section_makeup = Decimal("0.0")
+
+        for sub in section.sub_sections:
+            try:
+                sub_makeup = quantize_1dp(parse_percent(sub.makeup))
+                sub_change = Decimal(int(round(float(parse_percent(sub.change)))))
+                sub_effect = quantize_1dp((sub_makeup / Decimal(100)) * sub_change)
+            except Exception:
+                sub_makeup = Decimal("0.0")
+                sub_change = Decimal("0")
+                sub_effect = Decimal("0.0")
+            sub_sections.append(replace(
+                sub,
+                makeup=format_integer_percent(sub_makeup),
+                change=format_decimal_percent(sub_change),
+                effect=format_decimal_percent(sub_effect)
+            ))
+            sub_section_effects.append(sub_effect)
+
+        section_change = quantize_1dp(sum(sub_section_effects))
+        section_effect = quantize_1dp((section_makeup / Decimal(100)) * section_change)
+        sections.append(replace(
+            section,
+            makeup=format_integer_percent(section_makeup),
+            change=format_decimal_percent(section_change),
+            effect=format_decimal_percent(section_effect),
+            sub_sections=sub_sections
+        ))
+
+    report_change = quantize_1dp(sum(Decimal(parse_percent(section.effect)) for section in sections))
+    return Prompt1Thinking(sections=sections, report_change=format_decimal_percent(report_change))
+
+def sample_thinking(sections: int, sub_sections: int, rng) -> Prompt1Thinking:
+    def makeups(count):
+        weights = rng.dirichlet(np.ones(count)) * 100
+        return [f"{value:.{rng.integers(0, 3)}f}%" for value in weights]
+
+    return Prompt1Thinking(sections=[
+        ThinkingSection(
+            number=s + 1, title=f"Section {s + 1}", summary="", makeup=section_makeup,
+            sub_sections=[
+                ThinkingSubSection(
+                    number=n + 1, title=f"Sub-Section {n + 1}", summary="", makeup=sub_makeup,
+                    change=f"{rng.normal(0, 6):+.{rng.integers(0, 3)}f}%"
+                )
+                for n, sub_makeup in enumerate(makeups(sub_sections))
+            ]
+        )
+        for s, section_makeup in enumerate(makeups(sections))
+    ])
+
+def benchmark(sections: int = 10, sub_sections: int = 10, samples: int = CHANGE_EFFECT_SAMPLES, reports: int = 200) -> dict:
+    rng = np.random.default_rng(0)
+    thinkings = [sample_thinking(sections, sub_sections, rng) for _ in range(reports)]
+
+    start = time.perf_counter()
+    legacy = [legacy_build_structured_output(thinking) for thinking in thinkings]
+    legacy_seconds = (time.perf_counter() - start) / reports
+
+    start = time.perf_counter()
+    vectorised = [compute_change_effect(thinking) for thinking in thinkings]
+    vectorised_seconds = (time.perf_counter() - start) / reports
+
+    if legacy != vectorised:
+        raise AssertionError("Vectorised change/effect output differs from the Decimal implementation")
+
+    model = ChangeEffectModel.from_thinking(thinkings[0])
+    start = time.perf_counter()
+    model.sensitivity(samples=samples, seed=0)
+    sensitivity_seconds = time.perf_counter() - start
+
+    return {
+        "reports_checked": reports,
+        "decimal_ms_per_report": round(legacy_seconds * 1000, 3),
+        "vectorised_ms_per_report": round(vectorised_seconds * 1000, 3),
+        "sensitivity_samples": samples,
+        "sensitivity_ms": round(sensitivity_seconds * 1000, 1),
+        # The same scenarios through the Decimal loop, one report at a time
+        "decimal_loop_estimate_ms": round(legacy_seconds * samples * 1000, 1)
+    }
+
+if __name__ == "__main__":
+    import sys
+    args = [int(arg) for arg in sys.argv[1:4]]
+    print(benchmark(*args))
+
@@ -0,0 +1,160 @@
+import re
+import time
+from Engine.Runtime.report_model import Report, Section, SubSection, TableRow, Article
+from Engine.Runtime.report_text import scan_report_text, parse_report_text
+from Scripts.Predictive_Report.csv_content import SECTION_COLUMNS, report_rows
+from Scripts.Predictive_Report.format_combine import render_formatted_text
+
+# ─────────────────────────────────────────────
+# Micro-benchmark: python -m Benchmarks.csv_content [rounds]
+# ─────────────────────────────────────────────
+def strip_excluded_blocks(text):
+    text = re.sub(r"(Report Table:\n)(.*?)(?=\nSection #:|\Z)", r"\1", text, flags=re.DOTALL)
+    text = re.sub(r"(Section Tables:\n)(.*?)(?=\nSub-Section #:|\Z)", r"\1", text, flags=re.DOTALL)
+    return text
+
+def legacy_parse_sections_and_subsections(text: str):
+    """csv_content's original per-field regex parser (run on strip_excluded_blocks output), kept for comparison."""
+    rows = []
+    section_blocks = re.split(r"\n(?=Section #: \d+)", text)
+
+    for block in section_blocks:
+        section_no_match = re.search(r"Section #: (\d+)", block)
+        if not section_no_match:
+            continue
+        section_no = section_no_match.group(1)
+
+        section_data = {
+            "section_no": section_no,
+            "section_title": re.search(r"Section Title:\n(.*?)\n", block),
+            "section_header": re.search(r"Section Header:\n(.*?)\n", block),
+            "section_subheader": re.search(r"Section Sub-Header:\n(.*?)\n", block),
+            "section_theme": re.search(r"Section Theme:\n(.*?)\n", block),
+            "section_summary": re.search(r"Section Summary:\n(.*?)\nSection Makeup:", block, re.DOTALL),
+            "section_makeup": re.search(r"Section Makeup: (.*?) \|", block),
+            "section_change": re.search(r"Section Change: ([\+\-]?\d+\.\d+%)", block),
+            "section_effect": re.search(r"Section Effect: ([\+\-]?\d+\.\d+%)", block),
+            "section_insight": re.search(r"Section Insight:\n(.*?)\n", block),
+            "section_statistic": re.search(r"Section Statistic:\n(.*?)\n", block),
+            "section_recommendation": re.search(r"Section Recommendation:\n(.*?)\n", block),
+            "section_related_article_title": re.search(r"Section Related Article Title:\n(.*?)\n", block),
+            "section_related_article_date": re.search(r"Section Related Article Date:\n(.*?)\n", block),
+            "section_related_article_summary": re.search(r"Section Related Article Summary:\n(.*?)\n", block),
+            "section_related_article_relevance": re.search(r"Section Related Article Relevance:\n(.*?)\n", block),
+            "section_related_article_source": re.search(r"Section Related Article Source:\n(.*?)\n", block),
+        }
+
+        section_data = {
+            k: (v.strip() if isinstance(v, str) else v.group(1).strip()) if v else ""
+            for k, v in section_data.items()
+        }
+
+        sub_blocks = re.split(r"\n(?=Sub-Section #: \d+\.\d+)", block)
+        for sub in sub_blocks:
+            sub_match = re.search(r"Sub-Section #: (\d+\.\d+)", sub)
+            if not sub_match:
+                continue
+
+            sub_data = {
+                "sub_section_no": sub_match.group(1),
+                "sub_section_title": re.search(r"Sub-Section Title:\n(.*?)\n", sub),
+                "sub_section_header": re.search(r"Sub-Section Header:\n(.*?)\n", sub),
+                "sub_section_subheader": re.search(r"Sub-Section Sub-Header:\n(.*?)\n", sub),
+                "sub_section_summary": re.search(r"Sub-Section Summary:\n(.*?)\nSub-Section Makeup:", sub, re.DOTALL),
+                "sub_section_makeup": re.search(r"Sub-Section Makeup: (.*?) \|", sub),
+                "sub_section_change": re.search(r"Sub-Section Change: ([\+\-]?\d+\.\d+%)", sub),
+                "sub_section_effect": re.search(r"Sub-Section Effect: ([\+\-]?\d+\.\d+%)", sub),
+                "sub_section_statistic": re.search(r"Sub-Section Statistic:\n(.*?)\n", sub),
+                "sub_section_related_article_title": re.search(r"Sub-Section Related Article Title:\n(.*?)\n", sub),
+                "sub_section_related_article_date": re.search(r"Sub-Section Related Article Date:\n(.*?)\n", sub),
+                "sub_section_related_article_summary": re.search(r"Sub-Section Related Article Summary:\n(.*?)\n", sub),
+                "sub_section_related_article_relevance": re.search(r"Sub-Section Related Article Relevance:\n(.*?)\n", sub),
+                "sub_section_related_article_source": re.search(r"Sub-Section Related Article Source:\n(.*?)\n", sub),
+            }
+
+            sub_data = {
+                k: (v.strip() if isinstance(v, str) else v.group(1).strip()) if v else ""
+                for k, v in sub_data.items()
+            }
+
+            row = {**section_data, **sub_data}
+            rows.append(row)
+
+    return rows
+
+def sample_format_combine(sections: int, sub_sections: int) -> str:
+    # Field lengths follow the limits prompts 1-3 ask for (e.g. 500-750 character section summaries)
+    sentence = "Regional demand rose through the year as supply tightened and input costs climbed."
+    def paragraphs(*counts):
+        return "\n".join(" ".join([sentence] * count) for count in counts)
+    def article(prefix):
+        return Article(
+            title=f"{prefix} Regional Demand Outlook", date="01 March 2025",
+            summary=paragraphs(3), relevance=paragraphs(3), source="Industry Review"
+        )
+
+    report = Report(
+        client="Acme", website="acme.example", about_client="A regional supplier.", main_question="Where Next?",
+        report="Outlook", year="2025", title="Regional Demand", sub_title="The Next Five Years",
+        executive_summary=paragraphs(5, 5), key_findings=["- One", "- Two"],
+        call_to_action="Act now.", report_change_title="Total Demand", report_change="+2.40%",
+        report_table=[TableRow(title=f"Section {s}", makeup="10%", change="+1.00%", effect="+0.10%") for s in range(1, sections + 1)],
+        sections=[
+            Section(
+                number=s, title=f"Demand Driver {s}", header="Rising Costs", sub_header="What It Means",
+                theme="Growth", summary=paragraphs(4, 3), makeup="10%", change="+1.00%",
+                effect="+0.10%", insight="Prices follow costs.", statistic="Up 4% year on year.",
+                recommendation="Hedge early.", article=article(f"S{s}"),
+                table=[TableRow(title=f"Factor {n}", makeup="5%", change="+0.50%", effect="+0.03%") for n in range(1, sub_sections + 1)],
+                sub_sections=[
+                    SubSection(
+                        number=n, title=f"Factor {n}", header="Input Prices", sub_header="Short Term",
+                        summary=paragraphs(5), makeup="5%", change="+0.50%", effect="+0.03%",
+                        statistic="Up 2% on the quarter.", article=article(f"S{s}.{n}")
+                    )
+                    for n in range(1, sub_sections + 1)
+                ]
+            )
+            for s in range(1, sections + 1)
+        ],
+        conclusion=paragraphs(5, 5), recommendations=["- Plan", "- Hedge"]
+    )
+    return render_formatted_text(report)
+
+def benchmark(rounds: int = 20) -> dict:
+    results = {}
+    for sections, sub_sections in ((10, 10), (50, 20)):
+        text = sample_format_combine(sections, sub_sections)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            legacy = legacy_parse_sections_and_subsections(strip_excluded_blocks(text))
+        legacy_seconds = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            events = sum(1 for _ in scan_report_text(text))
+        scan_seconds = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            parsed = [{column: row[column] for column in SECTION_COLUMNS} for row in report_rows(parse_report_text(text))]
+        parsed_seconds = (time.perf_counter() - start) / rounds
+
+        if legacy != parsed:
+            raise AssertionError(f"Rows parsed from the report model differ from the legacy parser ({sections}x{sub_sections})")
+
+        results[f"{sections}x{sub_sections}"] = {
+            "rows": len(parsed),
+            "chars": len(text),
+            "events": events,
+            "legacy_ms": round(legacy_seconds * 1000, 3),
+            "scan_ms": round(scan_seconds * 1000, 3),
+            "parsed_ms": round(parsed_seconds * 1000, 3),
+            "speedup": round(legacy_seconds / parsed_seconds, 1)
+        }
+    return results
+
+if __name__ == "__main__":
+    import sys
+    print(benchmark(rounds=int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,47 @@
+import time
+import logging
+import numpy as np
+from Engine.Runtime.elasticity import ELASTICITY_PRESETS, elasticity_rows
+
+# ─────────────────────────────────────────────
+# Micro-benchmark: python -m Benchmarks.elasticity [reports]
+# ─────────────────────────────────────────────
+def sample_reports(count: int, rng) -> list:
+    commodity_types = list(ELASTICITY_PRESETS)
+    return [
+        {
+            "commodity": "Wheat", "region": "UK", "time_range": "12 Months",
+            "commodity_type": commodity_types[i % len(commodity_types)],
+            "supply_percentage": f"{rng.normal(0, 3):.2f}%",
+            "demand_percentage": f"{rng.normal(0, 3):.2f}%"
+        }
+        for i in range(count)
+    ]
+
+def benchmark(reports: int = 2000) -> dict:
+    batch_input = sample_reports(reports, np.random.default_rng(0))
+    logging.disable(logging.INFO)  # elasticity_rows logs once per call
+    try:
+        start = time.perf_counter()
+        batch = elasticity_rows(batch_input)
+        batch_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single = [row for report in batch_input for row in elasticity_rows([report])]
+        single_seconds = time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+
+    if batch != single:
+        raise AssertionError("Batched elasticity rows differ from per-report evaluation")
+
+    return {
+        "reports": reports,
+        "batch_ms": round(batch_seconds * 1000, 3),
+        "per_report_calls_ms": round(single_seconds * 1000, 3),
+        "speedup": round(single_seconds / batch_seconds, 1)
+    }
+
+if __name__ == "__main__":
+    import sys
+    print(benchmark(*[int(arg) for arg in sys.argv[1:2]]))
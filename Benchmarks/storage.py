@@ -0,0 +1,46 @@
+import os
+import json
+import time
+import tempfile
+from Engine.Files.fake_supabase_server import FakeSupabaseServer
+from Engine.Files.supabase_client import SupabaseStorageClient
+from Engine.Files.local_storage import LocalStorageClient
+
+# ─────────────────────────────────────────────
+# I/O benchmark: python -m Benchmarks.storage [objects] [kib] [latency_ms]
+# ─────────────────────────────────────────────
+def _time_backend(client, objects: int, payload: bytes) -> dict:
+    keys = [f"Benchmark/Ai_Responses/{index}.txt" for index in range(objects)]
+    timings = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        for key in keys:
+            fn(key)
+        timings[f"{name}_ms"] = round((time.perf_counter() - start) * 1000 / objects, 3)
+
+    timed("put", lambda key: client.put(key, payload, content_type="text/plain").raise_for_status())
+    timed("get", lambda key: client.get(key).raise_for_status())
+    timed("info", lambda key: client.info(key).raise_for_status())
+    timed("copy", lambda key: client.copy_object(key, key.replace("Ai_Responses", "Copies")))
+    timed("move", lambda key: client.move_object(key, key.replace("Ai_Responses", "Outputs")))
+    start = time.perf_counter()
+    listed = client.list("Benchmark/Outputs/", limit=objects).json()
+    timings["list_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    if len(listed) != objects:
+        raise AssertionError(f"Listed {len(listed)} objects after moving {objects}")
+    return timings
+
+def benchmark(objects: int = 50, kib: int = 64, latency_ms: float = 20) -> dict:
+    payload = os.urandom(kib * 1024)
+    results = {"objects": objects, "kib": kib, "latency_ms": latency_ms}
+    with FakeSupabaseServer(latency_ms=latency_ms) as server:
+        results["fake_supabase"] = _time_backend(SupabaseStorageClient(base_url=server.url), objects, payload)
+        results["fake_supabase"]["requests"] = dict(server.requests)
+    with tempfile.TemporaryDirectory() as root:
+        results["local"] = _time_backend(LocalStorageClient(root), objects, payload)
+    return results
+
+if __name__ == "__main__":
+    import sys
+    print(json.dumps(benchmark(*[float(arg) if index == 2 else int(arg) for index, arg in enumerate(sys.argv[1:4])]), indent=2))
@@ -0,0 +1,129 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from logger import logger
+
+ARTIFACT_CACHE_ENABLED = os.getenv("ARTIFACT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+ARTIFACT_CACHE_MAX_ITEM_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_ITEM_BYTES", str(8 * 1024 * 1024)))
+# 0 keeps entries until evicted; set it when other processes may rewrite the same keys
+ARTIFACT_CACHE_TTL_SECONDS = float(os.getenv("ARTIFACT_CACHE_TTL_SECONDS", "0"))
+
+class ArtifactCache:
+    """
+    Byte-bounded LRU of storage objects, keyed by bucket key (root folder included).
+    write_supabase_file fills it after a successful upload and read_supabase_file
+    checks it before going to the network; the storage client drops a key whenever
+    it puts, deletes, moves or copies onto it.
+    """
+
+    def __init__(self, max_bytes: int = ARTIFACT_CACHE_MAX_BYTES, max_item_bytes: int = ARTIFACT_CACHE_MAX_ITEM_BYTES,
+                 ttl_seconds: float = ARTIFACT_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (stored_at, bytes), least recently used first
+        self._bytes = 0
+        self._writes = 0  # bumped by every put/invalidation; lets a read fill skip if a write raced it
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0, "expired": 0}
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if self.ttl_seconds and time.monotonic() - entry[0] > self.ttl_seconds:
+                self._drop(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def token(self) -> int:
+        return self._writes
+
+    def put(self, key: str, data: bytes, token: int = None):
+        """Stores `data`; with a `token` from before the read, only if nothing was written since."""
+        if len(data) > self.max_item_bytes:
+            if token is None:
+                self.invalidate(key)
+            return
+        with self._lock:
+            if token is not None and token != self._writes:
+                return
+            self._writes += 1
+            self._drop(key)
+            self._entries[key] = (time.monotonic(), data)
+            self._bytes += len(data)
+            self.stats["stores"] += 1
+            while self._bytes > self.max_bytes:
+                evicted, (_, old) = self._entries.popitem(last=False)
+                self._bytes -= len(old)
+                self.stats["evictions"] += 1
+                logger.debug(f"🗃️ Artifact cache evicted: {evicted}")
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            self._writes += 1
+            for key in keys:
+                if self._drop(key):
+                    self.stats["invalidations"] += 1
+
+    def invalidate_prefix(self, prefix: str):
+        with self._lock:
+            self._writes += 1
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._drop(key)
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= len(entry[1])
+        return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["max_bytes"] = self.max_bytes
+        stats["enabled"] = ARTIFACT_CACHE_ENABLED
+        return stats
+
+_cache = ArtifactCache()
+
+def cache_get(key: str):
+    return _cache.get(key) if ARTIFACT_CACHE_ENABLED else None
+
+def cache_token() -> int:
+    return _cache.token()
+
+def cache_put(key: str, data: bytes, token: int = None):
+    if ARTIFACT_CACHE_ENABLED:
+        _cache.put(key, data, token)
+
+def cache_invalidate(*keys: str):
+    _cache.invalidate(*keys)
+
+def cache_invalidate_prefix(prefix: str):
+    _cache.invalidate_prefix(prefix)
+
+def cache_clear():
+    _cache.clear()
+
+def artifact_cache_stats() -> dict:
+    return _cache.snapshot()
@@ -0,0 +1,142 @@
+import os
+import gzip
+import time
+import threading
+from logger import logger
+from Engine.Files.content_index import content_entry
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+# "off", "gzip" or "zstd" (falls back to gzip when the zstandard package is missing)
+ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION", "off").lower()
+ARTIFACT_COMPRESSION_MIN_BYTES = int(os.getenv("ARTIFACT_COMPRESSION_MIN_BYTES", str(8 * 1024)))
+ARTIFACT_COMPRESSION_LEVEL = int(os.getenv("ARTIFACT_COMPRESSION_LEVEL", "6"))
+ARTIFACT_COMPRESSION_PREFIXES = tuple(
+    prefix.strip() for prefix in os.getenv("ARTIFACT_COMPRESSION_PREFIXES", "Predictive_Report/Ai_Responses/").split(",") if prefix.strip()
+)
+# Link speed used to price the bytes compression avoided (default 100 Mbit/s); tune it to the deployment
+ARTIFACT_TRANSFER_BYTES_PER_SECOND = float(os.getenv("ARTIFACT_TRANSFER_BYTES_PER_SECOND", str(12.5e6)))
+TEXT_EXTENSIONS = (".txt", ".csv", ".json")
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ENCODING_CONTENT_TYPES = {"gzip": "application/gzip", "zstd": "application/zstd"}
+
+if ARTIFACT_COMPRESSION == "zstd" and zstandard is None:
+    logger.warning("⚠️ ARTIFACT_COMPRESSION=zstd but the zstandard package is not installed; using gzip")
+    ARTIFACT_COMPRESSION = "gzip"
+
+_stats = {
+    "compressed_writes": 0, "decompressed_reads": 0, "raw_bytes": 0, "stored_bytes": 0,
+    "codec_ms": 0.0, "transfer_ms": 0.0, "estimated_transfer_ms_saved": 0.0
+}
+_lock = threading.Lock()
+
+def compressible_path(path: str) -> bool:
+    """Text artifacts under ARTIFACT_COMPRESSION_PREFIXES; only these are ever compressed or sniffed on read."""
+    return path.startswith(ARTIFACT_COMPRESSION_PREFIXES) and path.endswith(TEXT_EXTENSIONS)
+
+def stored_encoding(data) -> str:
+    """
+    The encoding a stored object carries. Compressed objects start with their codec's
+    magic bytes, which can never begin valid UTF-8, so legacy plain-text objects are
+    told apart without extra metadata requests.
+    """
+    head = bytes(data[:4])
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head == ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+def encode_artifact(path: str, data: bytes):
+    """
+    Returns (stored bytes, encoding or None, codec seconds) for an upload. Output is
+    deterministic (gzip mtime 0), so repeated writes of the same text stay
+    byte-identical for deduplication.
+    """
+    if ARTIFACT_COMPRESSION == "off" or len(data) < ARTIFACT_COMPRESSION_MIN_BYTES or not compressible_path(path):
+        return data, None, 0.0
+    start = time.perf_counter()
+    if ARTIFACT_COMPRESSION == "zstd":
+        stored = zstandard.ZstdCompressor(level=ARTIFACT_COMPRESSION_LEVEL).compress(data)
+    else:
+        stored = gzip.compress(data, compresslevel=ARTIFACT_COMPRESSION_LEVEL, mtime=0)
+    seconds = time.perf_counter() - start
+    if len(stored) >= len(data):
+        return data, None, seconds  # not worth it
+    return stored, ARTIFACT_COMPRESSION, seconds
+
+def decode_artifact(path: str, data: bytes):
+    """Returns (plain bytes, encoding or None, codec seconds) for a download; anything not compressed comes back as-is."""
+    encoding = stored_encoding(data) if compressible_path(path) else None
+    if encoding is None:
+        return data, None, 0.0
+    start = time.perf_counter()
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed but the zstandard package is not installed")
+        plain = zstandard.ZstdDecompressor().decompress(data, max_output_size=64 * len(data) + (1 << 20))
+    else:
+        plain = gzip.decompress(data)
+    return plain, encoding, time.perf_counter() - start
+
+def record_transfer(direction: str, raw_bytes: int, stored_bytes: int, codec_seconds: float, transfer_seconds: float):
+    """
+    Tallies one compressed upload/download. The transfer time saved is the bytes not
+    sent, priced at ARTIFACT_TRANSFER_BYTES_PER_SECOND: round-trip latency is paid
+    either way, so scaling the measured transfer would overstate it.
+    """
+    saved_ms = (raw_bytes - stored_bytes) / ARTIFACT_TRANSFER_BYTES_PER_SECOND * 1000
+    with _lock:
+        _stats["compressed_writes" if direction == "write" else "decompressed_reads"] += 1
+        _stats["raw_bytes"] += raw_bytes
+        _stats["stored_bytes"] += stored_bytes
+        _stats["codec_ms"] += codec_seconds * 1000
+        _stats["transfer_ms"] += transfer_seconds * 1000
+        _stats["estimated_transfer_ms_saved"] += saved_ms
+    logger.debug(
+        f"🗜️ {direction.title()} {raw_bytes} → {stored_bytes} bytes ({raw_bytes / max(stored_bytes, 1):.1f}x), "
+        f"codec {codec_seconds * 1000:.2f} ms, transfer {transfer_seconds * 1000:.2f} ms"
+    )
+
+def deliver_decompressed(client, from_key: str, to_key: str):
+    """
+    Moves a compressed artifact into a delivery folder as plain text (download,
+    decompress, upload, delete), so nothing handed to a client is a gzip/zstd blob.
+    Returns None when the object is not compressed and the caller should just move it.
+    """
+    if ARTIFACT_COMPRESSION == "off" or not compressible_path(from_key.partition("/")[2]):
+        return None
+    entry = content_entry(from_key)
+    if entry is not None and entry[2] not in ENCODING_CONTENT_TYPES.values():
+        return None  # this process wrote it uncompressed
+
+    response = client.get(from_key)
+    if response.status_code != 200:
+        return None  # let the regular move report it
+    plain, encoding, codec_seconds = decode_artifact(from_key.partition("/")[2], response.content)
+    if encoding is None:
+        return None
+    content_type = {".csv": "text/csv; charset=utf-8", ".json": "application/json"}.get(os.path.splitext(to_key)[1], "text/plain; charset=utf-8")
+    if client.put(to_key, plain, content_type=content_type).status_code not in (200, 201):
+        logger.warning(f"❌ Could not write decompressed {to_key}")
+        return False
+    client.delete(from_key)
+    logger.debug(f"🗜️ Delivered {from_key} decompressed ({len(response.content)} → {len(plain)} bytes, {codec_seconds * 1000:.2f} ms)")
+    return True
+
+def compression_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    stats["ratio"] = round(stats["raw_bytes"] / stats["stored_bytes"], 2) if stats["stored_bytes"] else None
+    stats["net_ms_saved"] = round(stats["estimated_transfer_ms_saved"] - stats["codec_ms"], 3)
+    for key in ("codec_ms", "transfer_ms", "estimated_transfer_ms_saved"):
+        stats[key] = round(stats[key], 3)
+    stats["transfer_bytes_per_second"] = ARTIFACT_TRANSFER_BYTES_PER_SECOND
+    stats["algorithm"] = ARTIFACT_COMPRESSION
+    stats["min_bytes"] = ARTIFACT_COMPRESSION_MIN_BYTES
+    return stats
@@ -0,0 +1,107 @@
+import os
+import re
+import threading
+from logger import logger
+
+AMERICAN_TO_BRITISH_PATH = os.getenv(
+    "AMERICAN_TO_BRITISH_PATH", "Prompts/American_to_British/american_to_british.txt"
+)
+
+# Joins batch fields for a single regex pass; a non-word character, so \b still
+# falls at every field edge.
+BATCH_SEPARATOR = "\x00"
+
+def load_american_to_british_dict(filepath: str) -> dict:
+    mapping = {}
+    with open(filepath, 'r', encoding='utf-8') as file:
+        for line in file:
+            if ':' in line:
+                us, uk = line.strip().rstrip(',').split(':')
+                mapping[us.strip().strip('"')] = uk.strip().strip('"')
+    return mapping
+
+def trie_pattern(words) -> str:
+    """
+    Builds a regex alternation factored on shared prefixes (analy(?:s(?:e|ed)|z...)),
+    so the engine walks each candidate word once instead of trying every entry in turn.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node) -> str:
+        ends_here = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+class BritishEnglishConverter:
+    """American → British spelling, compiled once from the dictionary file."""
+
+    def __init__(self, mapping: dict):
+        # Only lower-case lookups ever fire (the upper-case entries in the file
+        # are matched case-insensitively and resolved through their lower form)
+        self.mapping = {word.lower(): mapping[word.lower()] for word in mapping if word.lower() in mapping}
+        self.pattern = re.compile(r'\b(?:' + trie_pattern(self.mapping) + r')\b', re.IGNORECASE)
+        # Precomputed outputs for the common casings; anything else takes the general rule
+        self.variants = {}
+        for us, uk in self.mapping.items():
+            self.variants[us] = uk
+            self.variants[us.upper()] = uk.upper()
+            self.variants[us.capitalize()] = uk.capitalize()
+
+    def _replace(self, match) -> str:
+        us_word = match.group(0)
+        british = self.variants.get(us_word)
+        if british is not None:
+            return british
+        british = self.mapping[us_word.lower()]
+        if us_word.isupper():
+            return british.upper()
+        elif us_word[0].isupper():
+            return british.capitalize()
+        return british
+
+    def convert(self, text: str) -> str:
+        return self.pattern.sub(self._replace, text)
+
+    def convert_many(self, texts) -> list:
+        """Converts a batch of fields in one regex pass."""
+        texts = list(texts)
+        if not texts:
+            return []
+        if any(BATCH_SEPARATOR in text for text in texts):
+            return [self.convert(text) for text in texts]
+        return self.convert(BATCH_SEPARATOR.join(texts)).split(BATCH_SEPARATOR)
+
+    def convert_fields(self, fields: dict) -> dict:
+        """Converts every value of a {key: text} mapping in one pass; keys are left as-is."""
+        return dict(zip(fields.keys(), self.convert_many(fields.values())))
+
+_converter = None
+_lock = threading.Lock()
+
+def get_converter() -> BritishEnglishConverter:
+    """Returns the process-wide converter, compiling the dictionary on first use."""
+    global _converter
+    if _converter is None:
+        with _lock:
+            if _converter is None:
+                _converter = BritishEnglishConverter(load_american_to_british_dict(AMERICAN_TO_BRITISH_PATH))
+                logger.info(f"🇬🇧 Compiled American→British converter ({len(_converter.mapping)} words)")
+    return _converter
+
+def convert_to_british_english(text: str) -> str:
+    return get_converter().convert(text)
+
+def convert_many_to_british_english(texts) -> list:
+    return get_converter().convert_many(texts)
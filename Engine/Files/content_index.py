@@ -0,0 +1,154 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from logger import logger
+
+CONTENT_DEDUP_ENABLED = os.getenv("CONTENT_DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Below this size a fresh upload costs no more than the info/copy request dedup would spend, so it always uploads
+CONTENT_DEDUP_COPY_MIN_BYTES = int(os.getenv("CONTENT_DEDUP_COPY_MIN_BYTES", str(64 * 1024)))
+CONTENT_INDEX_MAX_KEYS = int(os.getenv("CONTENT_INDEX_MAX_KEYS", "10000"))
+# 0 keeps an entry until the key changes in this process; a skip is still confirmed against storage first
+CONTENT_INDEX_TTL_SECONDS = float(os.getenv("CONTENT_INDEX_TTL_SECONDS", "0"))
+
+class ContentIndex:
+    """
+    What this process last knew to be stored under each key: sha256, length and
+    content type, plus the reverse hash -> keys map. Writes, copies and moves keep it
+    current; any other change to a key (or a failed transfer) forgets it.
+    """
+
+    def __init__(self, max_keys: int = CONTENT_INDEX_MAX_KEYS, ttl_seconds: float = CONTENT_INDEX_TTL_SECONDS):
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self._keys = OrderedDict()  # key -> (sha256, length, content_type, stored_at)
+        self._hashes = {}  # sha256 -> {key, ...}
+        self._lock = threading.Lock()
+        self.stats = {"skipped_uploads": 0, "server_copies": 0, "bytes_saved": 0}
+
+    def remember(self, key: str, sha256: str, length: int, content_type: str = None):
+        with self._lock:
+            self._forget(key)
+            self._keys[key] = (sha256, length, content_type, time.monotonic())
+            self._hashes.setdefault(sha256, set()).add(key)
+            while len(self._keys) > self.max_keys:
+                self._forget(next(iter(self._keys)))
+
+    def forget(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._forget(key)
+
+    def transfer(self, from_key: str, to_key: str, move: bool = False):
+        """After a successful copy/move the destination holds the source's content."""
+        entry = self.lookup(from_key)
+        if move:
+            self.forget(from_key)
+        if entry is None:
+            self.forget(to_key)
+        else:
+            self.remember(to_key, *entry)
+
+    def lookup(self, key: str):
+        with self._lock:
+            entry = self._keys.get(key)
+            if entry is None:
+                return None
+            if self.ttl_seconds and time.monotonic() - entry[3] > self.ttl_seconds:
+                self._forget(key)
+                return None
+            self._keys.move_to_end(key)
+            return entry[:3]
+
+    def nearest(self, sha256: str, key: str, content_type: str = None):
+        """Another key holding this content (same content type), preferring the one sharing the longest path with `key`."""
+        with self._lock:
+            candidates = [
+                other for other in self._hashes.get(sha256, ())
+                if other != key and self._keys[other][2] == content_type
+            ]
+        candidates = [other for other in candidates if self.lookup(other) is not None]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda other: (len(os.path.commonprefix([other, key])), other))
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self._hashes.clear()
+
+    def _forget(self, key: str):
+        entry = self._keys.pop(key, None)
+        if entry is not None:
+            holders = self._hashes.get(entry[0])
+            holders.discard(key)
+            if not holders:
+                del self._hashes[entry[0]]
+
+    def count(self, outcome: str, length: int):
+        with self._lock:
+            self.stats[outcome] += 1
+            self.stats["bytes_saved"] += length
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "indexed_keys": len(self._keys), "enabled": CONTENT_DEDUP_ENABLED}
+
+_index = ContentIndex()
+
+def remember_content(key: str, sha256: str, length: int, content_type: str = None):
+    _index.remember(key, sha256, length, content_type)
+
+def forget_content(*keys: str):
+    _index.forget(*keys)
+
+def clear_content_index():
+    _index.clear()
+
+def content_entry(key: str):
+    """(sha256, length, content_type) last stored under `key` by this process, or None."""
+    return _index.lookup(key)
+
+def content_transferred(from_key: str, to_key: str, move: bool = False):
+    _index.transfer(from_key, to_key, move)
+
+def stored_size(client, key: str):
+    """The size storage reports for `key`, or None when it is missing or does not say."""
+    response = client.info(key)
+    if response.status_code != 200:
+        return None
+    info = response.json()
+    return info.get("size", (info.get("metadata") or {}).get("size"))
+
+def deduplicate_upload(client, key: str, sha256: str, length: int, content_type: str = None):
+    """
+    Called before an upload. Returns "skipped" when `key` already holds these bytes,
+    "copied" when a server-side copy from another key holding them succeeded, or None
+    when the caller should upload as usual. A skip is only taken once storage confirms
+    the object is still there at the same size, since another process may have
+    rewritten or deleted it.
+    """
+    if not CONTENT_DEDUP_ENABLED or length < CONTENT_DEDUP_COPY_MIN_BYTES:
+        return None
+    if _index.lookup(key) == (sha256, length, content_type):
+        if stored_size(client, key) == length:
+            # The info request replaces the upload, so only the bytes are saved
+            _index.count("skipped_uploads", length)
+            logger.info(f"♻️ Identical content already stored at {key}; upload skipped ({length} bytes)")
+            return "skipped"
+        logger.debug(f"♻️ {key} changed outside this process; uploading")
+        _index.forget(key)
+
+    source = _index.nearest(sha256, key, content_type)
+    if source is None:
+        return None
+    # Only the server-side copy is cheap; if it is refused (e.g. `key` exists), upload instead
+    if client.copy(source, key).status_code not in (200, 201):
+        return None
+    # The copy is still one request, but the bytes never leave the server
+    _index.count("server_copies", length)
+    logger.info(f"♻️ Identical content found at {source}; copied server-side to {key} ({length} bytes not uploaded)")
+    return "copied"
+
+def dedup_stats() -> dict:
+    return _index.snapshot()
@@ -0,0 +1,71 @@
+import json
+import time
+import threading
+import yaml
+from logger import logger
+
+try:
+    import orjson
+except ImportError:  # the standard library parser still works, just slower
+    orjson = None
+
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+_stats = {}  # stage -> {"count", "total_ms", "max_ms", "bytes"}
+_lock = threading.Lock()
+
+def _record(stage: str, seconds: float, size: int):
+    ms = seconds * 1000
+    with _lock:
+        entry = _stats.setdefault(stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "bytes": 0})
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+        entry["bytes"] += size
+    logger.debug(f"⏱️ Parsed {size} chars for {stage} in {ms:.2f} ms")
+
+def _loads_json(text):
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # json also accepts NaN/Infinity and lone surrogates; let it have the final say
+    return json.loads(text)
+
+def loads_json(text, stage: str = "json"):
+    """json.loads via orjson when installed; the parse time is recorded under `stage`."""
+    start = time.perf_counter()
+    try:
+        return _loads_json(text)
+    finally:
+        _record(stage, time.perf_counter() - start, len(text))
+
+def load_document(text: str, stage: str = "document"):
+    """
+    Parses text that may be JSON or YAML (e.g. the flattened "Key: value" text
+    Zapier passes between steps). Text that looks like JSON goes to the JSON parser
+    first; YAML uses the libyaml C loader when PyYAML was built with it.
+    """
+    start = time.perf_counter()
+    try:
+        stripped = text.lstrip()
+        if stripped[:1] in ("{", "["):
+            try:
+                return _loads_json(stripped)
+            except ValueError:
+                pass
+        return yaml.load(text, Loader=YamlLoader)
+    finally:
+        _record(stage, time.perf_counter() - start, len(text))
+
+def parse_stats() -> dict:
+    with _lock:
+        stats = {
+            stage: {**entry, "total_ms": round(entry["total_ms"], 3), "max_ms": round(entry["max_ms"], 3),
+                    "mean_ms": round(entry["total_ms"] / entry["count"], 3)}
+            for stage, entry in _stats.items()
+        }
+    return {"json_parser": "orjson" if orjson is not None else "json", "yaml_loader": YamlLoader.__name__, "stages": stats}
@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+from logger import logger
+
+FAKE_SUPABASE_LATENCY_MS = float(os.getenv("FAKE_SUPABASE_LATENCY_MS", "0"))
+FAKE_SUPABASE_JITTER_MS = float(os.getenv("FAKE_SUPABASE_JITTER_MS", "0"))
+OBJECT_PREFIX = "/storage/v1/object/"
+
+class FakeSupabaseServer:
+    """
+    In-process stand-in for the Supabase storage REST API (object get/put/post/delete,
+    info, list, move, copy), holding objects in memory. Every request waits
+    `latency_ms` (± `jitter_ms`) first, so I/O patterns can be measured against a
+    realistic round trip without a live project. Point SUPABASE_URL at `url`.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = FAKE_SUPABASE_LATENCY_MS, jitter_ms: float = FAKE_SUPABASE_JITTER_MS):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.objects = {}  # (bucket, key) -> (bytes, content_type, updated_at)
+        self.requests = {}  # "METHOD route" -> count
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeSupabaseServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-supabase", daemon=True)
+        self._thread.start()
+        logger.info(f"🧪 Fake Supabase storage listening on {self.url} (latency {self.latency_ms} ± {self.jitter_ms} ms)")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def wait(self):
+        delay = self.latency_ms + (random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def count(self, route: str):
+        with self.lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def list_folder(self, bucket: str, prefix: str, limit: int, offset: int = 0) -> list:
+        folder = prefix.strip("/")
+        start = f"{folder}/" if folder else ""
+        files, folders = {}, set()
+        with self.lock:
+            for (object_bucket, key), (data, content_type, updated_at) in self.objects.items():
+                if object_bucket != bucket or not key.startswith(start):
+                    continue
+                rest = key[len(start):]
+                if "/" in rest:
+                    folders.add(rest.split("/", 1)[0])
+                else:
+                    files[rest] = {
+                        "name": rest,
+                        "id": f"{abs(hash((bucket, key)))}",
+                        "updated_at": updated_at,
+                        "metadata": {"size": len(data), "mimetype": content_type}
+                    }
+        items = [{"name": name, "id": None, "updated_at": None, "metadata": None} for name in folders - files.keys()]
+        items.extend(files.values())
+        items.sort(key=lambda item: item["name"])
+        return items[offset:offset + limit]
+
+def _handler_for(server: FakeSupabaseServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so the pooled client session is exercised
+        disable_nagle_algorithm = True  # otherwise small responses pick up ~40 ms of delayed-ACK stall
+
+        def log_message(self, format, *args):
+            logger.debug(f"🧪 Fake Supabase: {format % args}")
+
+        # --- Plumbing ---
+        def read_body(self) -> bytes:
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        return b"".join(chunks)
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def send(self, status: int, body: bytes = b"", content_type: str = "application/json"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def send_json(self, status: int, payload):
+            self.send(status, json.dumps(payload).encode("utf-8"))
+
+        def error(self, status: int, error: str, message: str):
+            self.send_json(status, {"statusCode": str(status), "error": error, "message": message})
+
+        def route(self):
+            path = unquote(self.path.split("?", 1)[0])
+            if not path.startswith(OBJECT_PREFIX):
+                return None, None, None
+            rest = path[len(OBJECT_PREFIX):]
+            for action in ("list", "info"):
+                if rest.startswith(f"{action}/"):
+                    bucket, _, key = rest[len(action) + 1:].partition("/")
+                    return action, bucket, key
+            if rest in ("move", "copy"):
+                return rest, None, None
+            bucket, _, key = rest.partition("/")
+            return "object", bucket, key
+
+        def handle_request(self):
+            body = self.read_body() if self.command in ("PUT", "POST") else b""
+            action, bucket, key = self.route()
+            server.count(f"{self.command} {action}")
+            server.wait()
+
+            if action == "object":
+                self.object(bucket, key, body)
+            elif action == "info" and self.command == "GET":
+                self.info(bucket, key)
+            elif action == "list" and self.command == "POST":
+                payload = json.loads(body or b"{}")
+                self.send_json(200, server.list_folder(bucket, payload.get("prefix", ""), int(payload.get("limit", 100)), int(payload.get("offset", 0))))
+            elif action in ("move", "copy") and self.command == "POST":
+                self.transfer(action, json.loads(body or b"{}"))
+            else:
+                self.error(400, "invalid_request", f"Unsupported route: {self.command} {self.path}")
+
+        do_GET = do_PUT = do_POST = do_DELETE = handle_request
+
+        # --- Storage API ---
+        def object(self, bucket: str, key: str, body: bytes):
+            # PUT upserts (write_supabase_file relies on that); POST only creates unless x-upsert is set
+            upsert = self.command == "PUT" or self.headers.get("x-upsert", "").lower() == "true"
+            with server.lock:
+                stored = server.objects.get((bucket, key))
+                if self.command == "DELETE":
+                    server.objects.pop((bucket, key), None)
+                elif self.command in ("PUT", "POST") and (upsert or stored is None):
+                    content_type = self.headers.get("Content-Type", "application/octet-stream")
+                    server.objects[(bucket, key)] = (body, content_type, datetime.now(timezone.utc).isoformat())
+                    stored = None
+
+            if self.command in ("PUT", "POST"):
+                if stored is not None:
+                    return self.error(400, "Duplicate", "The resource already exists")
+                return self.send_json(200, {"Key": f"{bucket}/{key}"})
+            if stored is None:
+                return self.error(404, "not_found", "Object not found")
+            if self.command == "DELETE":
+                return self.send_json(200, {"message": "Successfully deleted"})
+            self.send(200, stored[0], stored[1])
+
+        def info(self, bucket: str, key: str):
+            with server.lock:
+                stored = server.objects.get((bucket, key))
+            if stored is None:
+                return self.error(404, "not_found", "Object not found")
+            data, content_type, updated_at = stored
+            self.send_json(200, {"name": key, "size": len(data), "content_type": content_type, "last_modified": updated_at})
+
+        def transfer(self, action: str, payload: dict):
+            bucket = payload.get("bucketId")
+            source, target = (bucket, payload.get("sourceKey")), (bucket, payload.get("destinationKey"))
+            with server.lock:
+                missing, exists = source not in server.objects, target in server.objects
+                if not missing and not exists:
+                    server.objects[target] = server.objects[source]
+                    if action == "move":
+                        del server.objects[source]
+            if missing:
+                return self.error(404, "not_found", "Object not found")
+            if exists:
+                # Like Supabase, neither call overwrites; the client falls back to a streamed copy
+                return self.error(400, "Duplicate", "The resource already exists")
+            self.send_json(200, {"message": f"Successfully {'moved' if action == 'move' else 'copied'}", "Key": f"{bucket}/{target[1]}"})
+
+    return Handler
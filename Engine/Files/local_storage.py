@@ -0,0 +1,179 @@
+import os
+import mmap
+import uuid
+import shutil
+import mimetypes
+from datetime import datetime, timezone
+from logger import logger
+from Engine.Files.storage_backend import StorageBackend, StorageResponse, object_changed, transfer_finished
+from Engine.Files.artifact_cache import cache_invalidate
+
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "local_storage")
+# Streamed reads of objects at least this large go through a memory map instead of one buffered read
+LOCAL_STORAGE_MMAP_BYTES = int(os.getenv("LOCAL_STORAGE_MMAP_BYTES", str(1024 * 1024)))
+PARTIAL_SUFFIX = ".part"
+
+def _not_found(key: str) -> StorageResponse:
+    return StorageResponse.json_body({"statusCode": "404", "error": "not_found", "message": f"Object not found: {key}"}, 404, key)
+
+def _duplicate(key: str) -> StorageResponse:
+    # Supabase refuses to POST, copy or move onto an existing object
+    return StorageResponse.json_body({"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"}, 400, key)
+
+class LocalStorageClient(StorageBackend):
+    """
+    Stores objects as files under `root`, one file per key, so stages can run and be
+    benchmarked offline. Writes land in a temporary file first and are renamed into
+    place, so a reader never sees half an object.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str = LOCAL_STORAGE_ROOT, mmap_bytes: int = LOCAL_STORAGE_MMAP_BYTES):
+        self.root = os.path.abspath(root)
+        self.mmap_bytes = mmap_bytes
+        os.makedirs(self.root, exist_ok=True)
+        logger.info(f"💽 Local storage ready at {self.root} (streamed reads memory-mapped from {mmap_bytes} bytes)")
+
+    def path_for(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key.strip("/")))
+        if path != self.root and not path.startswith(self.root + os.sep):
+            raise ValueError(f"Storage key escapes the local root: {key}")
+        return path
+
+    def object_url(self, key: str) -> str:
+        return f"file://{self.path_for(key)}"
+
+    # --- Object operations ---
+    def get(self, key: str, timeout=None, stream: bool = False):
+        path = self.path_for(key)
+        if not os.path.isfile(path):
+            return _not_found(key)
+        headers = {"Content-Type": mimetypes.guess_type(path)[0] or "application/octet-stream"}
+        size = os.path.getsize(path)
+
+        with open(path, "rb") as f:
+            if not stream or size == 0 or size < self.mmap_bytes:
+                return StorageResponse(200, f.read(), headers, key)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Chunks are slices of the map, so a streamed copy never holds the whole object
+        view = memoryview(mapped)
+
+        def release():
+            view.release()
+            mapped.close()
+        return StorageResponse(200, view, headers, key, closer=release)
+
+    def put(self, key: str, data, content_type: str = "application/octet-stream", timeout=None):
+        object_changed(key)
+        return self._write(key, data)
+
+    def post(self, key: str, data, content_type: str = "application/octet-stream", timeout=None):
+        object_changed(key)
+        if os.path.exists(self.path_for(key)):
+            return _duplicate(key)
+        return self._write(key, data)
+
+    def delete(self, key: str, timeout=None):
+        object_changed(key)
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            return _not_found(key)
+        return StorageResponse.json_body({"message": "Successfully deleted"}, 200, key)
+
+    def info(self, key: str, timeout=None):
+        path = self.path_for(key)
+        if not os.path.isfile(path):
+            return _not_found(key)
+        stat = os.stat(path)
+        return StorageResponse.json_body({
+            "name": key,
+            "size": stat.st_size,
+            "content_type": mimetypes.guess_type(path)[0] or "application/octet-stream",
+            "last_modified": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+        }, 200, key)
+
+    def list(self, prefix: str, limit: int = 1000, timeout=None):
+        """Lists the files and folders directly under `prefix`, shaped like the Supabase list API."""
+        folder = self.path_for(prefix)
+        try:
+            entries = sorted(os.scandir(folder), key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return StorageResponse.json_body([], 200, prefix)
+
+        items = []
+        for entry in entries:
+            if entry.name.endswith(PARTIAL_SUFFIX):
+                continue
+            if entry.is_dir():
+                items.append({"name": entry.name, "id": None, "updated_at": None, "metadata": None})
+            else:
+                stat = entry.stat()
+                items.append({
+                    "name": entry.name,
+                    "id": f"{stat.st_ino}",
+                    "updated_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+                    "metadata": {"size": stat.st_size, "mimetype": mimetypes.guess_type(entry.name)[0]}
+                })
+            if len(items) >= limit:
+                break
+        return StorageResponse.json_body(items, 200, prefix)
+
+    # --- Transfers ---
+    def move(self, from_key: str, to_key: str, timeout=None):
+        cache_invalidate(from_key, to_key)
+        source = self.path_for(from_key)
+        if not os.path.isfile(source):
+            return _not_found(from_key)
+        target = self.path_for(to_key)
+        if os.path.exists(target):
+            return _duplicate(to_key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+        transfer_finished(from_key, to_key, True, move=True)
+        return StorageResponse.json_body({"message": "Successfully moved"}, 200, to_key)
+
+    def copy(self, from_key: str, to_key: str, timeout=None):
+        cache_invalidate(to_key)
+        source = self.path_for(from_key)
+        if not os.path.isfile(source):
+            return _not_found(from_key)
+        target = self.path_for(to_key)
+        if os.path.exists(target):
+            return _duplicate(to_key)
+        self._copy_file(source, target)
+        transfer_finished(from_key, to_key, True)
+        return StorageResponse.json_body({"Key": to_key}, 200, to_key)
+
+    def stream_copy(self, from_key: str, to_key: str, timeout=None) -> bool:
+        """Overwriting copy, the local counterpart of the Supabase client's streamed upsert."""
+        cache_invalidate(to_key)
+        source = self.path_for(from_key)
+        if not os.path.isfile(source):
+            logger.warning(f"❌ Stream copy could not fetch {from_key} (status 404)")
+            return False
+        self._copy_file(source, self.path_for(to_key))
+        transfer_finished(from_key, to_key, True)
+        return True
+
+    def _copy_file(self, source: str, target: str):
+        partial = self._partial_path(target)
+        shutil.copyfile(source, partial)
+        os.replace(partial, target)
+
+    def _partial_path(self, target: str) -> str:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        return f"{target}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}"
+
+    def _write(self, key: str, data):
+        target = self.path_for(key)
+        partial = self._partial_path(target)
+        with open(partial, "wb") as f:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                f.write(data)
+            else:
+                for chunk in data:  # an iterator of chunks, e.g. a streamed download
+                    f.write(chunk)
+        os.replace(partial, target)
+        return StorageResponse.json_body({"Key": key}, 200, key)
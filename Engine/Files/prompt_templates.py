@@ -0,0 +1,137 @@
+import os
+import string
+import threading
+from logger import logger
+
+PROMPTS_DIR = os.getenv("PROMPTS_DIR", "Prompts")
+
+# Variables each runner supplies. A template placeholder outside this set would
+# only blow up mid-pipeline, so it is rejected when the registry loads instead.
+TEMPLATE_VARIABLES = {
+    "Client_Context/client_context.txt": {"client", "client_website_url"},
+    "Predictive_Report/prompt_1_thinking.txt": {
+        "client", "client_context", "main_question", "question_context", "number_sections",
+        "number_sub_sections", "target_variable", "commodity", "region", "time_range",
+        "reference_age_range", "today_date"
+    },
+    "Predictive_Report/prompt_1_makeup_repair.txt": {
+        "target_variable", "commodity", "region", "time_range", "section", "section_makeups",
+        "issues", "section_number"
+    },
+    "Predictive_Report/prompt_2_section_assets.txt": {
+        "client", "client_context", "main_question", "question_context", "tone_of_voice",
+        "special_instructions", "prompt_1_thinking"
+    },
+    "Predictive_Report/prompt_3_report_assets.txt": {
+        "client", "client_context", "main_question", "question_context", "tone_of_voice",
+        "special_instructions", "prompt_1_thinking", "prompt_2_section_assets"
+    },
+    "Predictive_Report/prompt_4_tables.txt": {
+        "client", "client_context", "main_question", "question_context", "target_variable",
+        "commodity", "region", "time_range", "prompt_1_thinking", "report_change"
+    },
+    "Image_Prompts/section_image_prompts.txt": {"client", "client_context", "prompt_2_section_assets"},
+    "Image_Prompts/report_image_prompts.txt": {"client", "client_context", "prompt_3_report_assets"},
+}
+
+class TemplateError(ValueError):
+    """Raised when a prompt template cannot be compiled or rendered."""
+
+class PromptTemplate:
+    """
+    A prompt file compiled once into literal/placeholder pieces. Rendering joins
+    the pieces with the raw values, so no brace escaping is needed and no
+    str.format pass runs per request.
+    """
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self.mtime = None
+        self.pieces = []
+        self.variables = set()
+        self.compile()
+
+    def compile(self):
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, "r", encoding="utf-8") as f:
+            text = f.read()
+
+        pieces = []
+        variables = set()
+        try:
+            for literal, field, spec, conversion in string.Formatter().parse(text):
+                if literal:
+                    pieces.append((literal, None, None, None))
+                if field is None:
+                    continue
+                if not field.isidentifier():
+                    raise TemplateError(f"{self.name}: unsupported placeholder {{{field}}}")
+                pieces.append((None, field, spec, conversion))
+                variables.add(field)
+        except ValueError as e:
+            raise TemplateError(f"{self.name}: {e}") from e
+
+        expected = TEMPLATE_VARIABLES.get(self.name)
+        if expected is not None and not variables.issubset(expected):
+            raise TemplateError(f"{self.name}: placeholders {sorted(variables - expected)} are not supplied by its runner")
+
+        self.pieces = pieces
+        self.variables = variables
+        self.mtime = mtime
+
+    def render(self, **values) -> str:
+        missing = self.variables - values.keys()
+        if missing:
+            raise TemplateError(f"{self.name}: missing values for {sorted(missing)}")
+
+        parts = []
+        for literal, field, spec, conversion in self.pieces:
+            if field is None:
+                parts.append(literal)
+                continue
+            value = values[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "a":
+                value = ascii(value)
+            parts.append(format(value, spec) if spec else str(value))
+        return "".join(parts)
+
+_templates = {}
+_lock = threading.Lock()
+
+def load_prompt_templates(prompts_dir: str = PROMPTS_DIR) -> dict:
+    """Compiles every .txt under Prompts/ (called at startup so a broken template fails the boot)."""
+    loaded = {}
+    for root, _, files in os.walk(prompts_dir):
+        for file_name in sorted(files):
+            if not file_name.endswith(".txt"):
+                continue
+            path = os.path.join(root, file_name)
+            name = os.path.relpath(path, prompts_dir).replace(os.sep, "/")
+            loaded[name] = PromptTemplate(name, path)
+
+    missing = set(TEMPLATE_VARIABLES) - set(loaded)
+    if missing:
+        raise TemplateError(f"Prompt templates not found: {sorted(missing)}")
+
+    with _lock:
+        _templates.update(loaded)
+    logger.info(f"🧩 Compiled {len(loaded)} prompt templates from {prompts_dir}/")
+    return loaded
+
+def get_template(name: str) -> PromptTemplate:
+    """Returns the compiled template, recompiling it only if the file's mtime has changed."""
+    with _lock:
+        template = _templates.get(name)
+        if template is None:
+            template = PromptTemplate(name, os.path.join(PROMPTS_DIR, name))
+            _templates[name] = template
+        elif os.path.getmtime(template.path) != template.mtime:
+            logger.info(f"🔄 Prompt template changed on disk, recompiling: {name}")
+            template.compile()
+        return template
+
+def render_prompt(name: str, **values) -> str:
+    return get_template(name).render(**values)
@@ -1,49 +1,68 @@
 import os
+import time
 import requests
-from Engine.Files.auth import get_supabase_headers
+from Engine.Files.supabase_client import get_storage_client, storage_configured
+from Engine.Files.artifact_cache import cache_get, cache_put, cache_token
+from Engine.Files.artifact_compression import decode_artifact, record_transfer
 from logger import logger
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_BUCKET = "panelitix"
 SUPABASE_ROOT_FOLDER = os.getenv("SUPABASE_ROOT_FOLDER", "The_Big_Question")  # 🔹 Add this line
 
-def read_supabase_file(path: str, binary: bool = False):
-    if not SUPABASE_URL:
+def read_supabase_file(path: str, binary: bool = False, use_cache: bool = True):
+    if not storage_configured():
         logger.error("❌ SUPABASE_URL is not set in environment variables.")
         raise ValueError("SUPABASE_URL not configured")
 
     # 🔹 Prepend root folder to path
     full_path = f"{SUPABASE_ROOT_FOLDER}/{path}"
 
-    url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{full_path}"
-    headers = get_supabase_headers()
+    cached = cache_get(full_path) if use_cache else None
+    if cached is not None:
+        logger.info(f"🗃️ Artifact cache hit: {full_path}")
+        return cached if binary else decode_content(path, cached)
+
+    token = cache_token()
+    client = get_storage_client()
+    url = client.object_url(full_path)
 
     try:
         logger.info(f"📥 Reading Supabase file from: {url}")
-        response = requests.get(url, headers=headers)
+        start = time.perf_counter()
+        response = client.get(full_path)
 
         logger.info(f"🛰️ Supabase response status: {response.status_code}")
         logger.debug(f"📄 Supabase Content-Type header: {response.headers.get('Content-Type')}")
         response.raise_for_status()
+        transfer_seconds = time.perf_counter() - start
+
+        # Compressed artifacts come back as the bytes that were written; legacy objects pass through
+        content, encoding, codec_seconds = decode_artifact(path, response.content)
+        if encoding:
+            record_transfer("read", len(content), len(response.content), codec_seconds, transfer_seconds)
+            logger.debug(f"🗜️ Decompressed {encoding}: {len(response.content)} → {len(content)} bytes")
+        cache_put(full_path, content, token)
 
         if binary:
-            logger.debug(f"✅ Binary file read successful, content size: {len(response.content)} bytes")
-            return response.content
-
-        # --- Decode text content ---
-        try:
-            text = response.content.decode("utf-8", errors="strict")
-            if path.endswith(".csv"):
-                logger.debug(f"🧾 CSV file detected. Text content decoded successfully, size: {len(text)} characters")
-            elif path.endswith(".txt"):
-                logger.debug(f"📄 TXT file detected. Text content decoded successfully, size: {len(text)} characters")
-            else:
-                logger.debug(f"📦 Unknown extension. Text content decoded, size: {len(text)} characters")
-            return text
-        except UnicodeDecodeError as e:
-            logger.error(f"❌ UTF-8 decode failed: {e}")
-            raise
+            logger.debug(f"✅ Binary file read successful, content size: {len(content)} bytes")
+            return content
+
+        return decode_content(path, content)
 
     except requests.exceptions.RequestException as e:
         logger.error(f"❌ Supabase file read failed: {e}")
         raise
+
+def decode_content(path: str, content: bytes) -> str:
+    # --- Decode text content ---
+    try:
+        text = content.decode("utf-8", errors="strict")
+        if path.endswith(".csv"):
+            logger.debug(f"🧾 CSV file detected. Text content decoded successfully, size: {len(text)} characters")
+        elif path.endswith(".txt"):
+            logger.debug(f"📄 TXT file detected. Text content decoded successfully, size: {len(text)} characters")
+        else:
+            logger.debug(f"📦 Unknown extension. Text content decoded, size: {len(text)} characters")
+        return text
+    except UnicodeDecodeError as e:
+        logger.error(f"❌ UTF-8 decode failed: {e}")
+        raise
@@ -0,0 +1,136 @@
+import json
+import requests
+from abc import ABC, abstractmethod
+from logger import logger
+from Engine.Files.artifact_cache import cache_invalidate
+from Engine.Files.content_index import forget_content, content_transferred
+
+STREAM_CHUNK_SIZE = 256 * 1024
+
+class StorageResponse:
+    """
+    The slice of requests.Response the storage callers rely on, for backends that
+    never touch the network. raise_for_status raises requests' HTTPError, so the
+    existing `except requests.exceptions.RequestException` handlers still apply.
+    """
+
+    def __init__(self, status_code: int = 200, content=b"", headers: dict = None, url: str = "", closer=None):
+        self.status_code = status_code
+        self.content = content  # bytes, or a memoryview over a mapped file for streamed reads
+        self.headers = headers or {}
+        self.url = url
+        self._closer = closer
+
+    @classmethod
+    def json_body(cls, payload, status_code: int = 200, url: str = "") -> "StorageResponse":
+        return cls(status_code, json.dumps(payload).encode("utf-8"), {"Content-Type": "application/json"}, url)
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return bytes(self.content).decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(bytes(self.content))
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for {self.url}: {self.text}", response=self)
+
+    def iter_content(self, chunk_size: int = STREAM_CHUNK_SIZE):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        if self._closer is not None:
+            self._closer()
+            self._closer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def object_changed(*keys: str):
+    """Called before anything rewrites or deletes `keys`: drops them from the artifact cache and content index."""
+    cache_invalidate(*keys)
+    forget_content(*keys)
+
+def transfer_finished(from_key: str, to_key: str, ok: bool, move: bool = False):
+    """Called after a copy/move: the destination now holds the source's content, or its state is unknown."""
+    if ok:
+        content_transferred(from_key, to_key, move)
+    else:
+        forget_content(to_key)
+
+class StorageBackend(ABC):
+    """
+    Object storage as the pipeline uses it. Keys are bucket-relative (they already
+    include SUPABASE_ROOT_FOLDER) and every call returns a requests-style response,
+    except copy_object/move_object which report success as a bool.
+    """
+
+    name = "storage"
+
+    @abstractmethod
+    def object_url(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def get(self, key: str, timeout=None, stream: bool = False):
+        ...
+
+    @abstractmethod
+    def put(self, key: str, data, content_type: str = "application/octet-stream", timeout=None):
+        ...
+
+    @abstractmethod
+    def post(self, key: str, data, content_type: str = "application/octet-stream", timeout=None):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str, timeout=None):
+        ...
+
+    @abstractmethod
+    def info(self, key: str, timeout=None):
+        ...
+
+    @abstractmethod
+    def list(self, prefix: str, limit: int = 1000, timeout=None):
+        ...
+
+    @abstractmethod
+    def move(self, from_key: str, to_key: str, timeout=None):
+        ...
+
+    @abstractmethod
+    def copy(self, from_key: str, to_key: str, timeout=None):
+        ...
+
+    @abstractmethod
+    def stream_copy(self, from_key: str, to_key: str, timeout=None) -> bool:
+        """Fallback transfer that overwrites `to_key` (the server-side copy/move refuse an existing destination)."""
+
+    def copy_object(self, from_key: str, to_key: str, timeout=None) -> bool:
+        """Copies an object server-side, falling back to a streamed transfer if the copy API refuses."""
+        resp = self.copy(from_key, to_key, timeout=timeout)
+        if resp.status_code in (200, 201):
+            return True
+        logger.debug(f"↪️ Server-side copy refused for {from_key} (status {resp.status_code}); streaming instead")
+        return self.stream_copy(from_key, to_key, timeout=timeout)
+
+    def move_object(self, from_key: str, to_key: str, timeout=None) -> bool:
+        """Moves an object server-side, falling back to stream copy + delete (e.g. when the destination exists)."""
+        resp = self.move(from_key, to_key, timeout=timeout)
+        if resp.status_code in (200, 201):
+            return True
+        logger.debug(f"↪️ Server-side move refused for {from_key} (status {resp.status_code}); streaming instead")
+        if not self.stream_copy(from_key, to_key, timeout=timeout):
+            return False
+        self.delete(from_key, timeout=timeout)
+        return True
@@ -0,0 +1,164 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from Engine.Files.auth import get_supabase_headers
+from Engine.Files.artifact_cache import cache_invalidate, cache_clear
+from Engine.Files.storage_backend import StorageBackend, STREAM_CHUNK_SIZE, object_changed, transfer_finished
+from Engine.Files.content_index import clear_content_index
+from Engine.Files.local_storage import LocalStorageClient
+from logger import logger
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_BUCKET = "panelitix"
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+SUPABASE_READ_TIMEOUT = float(os.getenv("SUPABASE_READ_TIMEOUT", "60"))
+# "supabase" (REST; point SUPABASE_URL at fake_supabase_server to run offline) or "local" (files under LOCAL_STORAGE_ROOT)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+
+class SupabaseStorageClient(StorageBackend):
+    """
+    Keep-alive client for the Supabase storage REST API.
+    One pooled requests.Session is shared by every caller, and the auth headers
+    are built once, so repeated reads/writes reuse open TCP+TLS connections.
+    Keys are bucket-relative (i.e. they already include SUPABASE_ROOT_FOLDER).
+    Every call that can change an object drops its key from the artifact cache and
+    keeps the content index in step.
+    """
+
+    name = "supabase"
+
+    def __init__(self, base_url=None, bucket=SUPABASE_BUCKET, pool_size=SUPABASE_POOL_SIZE,
+                 connect_timeout=SUPABASE_CONNECT_TIMEOUT, read_timeout=SUPABASE_READ_TIMEOUT):
+        self.base_url = (base_url or SUPABASE_URL or "").rstrip("/")
+        self.bucket = bucket
+        self.timeout = (connect_timeout, read_timeout)
+        self.headers = get_supabase_headers()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+
+        logger.info(f"🔌 Supabase storage client ready (pool size = {pool_size}, timeout = {self.timeout})")
+
+    # --- URL builders ---
+    def object_url(self, key: str) -> str:
+        return f"{self.base_url}/storage/v1/object/{self.bucket}/{key}"
+
+    def info_url(self, key: str) -> str:
+        return f"{self.base_url}/storage/v1/object/info/{self.bucket}/{key}"
+
+    def list_url(self) -> str:
+        return f"{self.base_url}/storage/v1/object/list/{self.bucket}"
+
+    def move_url(self) -> str:
+        return f"{self.base_url}/storage/v1/object/move"
+
+    def copy_url(self) -> str:
+        return f"{self.base_url}/storage/v1/object/copy"
+
+    # --- Core request ---
+    def request(self, method: str, url: str, content_type=None, timeout=None, **kwargs):
+        headers = kwargs.pop("headers", None) or {}
+        if content_type:
+            headers["Content-Type"] = content_type
+        return self.session.request(method, url, headers=headers, timeout=timeout or self.timeout, **kwargs)
+
+    # --- Object operations ---
+    def get(self, key: str, timeout=None, stream: bool = False):
+        return self.request("GET", self.object_url(key), timeout=timeout, stream=stream)
+
+    def put(self, key: str, data, content_type: str = "application/octet-stream", timeout=None):
+        object_changed(key)
+        return self.request("PUT", self.object_url(key), content_type=content_type, timeout=timeout, data=data)
+
+    def post(self, key: str, data, content_type: str = "application/octet-stream", timeout=None):
+        object_changed(key)
+        return self.request("POST", self.object_url(key), content_type=content_type, timeout=timeout, data=data)
+
+    def delete(self, key: str, timeout=None):
+        object_changed(key)
+        return self.request("DELETE", self.object_url(key), timeout=timeout)
+
+    def info(self, key: str, timeout=None):
+        return self.request("GET", self.info_url(key), timeout=timeout)
+
+    def list(self, prefix: str, limit: int = 1000, timeout=None):
+        payload = {"prefix": prefix, "limit": limit}
+        return self.request("POST", self.list_url(), content_type="application/json", timeout=timeout, json=payload)
+
+    # --- Server-side transfers ---
+    def move(self, from_key: str, to_key: str, timeout=None):
+        cache_invalidate(from_key, to_key)
+        payload = {"bucketId": self.bucket, "sourceKey": from_key, "destinationKey": to_key}
+        resp = self.request("POST", self.move_url(), content_type="application/json", timeout=timeout, json=payload)
+        transfer_finished(from_key, to_key, resp.status_code in (200, 201), move=True)
+        return resp
+
+    def copy(self, from_key: str, to_key: str, timeout=None):
+        cache_invalidate(to_key)
+        payload = {"bucketId": self.bucket, "sourceKey": from_key, "destinationKey": to_key}
+        resp = self.request("POST", self.copy_url(), content_type="application/json", timeout=timeout, json=payload)
+        transfer_finished(from_key, to_key, resp.status_code in (200, 201))
+        return resp
+
+    def stream_copy(self, from_key: str, to_key: str, timeout=None) -> bool:
+        """Fallback transfer: pipes the source download straight into the upload without buffering it."""
+        with self.get(from_key, timeout=timeout, stream=True) as get_resp:
+            if get_resp.status_code != 200:
+                logger.warning(f"❌ Stream copy could not fetch {from_key} (status {get_resp.status_code})")
+                return False
+
+            content_type = get_resp.headers.get("Content-Type", "application/octet-stream")
+            cache_invalidate(to_key)
+            put_resp = self.request(
+                "PUT", self.object_url(to_key),
+                content_type=content_type,
+                timeout=timeout,
+                headers={"x-upsert": "true"},
+                data=get_resp.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            )
+            if put_resp.status_code not in (200, 201):
+                logger.warning(f"❌ Stream copy could not write {to_key} (status {put_resp.status_code})")
+                transfer_finished(from_key, to_key, False)
+                return False
+        transfer_finished(from_key, to_key, True)
+        return True
+
+_client = None
+_client_lock = threading.Lock()
+
+def create_storage_client(backend: str = STORAGE_BACKEND) -> StorageBackend:
+    if backend == "supabase":
+        return SupabaseStorageClient()
+    if backend == "local":
+        return LocalStorageClient()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+def get_storage_client() -> StorageBackend:
+    """Returns the process-wide storage client for STORAGE_BACKEND, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_storage_client()
+    return _client
+
+def set_storage_client(client: StorageBackend) -> StorageBackend:
+    """
+    Swaps the process-wide client (e.g. for a benchmark against fake_supabase_server)
+    and returns the previous one. The artifact cache and content index described the
+    old store, so both are emptied.
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    cache_clear()
+    clear_content_index()
+    return previous
+
+def storage_configured() -> bool:
+    return STORAGE_BACKEND != "supabase" or bool(SUPABASE_URL)
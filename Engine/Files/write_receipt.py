@@ -0,0 +1,60 @@
+import os
+import hashlib
+import threading
+from dataclasses import dataclass
+from logger import logger
+from Engine.Files.read_supabase_file import read_supabase_file
+from Engine.Runtime.dispatcher import submit_background, QueueFullError
+
+# Opt-in: re-read every written object in the background and check it against its receipt
+WRITE_VERIFY_ENABLED = os.getenv("WRITE_VERIFY_ENABLED", "false").lower() in ("1", "true", "yes")
+
+_stats = {"verified": 0, "mismatched": 0, "failed": 0, "skipped": 0}
+_lock = threading.Lock()
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+@dataclass(frozen=True)
+class WriteReceipt:
+    """What write_supabase_file acknowledged: the object key, the bytes it sent and their hash."""
+    path: str  # relative to SUPABASE_ROOT_FOLDER
+    key: str  # bucket key
+    length: int
+    sha256: str
+    stored_key: str = None  # the key Supabase echoed back, when it did
+    deduplicated: str = None  # "skipped" or "copied" when the bytes were not uploaded
+
+def verify_receipt(receipt: WriteReceipt) -> bool:
+    """Reads the object back from storage (not the artifact cache) and compares it with the receipt."""
+    try:
+        data = read_supabase_file(receipt.path, binary=True, use_cache=False)
+    except Exception as e:
+        logger.warning(f"⚠️ Write verification could not read {receipt.key}: {e}")
+        _count("failed")
+        return False
+    if len(data) == receipt.length and content_hash(data) == receipt.sha256:
+        logger.debug(f"🧾 Write verified: {receipt.key} ({receipt.length} bytes)")
+        _count("verified")
+        return True
+    logger.error(
+        f"❌ Write verification mismatch for {receipt.key}: wrote {receipt.length} bytes "
+        f"({receipt.sha256[:12]}), stored {len(data)} bytes ({content_hash(data)[:12]})"
+    )
+    _count("mismatched")
+    return False
+
+def schedule_verification(receipt: WriteReceipt):
+    try:
+        submit_background(verify_receipt, receipt)
+    except QueueFullError:
+        logger.debug(f"⏭️ Background lane full; write verification skipped for {receipt.key}")
+        _count("skipped")
+
+def _count(outcome: str):
+    with _lock:
+        _stats[outcome] += 1
+
+def write_verify_stats() -> dict:
+    with _lock:
+        return {**_stats, "enabled": WRITE_VERIFY_ENABLED}
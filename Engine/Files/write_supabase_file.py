@@ -1,19 +1,29 @@
 import os
+import time
 import requests
-from Engine.Files.auth import get_supabase_headers
+from Engine.Files.supabase_client import get_storage_client, SUPABASE_BUCKET, STORAGE_BACKEND, storage_configured
+from Engine.Runtime.completion_registry import signal_completion
+from Engine.Files.artifact_cache import cache_put
+from Engine.Files.write_receipt import WriteReceipt, WRITE_VERIFY_ENABLED, schedule_verification, content_hash
+from Engine.Files.content_index import deduplicate_upload, remember_content
+from Engine.Files.artifact_compression import encode_artifact, record_transfer, ENCODING_CONTENT_TYPES
 from logger import logger
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_BUCKET = "panelitix"
 SUPABASE_ROOT_FOLDER = os.getenv("SUPABASE_ROOT_FOLDER")
 
 logger.info("🌍 ENV VARS (write_supabase_file.py):")
 logger.info(f"   SUPABASE_URL = {SUPABASE_URL}")
 logger.info(f"   SUPABASE_BUCKET = {SUPABASE_BUCKET}")
+logger.info(f"   STORAGE_BACKEND = {STORAGE_BACKEND}")
 logger.info(f"   SUPABASE_ROOT_FOLDER = {SUPABASE_ROOT_FOLDER}")
 
-def write_supabase_file(path, content, content_type=None):
-    if not SUPABASE_URL:
+def write_supabase_file(path, content, content_type=None) -> WriteReceipt:
+    """
+    Uploads `content` under SUPABASE_ROOT_FOLDER and returns a WriteReceipt (key, length,
+    sha256), so callers can return what they wrote instead of reading it back.
+    """
+    if not storage_configured():
         logger.error("❌ SUPABASE_URL is not set in environment variables.")
         raise ValueError("SUPABASE_URL not configured")
 
@@ -27,15 +37,14 @@ def write_supabase_file(path, content, content_type=None):
 
     # 🔹 Compose full Supabase path
     full_path = f"{SUPABASE_ROOT_FOLDER}/{path}"
-    url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{full_path}"
+    client = get_storage_client()
+    url = client.object_url(full_path)
 
     logger.info("📁 Supabase Write Operation Initiated:")
     logger.info(f"   → Relative Path: {path}")
     logger.info(f"   → Full Path: {full_path}")
     logger.info(f"   → Target URL: {url}")
 
-    headers = get_supabase_headers()
-
     # --- Encode content and log preview ---
     if isinstance(content, str):
         try:
@@ -57,38 +66,60 @@ def write_supabase_file(path, content, content_type=None):
 
     # --- Determine Content-Type ---
     if content_type:
-        headers["Content-Type"] = content_type
         logger.debug(f"🧾 Custom Content-Type provided: {content_type}")
     elif path.endswith(".csv"):
-        headers["Content-Type"] = "text/csv; charset=utf-8"
+        content_type = "text/csv; charset=utf-8"
         logger.debug("🧾 CSV file detected. Using Content-Type: text/csv")
     elif path.endswith(".txt"):
-        headers["Content-Type"] = "text/plain; charset=utf-8"
+        content_type = "text/plain; charset=utf-8"
         logger.debug("📑 TXT file detected. Using Content-Type: text/plain")
     else:
-        headers["Content-Type"] = "application/octet-stream"
+        content_type = "application/octet-stream"
         logger.debug("📦 Unknown file type. Defaulting to application/octet-stream")
 
-    logger.debug(f"📦 Final headers: {headers}")
+    # --- Compress large text artifacts (read_supabase_file decompresses them transparently) ---
+    stored, encoding, codec_seconds = encode_artifact(path, data)
+    if encoding:
+        content_type = ENCODING_CONTENT_TYPES[encoding]
+        logger.info(f"🗜️ Compressed with {encoding}: {len(data)} → {len(stored)} bytes")
 
-    # --- Upload to Supabase ---
-    try:
-        logger.info(f"🚀 Initiating PUT request to Supabase at: {url}")
-        response = requests.put(url, headers=headers, data=data)
+    digest = content_hash(data)
+    returned_key = None
 
-        logger.info(f"📡 Supabase response status: {response.status_code}")
-        logger.debug(f"📨 Supabase raw response: {response.text}")
+    # --- Upload to Supabase (skipped or server-copied for byte-identical content) ---
+    try:
+        deduplicated = deduplicate_upload(client, full_path, digest, len(stored), content_type)
+        if not deduplicated:
+            logger.info(f"🚀 Initiating PUT request to Supabase at: {url}")
+            start = time.perf_counter()
+            response = client.put(full_path, stored, content_type=content_type)
+
+            logger.info(f"📡 Supabase response status: {response.status_code}")
+            logger.debug(f"📨 Supabase raw response: {response.text}")
+
+            response.raise_for_status()
+            if encoding:
+                record_transfer("write", len(data), len(stored), codec_seconds, time.perf_counter() - start)
+
+            # Final check
+            try:
+                returned_key = response.json().get("Key")
+                logger.info(f"🔑 Supabase confirmed object key: {returned_key}")
+            except Exception as parse_err:
+                logger.warning("⚠️ Unable to parse JSON response from Supabase.")
 
-        response.raise_for_status()
+        logger.info(f"✅ File successfully written to Supabase at: {full_path}")
+        remember_content(full_path, digest, len(stored), content_type)
+        cache_put(full_path, data)
 
-        # Final check
-        try:
-            returned_key = response.json().get("Key")
-            logger.info(f"🔑 Supabase confirmed object key: {returned_key}")
-        except Exception as parse_err:
-            logger.warning("⚠️ Unable to parse JSON response from Supabase.")
+        # Wake any in-process read_* callers waiting on this artifact
+        signal_completion(path)
 
-        logger.info(f"✅ File successfully written to Supabase at: {full_path}")
+        receipt = WriteReceipt(path=path, key=full_path, length=len(data), sha256=digest,
+                               stored_key=returned_key, deduplicated=deduplicated)
+        if WRITE_VERIFY_ENABLED:
+            schedule_verification(receipt)
+        return receipt
 
     except requests.exceptions.RequestException as e:
         logger.error(f"❌ Supabase write failed: {e}")
@@ -0,0 +1,226 @@
+import os
+import time
+import numpy as np
+from dataclasses import replace
+from decimal import Decimal, ROUND_HALF_UP
+from logger import logger
+from Engine.Runtime.structured_output import Prompt1Thinking
+
+CHANGE_EFFECT_SENSITIVITY_ENABLED = os.getenv("CHANGE_EFFECT_SENSITIVITY_ENABLED", "false").lower() in ("1", "true", "yes")
+CHANGE_EFFECT_SAMPLES = int(os.getenv("CHANGE_EFFECT_SAMPLES", "5000"))
+CHANGE_EFFECT_MAKEUP_SPREAD = float(os.getenv("CHANGE_EFFECT_MAKEUP_SPREAD", "0.15"))  # relative s.d. of each makeup
+CHANGE_EFFECT_CHANGE_SPREAD = float(os.getenv("CHANGE_EFFECT_CHANGE_SPREAD", "1.0"))   # s.d. of each change, in points
+CHANGE_EFFECT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# --- Fixed-point helpers (values are integer tenths of a percent) ---
+def parse_tenths(value: str):
+    """'12.34%' → (123, False): the 1dp half-up value in tenths, and whether its Decimal is signed (-0.0 included)."""
+    quantized = Decimal(value.replace('%', '').strip()).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+    return int(quantized.scaleb(1)), quantized.is_signed()
+
+def divide_half_up(numerator, denominator: int):
+    """Integer division rounding halves away from zero, as Decimal ROUND_HALF_UP does."""
+    return np.sign(numerator) * ((np.abs(numerator) + denominator // 2) // denominator)
+
+def format_tenths(tenths: int, negative: bool = False) -> str:
+    """123 → '12.3%'; a zero keeps Decimal's sign ('-0.0%') when the product it came from was negative."""
+    sign = "-" if tenths < 0 or (tenths == 0 and negative) else ""
+    return f"{sign}{abs(tenths) // 10}.{abs(tenths) % 10}%"
+
+def format_tenths_integer(tenths: int) -> str:
+    """123 → '12%', rounding halves to even like round() on the Decimal did."""
+    whole, remainder = divmod(abs(tenths), 10)
+    if remainder > 5 or (remainder == 5 and whole % 2 == 1):
+        whole += 1
+    return f"{-whole if tenths < 0 else whole}%"
+
+# --- Engine ---
+class ChangeEffectModel:
+    """
+    Prompt 1's makeups and changes held as arrays: makeups in integer tenths of a
+    percent, changes as whole percents, and each sub-section's section index. Every
+    calculation stays in integers, so the rounding matches the Decimal maths it
+    replaced exactly, and a leading scenario axis lets the same code run one report
+    or thousands of perturbed copies of it.
+    """
+
+    def __init__(self, section_makeup, section_makeup_signed, sub_makeup, sub_makeup_signed, sub_change, sub_section, section_numbers=None):
+        self.section_makeup = np.asarray(section_makeup, dtype=np.int64)
+        self.section_makeup_signed = np.asarray(section_makeup_signed, dtype=bool)
+        self.sub_makeup = np.asarray(sub_makeup, dtype=np.int64)
+        self.sub_makeup_signed = np.asarray(sub_makeup_signed, dtype=bool)
+        self.sub_change = np.asarray(sub_change, dtype=np.int64)
+        self.sub_section = np.asarray(sub_section, dtype=np.int64)
+        self.section_numbers = list(section_numbers or range(1, len(self.section_makeup) + 1))
+        # Sub-sections are listed section by section, so each section's are one contiguous run
+        if np.any(np.diff(self.sub_section) < 0):
+            raise ValueError("sub-sections must be grouped by section, in section order")
+        counts = np.bincount(self.sub_section, minlength=len(self.section_makeup))
+        self.run_starts = (np.cumsum(counts) - counts)[counts > 0]
+        self.has_sub_sections = counts > 0
+        # Which values failed to parse (and so count as zero); set by from_thinking
+        self.section_invalid = np.zeros(len(self.section_makeup), dtype=bool)
+        self.sub_invalid = np.zeros(len(self.sub_makeup), dtype=bool)
+
+    def section_sums(self, values):
+        """Sums (scenarios, sub-sections) values per section; a section with no sub-sections sums to 0."""
+        sums = np.zeros(values.shape[:-1] + (len(self.section_makeup),), dtype=values.dtype)
+        if len(self.run_starts):
+            sums[..., self.has_sub_sections] = np.add.reduceat(values, self.run_starts, axis=-1)
+        return sums
+
+    @classmethod
+    def from_thinking(cls, thinking: Prompt1Thinking):
+        """Parses the makeup/change strings once; a value that fails to parse counts as zero, as before."""
+        section_makeup, section_signed, section_invalid = [], [], []
+        sub_makeup, sub_signed, sub_change, sub_section, sub_invalid = [], [], [], [], []
+        for index, section in enumerate(thinking.sections):
+            try:
+                tenths, signed = parse_tenths(section.makeup)
+                invalid = False
+            except Exception:
+                tenths, signed, invalid = 0, False, True
+            section_makeup.append(tenths)
+            section_signed.append(signed)
+            section_invalid.append(invalid)
+
+            for sub in section.sub_sections:
+                try:
+                    tenths, signed = parse_tenths(sub.makeup)
+                    change = int(round(float(sub.change.replace('%', '').strip())))  # force integer
+                    invalid = False
+                except Exception:
+                    tenths, signed, change, invalid = 0, False, 0, True
+                sub_makeup.append(tenths)
+                sub_signed.append(signed)
+                sub_change.append(change)
+                sub_section.append(index)
+                sub_invalid.append(invalid)
+
+        model = cls(
+            section_makeup, section_signed, sub_makeup, sub_signed, sub_change, sub_section,
+            section_numbers=[section.number for section in thinking.sections]
+        )
+        model.section_invalid[:] = section_invalid
+        model.sub_invalid[:] = sub_invalid
+        return model
+
+    def compute(self, sub_makeup=None, sub_change=None, section_makeup=None) -> dict:
+        """
+        Sub-section effects, section changes/effects and the report change, in tenths.
+        Inputs default to the report's own values; pass (scenarios, n) arrays to run
+        many scenarios at once (results then carry the same leading axis).
+        """
+        sub_makeup = np.atleast_2d(self.sub_makeup if sub_makeup is None else sub_makeup)
+        sub_change = np.atleast_2d(self.sub_change if sub_change is None else sub_change)
+        section_makeup = np.atleast_2d(self.section_makeup if section_makeup is None else section_makeup)
+
+        # effect = makeup/100 × change  →  in tenths: makeup_tenths × change / 100
+        sub_effect = divide_half_up(sub_makeup * sub_change, 100)
+        section_change = self.section_sums(sub_effect)
+        # effect = makeup/100 × change  →  in tenths: makeup_tenths × change_tenths / 1000
+        section_effect = divide_half_up(section_makeup * section_change, 1000)
+        report_change = section_effect.sum(axis=-1)
+        return {
+            "sub_effect": sub_effect,
+            "section_change": section_change,
+            "section_effect": section_effect,
+            "report_change": report_change
+        }
+
+    def sub_section_strings(self, index: int, sub_effect: int) -> dict:
+        """One sub-section's makeup/change/effect strings, formatted as the Decimal maths did."""
+        makeup = int(self.sub_makeup[index])
+        change = int(self.sub_change[index])
+        return {
+            "makeup": format_tenths_integer(makeup),
+            "change": format_tenths(change * 10),
+            # Decimal keeps the sign of a zero product (0.0 × -3 → -0.0)
+            "effect": format_tenths(int(sub_effect), bool(self.sub_makeup_signed[index]) != (change < 0))
+        }
+
+    def section_strings(self, index: int, section_change: int, section_effect: int) -> dict:
+        section_change = int(section_change)
+        return {
+            "makeup": format_tenths_integer(int(self.section_makeup[index])),
+            "change": format_tenths(section_change),
+            "effect": format_tenths(int(section_effect), bool(self.section_makeup_signed[index]) != (section_change < 0))
+        }
+
+    def apply(self, thinking: Prompt1Thinking) -> Prompt1Thinking:
+        """Writes the computed makeup/change/effect strings back onto a copy of the thinking."""
+        result = {key: values[0] for key, values in self.compute().items()}
+        sub_index = 0
+        sections = []
+        for index, section in enumerate(thinking.sections):
+            sub_sections = []
+            for sub in section.sub_sections:
+                sub_sections.append(replace(sub, **self.sub_section_strings(sub_index, result["sub_effect"][sub_index])))
+                sub_index += 1
+
+            sections.append(replace(
+                section,
+                **self.section_strings(index, result["section_change"][index], result["section_effect"][index]),
+                sub_sections=sub_sections
+            ))
+
+        return Prompt1Thinking(sections=sections, report_change=format_tenths(int(result["report_change"])))
+
+    def sensitivity(self, samples: int = CHANGE_EFFECT_SAMPLES, makeup_spread: float = CHANGE_EFFECT_MAKEUP_SPREAD,
+                    change_spread: float = CHANGE_EFFECT_CHANGE_SPREAD, percentiles=CHANGE_EFFECT_PERCENTILES, seed=None) -> dict:
+        """
+        Monte Carlo bands for the Report Change and each Section Effect. Each scenario
+        scales every makeup by a normal factor (rescaled so each section's makeups keep
+        their total) and shifts every change by a normal amount, then runs the same
+        rounding as the point estimate.
+        """
+        rng = np.random.default_rng(seed)
+
+        def scaled(values):
+            factors = rng.standard_normal((samples, len(values)), dtype=np.float32) * makeup_spread + 1.0
+            return values / 10 * np.clip(factors, 0, None)
+
+        def tenths(percent):
+            return (np.sign(percent) * np.floor(np.abs(percent) * 10 + 0.5)).astype(np.int64)
+
+        sub_makeup = scaled(self.sub_makeup)
+        section_makeup = scaled(self.section_makeup)
+        sub_change = self.sub_change + rng.standard_normal((samples, len(self.sub_change)), dtype=np.float32) * change_spread
+
+        # Keep the makeups compositional: scale each group back to its original total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sub_rescale = np.nan_to_num(self.section_sums(self.sub_makeup[None, :] / 10) / self.section_sums(sub_makeup))
+            sub_makeup *= sub_rescale[:, self.sub_section]
+            section_makeup *= np.nan_to_num(self.section_makeup.sum() / 10 / section_makeup.sum(axis=1, keepdims=True))
+
+        result = self.compute(
+            sub_makeup=tenths(sub_makeup),
+            sub_change=np.rint(sub_change).astype(np.int64),
+            section_makeup=tenths(section_makeup)
+        )
+        point = self.compute()
+        report_bands = np.percentile(result["report_change"] / 10, percentiles)
+        section_bands = np.percentile(result["section_effect"] / 10, percentiles, axis=0)
+
+        def bands(values):
+            return {f"p{p}": f"{value:.1f}%" for p, value in zip(percentiles, values)}
+
+        return {
+            "samples": samples,
+            "makeup_spread": makeup_spread,
+            "change_spread": change_spread,
+            "report_change": {"point": format_tenths(int(point["report_change"][0])), **bands(report_bands)},
+            "section_effects": [
+                {"section": number, "point": format_tenths(int(point["section_effect"][0][index])), **bands(section_bands[:, index])}
+                for index, number in enumerate(self.section_numbers)
+            ]
+        }
+
+def compute_change_effect(thinking: Prompt1Thinking) -> Prompt1Thinking:
+    return ChangeEffectModel.from_thinking(thinking).apply(thinking)
+
+def change_effect_sensitivity(thinking: Prompt1Thinking, **kwargs) -> dict:
+    start = time.perf_counter()
+    bands = ChangeEffectModel.from_thinking(thinking).sensitivity(**kwargs)
+    logger.info(f"🎲 Change/effect sensitivity: {bands['samples']} scenarios in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return bands
@@ -0,0 +1,54 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from logger import logger
+
+COMPLETION_REGISTRY_MAX_ENTRIES = int(os.getenv("COMPLETION_REGISTRY_MAX_ENTRIES", "4096"))
+COMPLETION_REGISTRY_TTL_SECONDS = float(os.getenv("COMPLETION_REGISTRY_TTL_SECONDS", "3600"))
+
+# Artifact paths embed the run_id (e.g. Ai_Responses/Prompt_1_Thinking/{run_id}.txt),
+# so keying on the path keys every completion by stage and run. Only the event is kept:
+# the payload itself is served from the artifact cache by read_supabase_file.
+_completed = OrderedDict()  # path -> completed_at
+_condition = threading.Condition()
+
+def _evict_expired(now: float):
+    while _completed:
+        completed_at = next(iter(_completed.values()))
+        if now - completed_at <= COMPLETION_REGISTRY_TTL_SECONDS and len(_completed) <= COMPLETION_REGISTRY_MAX_ENTRIES:
+            break
+        _completed.popitem(last=False)
+
+def _fresh(path: str, now: float) -> bool:
+    completed_at = _completed.get(path)
+    return completed_at is not None and now - completed_at <= COMPLETION_REGISTRY_TTL_SECONDS
+
+def signal_completion(path: str):
+    """Records that the artifact at `path` has been written and wakes any in-process readers waiting on it."""
+    with _condition:
+        now = time.monotonic()
+        _completed.pop(path, None)
+        _completed[path] = now
+        _evict_expired(now)
+        _condition.notify_all()
+    logger.debug(f"🔔 Completion signalled for: {path}")
+
+def is_completed(path: str) -> bool:
+    """True if a writer in this process has signalled `path` (within the TTL)."""
+    with _condition:
+        return _fresh(path, time.monotonic())
+
+def wait_for_completion(path: str, timeout: float) -> bool:
+    """
+    Blocks until `path` is signalled (within the TTL) or `timeout` seconds pass.
+    Returns False on timeout (the writer may be in another process).
+    """
+    deadline = time.monotonic() + timeout
+    with _condition:
+        while not _fresh(path, time.monotonic()):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _condition.wait(remaining)
+    return True
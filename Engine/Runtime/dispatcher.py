@@ -0,0 +1,86 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from logger import logger
+
+DISPATCH_BLOCKING_WORKERS = int(os.getenv("DISPATCH_BLOCKING_WORKERS", "8"))
+DISPATCH_BLOCKING_QUEUE_LIMIT = int(os.getenv("DISPATCH_BLOCKING_QUEUE_LIMIT", "16"))
+DISPATCH_BACKGROUND_WORKERS = int(os.getenv("DISPATCH_BACKGROUND_WORKERS", "4"))
+DISPATCH_BACKGROUND_QUEUE_LIMIT = int(os.getenv("DISPATCH_BACKGROUND_QUEUE_LIMIT", "32"))
+DISPATCH_RETRY_AFTER_SECONDS = int(os.getenv("DISPATCH_RETRY_AFTER_SECONDS", "30"))
+
+class QueueFullError(Exception):
+    """Raised when a lane already holds as many running + queued tasks as it allows."""
+
+    def __init__(self, lane: str, retry_after: int = DISPATCH_RETRY_AFTER_SECONDS):
+        super().__init__(f"Dispatch lane '{lane}' is full. Retry after {retry_after}s.")
+        self.lane = lane
+        self.retry_after = retry_after
+
+class DispatchLane:
+    """
+    A bounded executor lane. At most `workers` tasks run at once and at most
+    `queue_limit` more wait behind them; anything beyond that is rejected
+    immediately with QueueFullError instead of spawning another thread.
+    """
+
+    def __init__(self, name: str, workers: int, queue_limit: int):
+        self.name = name
+        self.capacity = workers + queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"dispatch-{name}")
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def depth(self) -> int:
+        return self._pending
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queues fn on this lane. The returned Future carries a `timing` dict whose
+        `queue_wait_seconds` is filled in when a worker picks the task up.
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"🚦 Dispatch lane '{self.name}' full ({self.capacity} tasks); rejecting")
+            raise QueueFullError(self.name)
+
+        with self._pending_lock:
+            self._pending += 1
+
+        enqueued_at = time.perf_counter()
+        timing = {"lane": self.name, "queue_wait_seconds": None}
+
+        def run():
+            timing["queue_wait_seconds"] = round(time.perf_counter() - enqueued_at, 3)
+            logger.debug(f"⏳ Lane '{self.name}' task waited {timing['queue_wait_seconds']}s in queue")
+            return fn(*args, **kwargs)
+
+        def release(_):
+            with self._pending_lock:
+                self._pending -= 1
+            self._slots.release()
+
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            release(None)
+            raise
+        future.timing = timing
+        future.add_done_callback(release)
+        return future
+
+blocking_lane = DispatchLane("blocking", DISPATCH_BLOCKING_WORKERS, DISPATCH_BLOCKING_QUEUE_LIMIT)
+background_lane = DispatchLane("background", DISPATCH_BACKGROUND_WORKERS, DISPATCH_BACKGROUND_QUEUE_LIMIT)
+
+def _log_background_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error("❌ Background task failed", exc_info=error)
+
+def submit_background(fn, *args, **kwargs):
+    """Runs fn on the shared background lane (replaces ad-hoc threading.Thread(...).start() calls)."""
+    future = background_lane.submit(fn, *args, **kwargs)
+    future.add_done_callback(_log_background_failure)
+    return future
@@ -0,0 +1,179 @@
+import os
+import time
+import threading
+import numpy as np
+from collections import OrderedDict
+from dataclasses import replace
+from logger import logger
+from Engine.Runtime.structured_output import Prompt1Thinking
+from Engine.Runtime.report_model import Report
+from Engine.Runtime.change_effect import ChangeEffectModel, parse_tenths, divide_half_up, format_tenths
+
+EFFECT_TREE_MAX_RUNS = int(os.getenv("EFFECT_TREE_MAX_RUNS", "64"))
+
+class EffectTree:
+    """
+    A finished run's change/effect maths kept live for what-if edits: the Prompt 1
+    inputs, their ChangeEffectModel, the computed effects, and (for pipeline runs)
+    the formatted Report the table CSVs were written from. A delta to one
+    sub-section recomputes that sub-section, its section and the report total only.
+    """
+
+    def __init__(self, thinking: Prompt1Thinking, report: Report = None, artifacts: dict = None):
+        # Private copies: deltas edit these in place
+        self.thinking = replace(thinking, sections=list(thinking.sections))
+        self.model = ChangeEffectModel.from_thinking(thinking)
+        self.output = self.model.apply(thinking)
+        result = {key: values[0].copy() for key, values in self.model.compute().items()}
+        self.sub_effect = result["sub_effect"]
+        self.section_change = result["section_change"]
+        self.section_effect = result["section_effect"]
+        self.report = Report.from_dict(report.to_dict()) if report is not None else None
+        # Where the artifacts a delta rewrites were delivered (csv_content, report_table, section_table_2, ...)
+        self.artifacts = dict(artifacts or {})
+        self.revision = 0
+        self.dirty_sections = set()
+        self.lock = threading.RLock()
+        self.persist_lock = threading.Lock()
+
+        self.sub_index = {}
+        flat = 0
+        for index, section in enumerate(thinking.sections):
+            for sub in section.sub_sections:
+                self.sub_index[(section.number, sub.number)] = (index, flat)
+                flat += 1
+        self.runs = np.searchsorted(self.model.sub_section, np.arange(len(thinking.sections) + 1))
+
+    def apply_delta(self, section: int, sub_section: int, makeup: str = None, change: str = None) -> dict:
+        """Sets one sub-section's makeup and/or change ("12.5%", "-3%") and returns what changed."""
+        start = time.perf_counter()
+        try:
+            key = (int(section), int(sub_section))
+        except (TypeError, ValueError):
+            raise ValueError(f"section and sub_section must be numbers, got {section!r} and {sub_section!r}")
+        if key not in self.sub_index:
+            raise ValueError(f"No Sub-Section {key[0]}.{key[1]} in this run")
+        if makeup is None and change is None:
+            raise ValueError("A delta needs a makeup and/or a change")
+
+        # Parse both before touching the model, so a bad value leaves the run as it was
+        try:
+            parsed_makeup = parse_tenths(str(makeup)) if makeup is not None else None
+            parsed_change = int(round(float(str(change).replace('%', '').strip()))) if change is not None else None  # force integer
+        except Exception:
+            raise ValueError(f"Invalid makeup/change: {makeup!r} / {change!r}")
+
+        with self.lock:
+            index, flat = self.sub_index[key]
+            model = self.model
+            if parsed_makeup is not None:
+                model.sub_makeup[flat], model.sub_makeup_signed[flat] = parsed_makeup
+            if parsed_change is not None:
+                model.sub_change[flat] = parsed_change
+
+            # Only this sub-section's effect, its section's sums and the report total move
+            self.sub_effect[flat] = divide_half_up(model.sub_makeup[flat] * model.sub_change[flat], 100)
+            self.section_change[index] = self.sub_effect[self.runs[index]:self.runs[index + 1]].sum()
+            self.section_effect[index] = divide_half_up(model.section_makeup[index] * self.section_change[index], 1000)
+            report_change = format_tenths(int(self.section_effect.sum()))
+
+            sub_strings = model.sub_section_strings(flat, self.sub_effect[flat])
+            section_strings = model.section_strings(index, self.section_change[index], self.section_effect[index])
+            self._update_thinking(index, sub_section, makeup, change, sub_strings, section_strings, report_change)
+            if self.report is not None:
+                self._update_report(index, sub_section, sub_strings, section_strings, report_change)
+
+            self.revision += 1
+            self.dirty_sections.add(index)
+            return {
+                "revision": self.revision,
+                "section": {"number": key[0], **section_strings},
+                "sub_section": {"number": key[1], **sub_strings},
+                "report_change": report_change,
+                "compute_ms": round((time.perf_counter() - start) * 1000, 3)
+            }
+
+    def _update_thinking(self, index, sub_number, makeup, change, sub_strings, section_strings, report_change):
+        # Inputs keep the analyst's raw values (checkpoints rebuild from them); output gets the maths
+        section = self.thinking.sections[index]
+        inputs = {name: value for name, value in (("makeup", makeup), ("change", change)) if value is not None}
+        self.thinking.sections[index] = replace(section, sub_sections=[
+            replace(sub, **inputs) if sub.number == sub_number else sub for sub in section.sub_sections
+        ])
+        section = self.output.sections[index]
+        self.output.sections[index] = replace(section, **section_strings, sub_sections=[
+            replace(sub, **sub_strings) if sub.number == sub_number else sub for sub in section.sub_sections
+        ])
+        self.output.report_change = report_change
+
+    def _update_report(self, index, sub_number, sub_strings, section_strings, report_change):
+        section = next((node for node in self.report.sections if node.number == self.output.sections[index].number), None)
+        if section is None:
+            return
+        self.report.report_change = report_change
+        for name, value in section_strings.items():
+            setattr(section, name, value)
+        for row in self.report.report_table:
+            if row.title.casefold() == section.title.casefold():
+                row.makeup, row.change, row.effect = section_strings["makeup"], section_strings["change"], section_strings["effect"]
+
+        sub = next((node for node in section.sub_sections if node.number == sub_number), None)
+        if sub is None:
+            return
+        for name, value in sub_strings.items():
+            setattr(sub, name, value)
+        # Prompt 4 titles the table rows itself; match on title, else on position
+        rows = [row for row in section.table if row.title.casefold() == sub.title.casefold()]
+        if not rows and len(section.table) == len(section.sub_sections):
+            rows = [section.table[section.sub_sections.index(sub)]]
+        for row in rows:
+            row.makeup, row.change, row.effect = sub_strings["makeup"], sub_strings["change"], sub_strings["effect"]
+
+    def snapshot(self) -> dict:
+        """A consistent copy of what a persist writes; takes (and clears) the dirty sections."""
+        with self.lock:
+            dirty, self.dirty_sections = self.dirty_sections, set()
+            return {
+                "revision": self.revision,
+                "dirty_sections": sorted(dirty),
+                # Deltas replace section objects rather than mutating them, so a list copy is enough
+                "output": replace(self.output, sections=list(self.output.sections)),
+                "report": Report.from_dict(self.report.to_dict()) if self.report is not None else None,
+                "checkpoint": self.to_checkpoint()
+            }
+
+    def to_checkpoint(self) -> dict:
+        with self.lock:
+            return {
+                "thinking": self.thinking.to_json(),
+                "report": self.report.to_dict() if self.report is not None else None,
+                "artifacts": self.artifacts,
+                "revision": self.revision
+            }
+
+    @classmethod
+    def from_checkpoint(cls, data: dict):
+        report = Report.from_dict(data["report"]) if data.get("report") else None
+        tree = cls(Prompt1Thinking.from_json(data["thinking"]), report=report, artifacts=data.get("artifacts"))
+        tree.revision = data.get("revision", 0)
+        return tree
+
+_trees = OrderedDict()  # run_id -> EffectTree, least recently used first
+_lock = threading.Lock()
+
+def register_effect_tree(run_id: str, tree: EffectTree) -> EffectTree:
+    with _lock:
+        _trees.pop(run_id, None)
+        _trees[run_id] = tree
+        while len(_trees) > EFFECT_TREE_MAX_RUNS:
+            evicted, _ = _trees.popitem(last=False)
+            logger.debug(f"🌳 Effect tree evicted: {evicted}")
+    return tree
+
+def get_effect_tree(run_id: str):
+    """Returns the run's in-memory tree, or None if this process does not hold it."""
+    with _lock:
+        tree = _trees.get(run_id)
+        if tree is not None:
+            _trees.move_to_end(run_id)
+        return tree
@@ -0,0 +1,169 @@
+import os
+import csv
+import io
+import time
+import numpy as np
+from decimal import Decimal, ROUND_HALF_UP
+from logger import logger
+from Engine.Runtime.structured_output import Prompt1Thinking
+from Engine.Runtime.change_effect import ChangeEffectModel, format_tenths
+
+# Typical (Es, Ed) pairs from the Elasticity_Analysis prompt
+ELASTICITY_PRESETS = {
+    "agricultural": (0.4, -0.3),
+    "industrial": (0.8, -0.5)
+}
+ELASTICITY_COMMODITY_TYPE = os.getenv("ELASTICITY_COMMODITY_TYPE", "agricultural")
+ELASTICITY_SUMMARY_DRIVERS = int(os.getenv("ELASTICITY_SUMMARY_DRIVERS", "4"))
+
+# Column order of "MASTER elasticity_csv (with formula).xlsx"
+ELASTICITY_COLUMNS = [
+    "commodity", "report_date", "region", "time_range", "report_title", "report_executive_summary",
+    "supply_change", "supply_elasticity", "supply_summary",
+    "demand_change", "demand_elasticity", "demand_summary",
+    "elasticity_change", "elasticity_summary", "elasticity_calculation"
+]
+
+# --- Formatting (Excel TEXT() rounds halves away from zero) ---
+def format_fixed(value: float, places: int) -> str:
+    """TEXT(value, "0.0") for `places` decimals."""
+    return str(Decimal(repr(float(value))).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP))
+
+def format_percent(value: float) -> str:
+    """-0.25 → '-0.25%', 2.9 → '2.9%': the value as given, to at most two decimals."""
+    text = format_fixed(value + 0.0, 2)  # + 0.0 turns -0.0 into 0.0
+    return f"{text[:-1] if text.endswith('0') else text}%"
+
+def format_hundredths(hundredths: int) -> str:
+    """414 → '4.14%'."""
+    sign = "-" if hundredths < 0 else ""
+    return f"{sign}{abs(hundredths) // 100}.{abs(hundredths) % 100:02d}%"
+
+# --- Engine ---
+def price_change(supply_percent, demand_percent, supply_elasticity, demand_elasticity) -> dict:
+    """
+    Expected Price Change = (Demand% - Supply%) / (Es + |Ed|), for any number of reports
+    at once. Changes are percentages at full precision, as the spreadsheet divides
+    them; only the result is rounded, to hundredths (the sheet's "0.00%") and to
+    tenths (its ROUND(..., 3)), both half away from zero like Excel.
+    """
+    supply_percent = np.asarray(supply_percent, dtype=float)
+    demand_percent = np.asarray(demand_percent, dtype=float)
+    # Rounded so 0.4 + |-0.3| divides as 0.7, not 0.7000000000000001
+    denominator = np.round(np.asarray(supply_elasticity, dtype=float) + np.abs(np.asarray(demand_elasticity, dtype=float)), 9)
+    if np.any(denominator <= 0):
+        raise ValueError("Es + |Ed| must be positive")
+
+    difference = demand_percent - supply_percent
+    raw_percent = difference / denominator
+
+    def half_up(values):
+        # Rounded to 9 places first so float noise cannot tip an exact half (like Excel's 15 digits)
+        values = np.round(values, 9)
+        return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+    return {
+        "difference": difference,
+        "denominator": denominator,
+        "price_change_hundredths": half_up(raw_percent * 100),
+        "price_change": half_up(raw_percent * 10)
+    }
+
+def top_drivers(thinking: Prompt1Thinking, section_effect, count: int = ELASTICITY_SUMMARY_DRIVERS) -> str:
+    """The sections with the largest effects, one "Title: effect" line each, as summary bullets."""
+    order = np.argsort(-np.abs(section_effect), kind="stable")[:count]
+    return "\n".join(f"{thinking.sections[i].title}: {format_tenths(int(section_effect[i]))}" for i in order)
+
+def resolve_elasticities(report: dict):
+    """Explicit supply/demand elasticities win; otherwise the commodity type's preset."""
+    commodity_type = (report.get("commodity_type") or ELASTICITY_COMMODITY_TYPE).lower()
+    if commodity_type not in ELASTICITY_PRESETS:
+        raise ValueError(f"Unknown commodity type {commodity_type!r}; expected one of {sorted(ELASTICITY_PRESETS)}")
+    preset_supply, preset_demand = ELASTICITY_PRESETS[commodity_type]
+    supply = float(report.get("supply_elasticity", preset_supply))
+    demand = float(report.get("demand_elasticity", preset_demand))
+    return supply, demand, commodity_type
+
+def change_percent(report: dict, side: str):
+    """
+    Reads `<side>_thinking` (a supply/demand report's Prompt 1 table, typed or JSON)
+    or, failing that, a `<side>_percentage` such as "-0.25%". Returns (percent, summary),
+    the percentage unrounded.
+    """
+    thinking = report.get(f"{side}_thinking")
+    if thinking is not None:
+        if not isinstance(thinking, Prompt1Thinking):
+            thinking = Prompt1Thinking.from_json(thinking)
+        # The supply/demand report's overall change, straight from its makeup/change table
+        result = ChangeEffectModel.from_thinking(thinking).compute()
+        summary = report.get(f"{side}_summary") or top_drivers(thinking, result["section_effect"][0])
+        return int(result["report_change"][0]) / 10, summary
+    percentage = report.get(f"{side}_percentage")
+    if percentage is None:
+        raise ValueError(f"Missing {side}_thinking or {side}_percentage")
+    return float(Decimal(str(percentage).replace("%", "").strip())), report.get(f"{side}_summary", "")
+
+def elasticity_rows(reports: list) -> list:
+    """One elasticity_csv row per report; the price maths runs once across the batch."""
+    start = time.perf_counter()
+    supply, demand, supply_elasticity, demand_elasticity, details = [], [], [], [], []
+    for report in reports:
+        supply_change, supply_summary = change_percent(report, "supply")
+        demand_change, demand_summary = change_percent(report, "demand")
+        es, ed, commodity_type = resolve_elasticities(report)
+        supply.append(supply_change)
+        demand.append(demand_change)
+        supply_elasticity.append(es)
+        demand_elasticity.append(ed)
+        details.append((supply_summary, demand_summary, commodity_type))
+
+    result = price_change(supply, demand, supply_elasticity, demand_elasticity)
+
+    rows = []
+    for i, report in enumerate(reports):
+        supply_summary, demand_summary, commodity_type = details[i]
+        supply_change = format_percent(supply[i])
+        demand_change = format_percent(demand[i])
+        elasticity_change = format_tenths(int(result["price_change"][i]))
+        es, ed = supply_elasticity[i], demand_elasticity[i]
+        commodity = report.get("commodity", "")
+        region = report.get("region", "")
+        time_range = report.get("time_range", "")
+
+        rows.append({
+            "commodity": commodity,
+            "report_date": report.get("report_date", ""),
+            "region": region,
+            "time_range": time_range,
+            "report_title": f"How Supply and Demand Pressures Will Affect the Price of {commodity} in the {region} Over the Next {time_range}",
+            "report_executive_summary": (
+                f"Supply is forecast to change by {supply_change} and demand by {demand_change} over the next {time_range}. "
+                f"With {commodity_type} elasticities, the expected price change for {commodity} is {elasticity_change}."
+            ),
+            "supply_change": supply_change,
+            "supply_elasticity": f"{es:g}",
+            "supply_summary": supply_summary,
+            "demand_change": demand_change,
+            "demand_elasticity": f"{ed:g}",
+            "demand_summary": demand_summary,
+            "elasticity_change": elasticity_change,
+            "elasticity_summary": report.get("elasticity_summary") or (
+                f"Typical {commodity_type} commodity elasticities: supply {es:g}, demand {ed:g}."
+            ),
+            # The spreadsheet's elasticity_calculation formula, rendered the same way
+            "elasticity_calculation": (
+                f"Expected Price Change = ({demand_change} - ({supply_change})) / ({es:g} + |{format_fixed(ed, 1)}|) = "
+                f"[{format_percent(result['difference'][i])} / {format_fixed(result['denominator'][i], 1)}] = "
+                f"{format_hundredths(int(result['price_change_hundredths'][i]))}, rounded to {elasticity_change}."
+            )
+        })
+
+    logger.info(f"📈 Elasticity analysis: {len(rows)} report(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return rows
+
+def elasticity_csv(rows: list) -> str:
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=ELASTICITY_COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue()
@@ -0,0 +1,46 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logger import logger
+
+FINALISER_CONCURRENCY = int(os.getenv("FINALISER_CONCURRENCY", "8"))
+
+def run_operations(operations, concurrency: int = FINALISER_CONCURRENCY) -> dict:
+    """
+    Runs independent storage operations on a bounded worker pool.
+
+    Each operation is a (name, path, fn, args) tuple; an operation fails when it raises
+    or returns False. Returns the total wall time and one outcome per operation (in
+    submission order) with its latency and any error.
+    """
+    def timed(name, path, fn, args):
+        start = time.perf_counter()
+        try:
+            error = None if fn(*args) is not False else "failed"
+        except Exception as e:
+            logger.exception(f"❌ Finaliser operation failed: {name} {path}")
+            error = str(e)
+        return {
+            "operation": name,
+            "path": path,
+            "ok": error is None,
+            "error": error,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+    if not operations:
+        return {"total_seconds": 0.0, "operations": []}
+
+    start = time.perf_counter()
+    workers = max(1, min(concurrency, len(operations)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="finaliser") as pool:
+        futures = [pool.submit(timed, *operation) for operation in operations]
+        outcomes = [future.result() for future in futures]
+    total = round(time.perf_counter() - start, 3)
+
+    slowest = max(outcome["seconds"] for outcome in outcomes)
+    logger.info(
+        f"⏱️ Finaliser ran {len(outcomes)} operations on {workers} workers in {total}s "
+        f"(slowest single operation {slowest}s)"
+    )
+    return {"total_seconds": total, "operations": outcomes}
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import Future
+from logger import logger
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "/tmp/panelitix_llm_cache")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_RESCAN_STORES = int(os.getenv("LLM_CACHE_RESCAN_STORES", "256"))
+
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+_in_flight = {}  # key -> Future shared by identical concurrent calls
+_in_flight_lock = threading.Lock()
+_evict_lock = threading.Lock()
+# Running size of the store, so a write only walks the directory when the budget is crossed
+# (or every LLM_CACHE_RESCAN_STORES writes, to expire entries and catch other workers' writes)
+_size = {"bytes": None, "stores": 0}
+
+def _count(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] += amount
+
+def cache_key(model: str, temperature: float, messages: list, **kwargs) -> str:
+    """Content address of a request: model, temperature and the fully rendered prompt."""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages, "options": kwargs},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _entry_path(key: str) -> str:
+    return os.path.join(LLM_CACHE_DIR, key[:2], f"{key}.json")
+
+def _load(key: str):
+    path = _entry_path(key)
+    try:
+        age = time.time() - os.path.getmtime(path)
+        if age > LLM_CACHE_TTL_SECONDS:
+            os.remove(path)
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(path)  # refresh recency for LRU eviction
+        return entry
+    except (OSError, ValueError):
+        return None
+
+def _store(key: str, entry: dict):
+    path = _entry_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    try:
+        previous = os.path.getsize(path)
+    except OSError:
+        previous = 0
+    added = os.path.getsize(tmp_path) - previous
+    os.replace(tmp_path, path)
+    _stored(added)
+
+def _stored(added: int):
+    with _evict_lock:
+        _size["stores"] += 1
+        if _size["bytes"] is not None:
+            _size["bytes"] += added
+            if _size["bytes"] <= LLM_CACHE_MAX_BYTES and _size["stores"] < LLM_CACHE_RESCAN_STORES:
+                return
+        _size["stores"] = 0
+        _size["bytes"] = _evict()
+
+def _evict() -> int:
+    """
+    Drops expired entries, then least-recently-used ones until the store is under its
+    byte budget; returns the bytes left. Called with _evict_lock held.
+    """
+    entries = []
+    now = time.time()
+    for root, _, files in os.walk(LLM_CACHE_DIR):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > LLM_CACHE_TTL_SECONDS:
+                _remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total <= LLM_CACHE_MAX_BYTES:
+        return total
+    for _, size, path in sorted(entries):
+        _remove(path)
+        total -= size
+        if total <= LLM_CACHE_MAX_BYTES * 0.9:
+            break
+    return total
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+        _count("evictions")
+    except OSError:
+        pass
+
+def get_or_compute(key: str, compute):
+    """
+    Returns the cached entry for `key`, or runs `compute()` (which must return a
+    JSON-serialisable dict) and stores it. Identical concurrent calls share one compute.
+    """
+    entry = _load(key)
+    if entry is not None:
+        _count("hits")
+        logger.info(f"🎯 LLM cache hit: {key[:12]}")
+        return entry
+
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _in_flight[key] = future
+
+    if not owner:
+        _count("coalesced")
+        logger.info(f"🔗 LLM cache: joining identical in-flight request {key[:12]}")
+        return future.result()
+
+    _count("misses")
+    try:
+        entry = compute()
+        try:
+            _store(key, entry)
+        except OSError as e:
+            logger.warning(f"⚠️ LLM cache write failed: {e}")
+        future.set_result(entry)
+        return entry
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+def invalidate(key: str):
+    """Drops one entry, e.g. a cached response its caller rejected as malformed."""
+    try:
+        os.remove(_entry_path(key))
+    except OSError:
+        pass
+
+def cache_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    stats["enabled"] = LLM_CACHE_ENABLED
+    return stats
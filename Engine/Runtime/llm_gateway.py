@@ -0,0 +1,239 @@
+import os
+import time
+import threading
+import openai
+from openai import OpenAI
+from openai.types.chat import ChatCompletion
+from Engine.Runtime import llm_cache
+from Engine.Files.document_loader import loads_json
+from Engine.Runtime.structured_output import StructuredOutputError
+from logger import logger
+
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))  # per model
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "5"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "600"))
+LLM_DEFAULT_RETRY_AFTER_SECONDS = float(os.getenv("LLM_DEFAULT_RETRY_AFTER_SECONDS", "5"))
+LLM_STRUCTURED_ATTEMPTS = int(os.getenv("LLM_STRUCTURED_ATTEMPTS", "2"))
+LLM_STREAMING_ENABLED = os.getenv("LLM_STREAMING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+class AdaptiveLimiter:
+    """
+    Caps in-flight requests for one model. The cap shrinks when the rate-limit
+    headers show headroom running out (or a 429 arrives) and creeps back up
+    towards the configured maximum while headroom is healthy.
+    """
+
+    def __init__(self, model: str, max_in_flight: int = LLM_MAX_IN_FLIGHT):
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.limit = max_in_flight
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: float = LLM_QUEUE_TIMEOUT_SECONDS):
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self.in_flight >= self.limit:
+                logger.info(f"🚦 {self.model}: {self.in_flight}/{self.limit} requests in flight; queueing")
+            while self.in_flight >= self.limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for an OpenAI slot for {self.model}")
+                self._condition.wait(remaining)
+            self.in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def observe(self, headers):
+        """Adjusts the cap from x-ratelimit-remaining-* response headers."""
+        remaining_requests = _header_int(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = _header_int(headers, "x-ratelimit-remaining-tokens")
+        limit_tokens = _header_int(headers, "x-ratelimit-limit-tokens")
+
+        with self._condition:
+            tight = (
+                (remaining_requests is not None and remaining_requests <= self.limit)
+                or (remaining_tokens is not None and limit_tokens and remaining_tokens < limit_tokens * 0.1)
+            )
+            if tight and self.limit > 1:
+                self.limit -= 1
+                logger.info(f"📉 {self.model}: rate-limit headroom low, in-flight cap → {self.limit}")
+            elif not tight and self.limit < self.max_in_flight:
+                self.limit += 1
+                self._condition.notify_all()
+
+    def throttle(self):
+        """Halves the cap after a 429."""
+        with self._condition:
+            self.limit = max(1, self.limit // 2)
+            logger.warning(f"📉 {self.model}: rate limited, in-flight cap → {self.limit}")
+
+def _header_int(headers, name):
+    value = headers.get(name) if headers is not None else None
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _retry_after(error) -> float:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", LLM_DEFAULT_RETRY_AFTER_SECONDS))
+    except (TypeError, ValueError):
+        return LLM_DEFAULT_RETRY_AFTER_SECONDS
+
+_client = None
+_limiters = {}
+_lock = threading.Lock()
+
+def get_openai_client() -> OpenAI:
+    """Returns the process-wide OpenAI client (one pooled HTTP connection pool)."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                # Retries are handled here so 429s feed back into the limiter
+                _client = OpenAI(max_retries=0)
+    return _client
+
+def get_limiter(model: str) -> AdaptiveLimiter:
+    with _lock:
+        if model not in _limiters:
+            _limiters[model] = AdaptiveLimiter(model)
+        return _limiters[model]
+
+def _send_chat_completion(model: str, messages: list, temperature: float, **kwargs):
+    client = get_openai_client()
+    limiter = get_limiter(model)
+
+    for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+        limiter.acquire()
+        try:
+            start = time.perf_counter()
+            raw = client.chat.completions.with_raw_response.create(
+                model=model,
+                temperature=temperature,
+                messages=messages,
+                **kwargs
+            )
+            limiter.observe(raw.headers)
+            logger.info(f"🤖 {model} completion in {time.perf_counter() - start:.1f}s (attempt {attempt})")
+            return raw.parse()
+        except openai.RateLimitError as e:
+            limiter.throttle()
+            if attempt == LLM_MAX_ATTEMPTS:
+                raise
+            delay = _retry_after(e)
+            logger.warning(f"⏳ {model} rate limited (attempt {attempt}); retrying in {delay}s")
+        finally:
+            limiter.release()
+        time.sleep(delay)
+
+def chat_completion(model: str, messages: list, temperature: float = 0.2, bypass_cache: bool = False, **kwargs):
+    """
+    Sends a chat completion through the shared client, waiting for a free slot
+    under the model's in-flight cap and retrying 429s after their Retry-After.
+    When LLM_CACHE_ENABLED is set, byte-identical requests are answered from the
+    response cache unless `bypass_cache` is true.
+    Returns the parsed ChatCompletion.
+    """
+    if not llm_cache.LLM_CACHE_ENABLED or bypass_cache:
+        return _send_chat_completion(model, messages, temperature, **kwargs)
+
+    key = llm_cache.cache_key(model, temperature, messages, **kwargs)
+    entry = llm_cache.get_or_compute(
+        key, lambda: _send_chat_completion(model, messages, temperature, **kwargs).model_dump(mode="json")
+    )
+    return ChatCompletion.model_validate(entry)
+
+def _send_streaming_completion(model: str, messages: list, temperature: float, on_delta, **kwargs) -> str:
+    client = get_openai_client()
+    limiter = get_limiter(model)
+
+    for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+        limiter.acquire()
+        try:
+            start = time.perf_counter()
+            raw = client.chat.completions.with_raw_response.create(
+                model=model,
+                temperature=temperature,
+                messages=messages,
+                stream=True,
+                **kwargs
+            )
+            limiter.observe(raw.headers)
+            parts = []
+            first_token = None
+            for chunk in raw.parse():
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(delta)
+                if on_delta:
+                    on_delta(delta)
+            logger.info(
+                f"🤖 {model} streamed completion in {time.perf_counter() - start:.1f}s "
+                f"(first token {first_token or 0:.1f}s, attempt {attempt})"
+            )
+            return "".join(parts)
+        except openai.RateLimitError as e:
+            limiter.throttle()
+            if attempt == LLM_MAX_ATTEMPTS:
+                raise
+            delay = _retry_after(e)
+            logger.warning(f"⏳ {model} rate limited (attempt {attempt}); retrying in {delay}s")
+        finally:
+            limiter.release()
+        time.sleep(delay)
+
+def stream_completion(model: str, messages: list, temperature: float = 0.2, on_delta=None, bypass_cache: bool = False, **kwargs) -> str:
+    """
+    Streams a chat completion through the shared client, calling `on_delta(text)` as
+    tokens arrive. Returns the full message text. A cache hit is delivered as one delta.
+    """
+    if not llm_cache.LLM_CACHE_ENABLED or bypass_cache:
+        return _send_streaming_completion(model, messages, temperature, on_delta, **kwargs)
+
+    streamed = []
+
+    def compute():
+        streamed.append(True)
+        return {"content": _send_streaming_completion(model, messages, temperature, on_delta, **kwargs)}
+
+    key = llm_cache.cache_key(model, temperature, messages, stream=True, **kwargs)
+    content = llm_cache.get_or_compute(key, compute)["content"]
+    if not streamed and on_delta:
+        on_delta(content)
+    return content
+
+def structured_completion(model: str, messages: list, output_type, temperature: float = 0.2, bypass_cache: bool = False, partial=None, **kwargs):
+    """
+    Requests JSON-mode output and validates it once into `output_type` (a class with
+    a `from_json(dict)` constructor). A response that fails validation is dropped from
+    the cache and re-requested, up to LLM_STRUCTURED_ATTEMPTS times in total.
+    With a `partial` (see partial_artifacts), the completion is streamed into it.
+    Returns the typed object.
+    """
+    kwargs["response_format"] = {"type": "json_object"}
+
+    for attempt in range(1, LLM_STRUCTURED_ATTEMPTS + 1):
+        bypass = bypass_cache or attempt > 1
+        if partial is None:
+            content = chat_completion(model, messages, temperature, bypass_cache=bypass, **kwargs).choices[0].message.content
+        else:
+            partial.reset()
+            content = stream_completion(model, messages, temperature, on_delta=partial.feed, bypass_cache=bypass, **kwargs)
+        try:
+            return output_type.from_json(loads_json(content, stage=output_type.__name__))
+        except ValueError as e:  # JSONDecodeError and StructuredOutputError alike
+            if llm_cache.LLM_CACHE_ENABLED:
+                stream_option = {"stream": True} if partial is not None else {}
+                llm_cache.invalidate(llm_cache.cache_key(model, temperature, messages, **stream_option, **kwargs))
+            if attempt == LLM_STRUCTURED_ATTEMPTS:
+                raise StructuredOutputError(f"{output_type.__name__}: {e}") from e
+            logger.warning(f"🧾 {model} returned malformed {output_type.__name__} (attempt {attempt}): {e}; re-requesting")
@@ -0,0 +1,138 @@
+import os
+import numpy as np
+from dataclasses import replace
+from logger import logger
+from Engine.Runtime.structured_output import Prompt1Thinking
+from Engine.Runtime.change_effect import ChangeEffectModel
+
+# Off by default: it rescales or re-generates the analyst's makeups; pass "validate_makeups" per request to opt in
+MAKEUP_VALIDATION_ENABLED = os.getenv("MAKEUP_VALIDATION_ENABLED", "false").lower() in ("1", "true", "yes")
+# A section's sub-section makeups may total within this many points of 100% and just be rescaled
+MAKEUP_RENORMALISE_POINTS = float(os.getenv("MAKEUP_RENORMALISE_POINTS", "5"))
+# Largest believable Sub-Section Change, in points either way
+MAKEUP_CHANGE_LIMIT = float(os.getenv("MAKEUP_CHANGE_LIMIT", "100"))
+# Targeted re-generation rounds for sections that cannot simply be rescaled
+MAKEUP_REPAIR_ATTEMPTS = int(os.getenv("MAKEUP_REPAIR_ATTEMPTS", "1"))
+
+def largest_remainder(values, groups, group_count: int, target: int = 100):
+    """
+    Rescales non-negative values to whole numbers summing to `target` within each group
+    (`groups` sorted, so each group is one contiguous run), handing the leftover units
+    to the largest remainders. A group whose values sum to zero comes back as zeros.
+    """
+    values = np.asarray(values, dtype=float)
+    groups = np.asarray(groups, dtype=np.int64)
+    counts = np.bincount(groups, minlength=group_count)
+    starts = np.cumsum(counts) - counts
+    totals = np.bincount(groups, weights=values, minlength=group_count)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaled = np.nan_to_num(values * target / totals[groups])
+    floors = np.floor(scaled)
+    shortfall = np.where(totals > 0, target - np.bincount(groups, weights=floors, minlength=group_count), 0)
+
+    # Largest remainder first within each group; ties go to the earlier value
+    order = np.lexsort((np.arange(len(values)), floors - scaled, groups))
+    rank = np.arange(len(values)) - starts[groups[order]]
+    bump = np.zeros(len(values))
+    bump[order] = rank < shortfall[groups[order]]
+    return (floors + bump).astype(np.int64)
+
+def validate_makeups(thinking: Prompt1Thinking) -> dict:
+    """
+    Checks every makeup and change in one vectorised pass: values that failed to parse,
+    makeups outside 0-100%, changes beyond ±MAKEUP_CHANGE_LIMIT, and makeup totals away
+    from 100%. Each section is "ok", "renormalise" (sound values, sub-section total within
+    MAKEUP_RENORMALISE_POINTS of 100%) or "repair" (needs re-generating). The section
+    makeups across the report are always rescaled when off, so that level is "ok" or
+    "renormalise".
+    """
+    model = ChangeEffectModel.from_thinking(thinking)
+    sub_makeup = model.sub_makeup / 10
+    section_makeup = model.section_makeup / 10
+
+    bad_sub = model.sub_invalid | (sub_makeup < 0) | (sub_makeup > 100) | (np.abs(model.sub_change) > MAKEUP_CHANGE_LIMIT)
+    bad_section = model.section_invalid | (section_makeup < 0) | (section_makeup > 100)
+    bad_count = model.section_sums(bad_sub.astype(np.int64))
+    # Totals in integer tenths, so 33.3 + 33.3 + 33.4 is exactly 100
+    sub_totals = model.section_sums(model.sub_makeup) / 10
+    drift = np.abs(sub_totals - 100)
+    repair = bad_section | (bad_count > 0) | ~model.has_sub_sections | (drift > MAKEUP_RENORMALISE_POINTS)
+    status = np.where(repair, "repair", np.where(drift > 0, "renormalise", "ok"))
+
+    sections = []
+    flat = 0
+    for index, section in enumerate(thinking.sections):
+        issues = []
+        if bad_section[index]:
+            issues.append(f"Section MakeUp {section.makeup!r} must be a percentage between 0% and 100%")
+        for sub in section.sub_sections:
+            if bad_sub[flat]:
+                issues.append(
+                    f"Sub-Section {sub.number} MakeUp {sub.makeup!r} / Change {sub.change!r} must be a "
+                    f"0-100% makeup and a change within ±{MAKEUP_CHANGE_LIMIT:g}%"
+                )
+            flat += 1
+        if drift[index] > 0:
+            issues.append(f"Sub-Section MakeUps total {sub_totals[index]:g}%, not 100%")
+        sections.append({
+            "number": section.number,
+            "title": section.title,
+            "sub_section_total": round(float(sub_totals[index]), 1),
+            "status": str(status[index]),
+            "issues": issues
+        })
+
+    report_total = int(model.section_makeup.sum()) / 10
+    off = report_total != 100
+    return {
+        "sections": sections,
+        "section_total": round(report_total, 1),
+        "status": "renormalise" if off else "ok",
+        "issues": [f"Section MakeUps total {report_total:g}%, not 100%"] if off else []
+    }
+
+def renormalise_makeups(thinking: Prompt1Thinking, section_numbers=None, report: bool = True) -> Prompt1Thinking:
+    """
+    Rescales the sub-section makeups of `section_numbers` (default: every section) to
+    whole percents summing to 100%, and with `report` the section makeups likewise.
+    A value that failed to parse or is negative counts as zero.
+    """
+    model = ChangeEffectModel.from_thinking(thinking)
+    count = len(thinking.sections)
+    chosen = {section.number for section in thinking.sections} if section_numbers is None else set(section_numbers)
+    sub_makeup = largest_remainder(np.clip(model.sub_makeup, 0, None), model.sub_section, count)
+    section_makeup = largest_remainder(np.clip(model.section_makeup, 0, None), np.zeros(count, dtype=np.int64), 1)
+
+    sections = []
+    flat = 0
+    for index, section in enumerate(thinking.sections):
+        sub_sections = []
+        for sub in section.sub_sections:
+            sub_sections.append(replace(sub, makeup=f"{sub_makeup[flat]}%") if section.number in chosen else sub)
+            flat += 1
+        changes = {"sub_sections": sub_sections}
+        if report:
+            changes["makeup"] = f"{section_makeup[index]}%"
+        sections.append(replace(section, **changes))
+    return replace(thinking, sections=sections)
+
+def apply_repair(thinking: Prompt1Thinking, repair) -> Prompt1Thinking:
+    """Merges a SectionMakeupRepair into the thinking; sub-sections it leaves out keep their values."""
+    sections = []
+    for section in thinking.sections:
+        if section.number == repair.number:
+            section = replace(section, makeup=repair.makeup, sub_sections=[
+                replace(sub, makeup=repair.sub_sections[sub.number][0], change=repair.sub_sections[sub.number][1])
+                if sub.number in repair.sub_sections else sub
+                for sub in section.sub_sections
+            ])
+        sections.append(section)
+    return replace(thinking, sections=sections)
+
+def log_validation(validation: dict, where: str = "Prompt 1 Thinking"):
+    for section in validation["sections"]:
+        if section["status"] != "ok":
+            logger.warning(f"🧮 {where} Section {section['number']} ({section['status']}): {'; '.join(section['issues'])}")
+    if validation["status"] != "ok":
+        logger.warning(f"🧮 {where} ({validation['status']}): {'; '.join(validation['issues'])}")
@@ -0,0 +1,128 @@
+import json
+import time
+import threading
+from logger import logger
+
+class PartialArtifact:
+    """
+    The in-memory text of a completion that is still streaming. Tracks JSON nesting
+    as deltas arrive so each top-level block (e.g. "Section 2": {...}) is parsed as
+    soon as its closing brace lands and shows up in the status snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clears everything streamed so far (called when a request is retried)."""
+        with self._lock:
+            self._parts = []
+            self._chars = 0
+            self.sections = {}
+            self.started_at = time.time()
+            self.updated_at = self.started_at
+            # JSON scanner state
+            self._depth = 0
+            self._in_string = False
+            self._escaped = False
+            self._string_start = None
+            self._last_key = None
+            self._block_start = None
+
+    @property
+    def text(self) -> str:
+        with self._lock:
+            return "".join(self._parts)
+
+    def feed(self, delta: str):
+        completed = []
+        with self._lock:
+            offset = self._chars
+            self._parts.append(delta)
+            self._chars += len(delta)
+            self.updated_at = time.time()
+            for i, char in enumerate(delta, start=offset):
+                block = self._scan(char, i)
+                if block is not None:
+                    completed.append(block)
+
+        for key in completed:
+            logger.info(f"🧱 Streamed block complete: {key} ({self.path})")
+
+    def _scan(self, char: str, index: int):
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 1:
+                    self._last_key = self._string_start
+            return None
+
+        if char == '"':
+            self._in_string = True
+            self._string_start = index
+        elif char in "{[":
+            self._depth += 1
+            if self._depth == 2:
+                self._block_start = index
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 1 and self._block_start is not None and self._last_key is not None:
+                return self._complete_block(index)
+        return None
+
+    def _complete_block(self, end: int):
+        text = "".join(self._parts)
+        try:
+            key = json.loads(text[self._last_key:self._key_end(text, self._last_key) + 1])
+            value = json.loads(text[self._block_start:end + 1])
+        except ValueError:
+            return None
+        finally:
+            self._block_start = None
+        self.sections[key] = value
+        return key
+
+    @staticmethod
+    def _key_end(text: str, start: int) -> int:
+        i = start + 1
+        while text[i] != '"':
+            i += 2 if text[i] == "\\" else 1
+        return i
+
+    def snapshot(self, include_content: bool = False) -> dict:
+        with self._lock:
+            snapshot = {
+                "path": self.path,
+                "chars": self._chars,
+                "sections_complete": list(self.sections),
+                "started_at": self.started_at,
+                "updated_at": self.updated_at
+            }
+            if include_content:
+                snapshot["content"] = "".join(self._parts)
+        return snapshot
+
+_partials = {}  # path -> PartialArtifact
+_lock = threading.Lock()
+
+def open_partial(path: str) -> PartialArtifact:
+    """Starts tracking a streaming artifact at `path` (replacing any earlier one)."""
+    partial = PartialArtifact(path)
+    with _lock:
+        _partials[path] = partial
+    return partial
+
+def get_partial(path: str):
+    with _lock:
+        return _partials.get(path)
+
+def close_partial(path: str):
+    """Drops the partial once the final artifact has been written (or the stage failed)."""
+    with _lock:
+        _partials.pop(path, None)
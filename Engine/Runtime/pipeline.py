@@ -0,0 +1,75 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from logger import logger
+
+PIPELINE_CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", "6"))
+
+class PipelineError(Exception):
+    """Raised when a stage fails; carries the failing stage name and what had finished."""
+
+    def __init__(self, stage: str, error: Exception, completed: list):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+        self.completed = completed
+
+def run_pipeline(stages, context: dict, concurrency: int = PIPELINE_CONCURRENCY, on_progress=None) -> dict:
+    """
+    Runs a dependency graph of stages in-process.
+
+    `stages` is a list of (name, dependencies, fn) tuples. Each fn receives a snapshot
+    of the shared context and returns a dict that is merged back into it, so results
+    pass between stages in memory. A stage starts as soon as all of its dependencies
+    have finished, so independent stages run concurrently. `on_progress(running)` is
+    called with the names of the in-flight stages whenever that set changes.
+
+    Returns the per-stage and total wall times in seconds.
+    """
+    names = {name for name, _, _ in stages}
+    for name, deps, _ in stages:
+        missing = [dep for dep in deps if dep not in names]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {missing}")
+
+    pending = {name: (set(deps), fn) for name, deps, fn in stages}
+    done = []
+    timings = {}
+    running = {}
+    start = time.perf_counter()
+
+    def timed(name, fn, snapshot):
+        stage_start = time.perf_counter()
+        result = fn(snapshot)
+        return result or {}, round(time.perf_counter() - stage_start, 3)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pipeline") as pool:
+        while pending or running:
+            ready = [name for name, (deps, _) in pending.items() if deps.issubset(done)]
+            for name in ready:
+                _, fn = pending.pop(name)
+                logger.info(f"▶️ Pipeline stage started: {name}")
+                running[pool.submit(timed, name, fn, dict(context))] = name
+
+            if not running:
+                raise ValueError(f"Pipeline has a dependency cycle between: {sorted(pending)}")
+            if on_progress and ready:
+                on_progress(sorted(running.values()))
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    for other in running:
+                        other.cancel()
+                    logger.error(f"❌ Pipeline stage failed: {name}: {e}")
+                    raise PipelineError(name, e, list(done)) from e
+                context.update(result)
+                timings[name] = seconds
+                done.append(name)
+                logger.info(f"✅ Pipeline stage finished: {name} ({seconds}s)")
+
+    timings["total"] = round(time.perf_counter() - start, 3)
+    return timings
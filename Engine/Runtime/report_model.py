@@ -0,0 +1,180 @@
+class ReportNode:
+    """
+    Base for the slotted report classes. Fields default to "" (lists to [], nested
+    objects to None); `NESTED` maps a field to its class, or to a one-item list for a
+    list of that class, so `from_dict` can rebuild the tree from `to_dict` output.
+    """
+    __slots__ = ()
+    NESTED = {}
+    LISTS = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            if name in fields:
+                value = fields.pop(name)
+            elif name in self.LISTS:
+                value = []
+            elif name in self.NESTED:
+                value = None
+            else:
+                value = ""
+            setattr(self, name, value)
+        if fields:
+            raise TypeError(f"{type(self).__name__} has no field(s) {sorted(fields)}")
+
+    def replace(self, **changes):
+        return type(self)(**{**{name: getattr(self, name) for name in self.__slots__}, **changes})
+
+    def to_dict(self) -> dict:
+        def dump(value):
+            if isinstance(value, ReportNode):
+                return value.to_dict()
+            if isinstance(value, list):
+                return [dump(item) for item in value]
+            return value
+        return {name: dump(getattr(self, name)) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        fields = {}
+        for name in cls.__slots__:
+            if name not in data:
+                continue
+            value = data[name]
+            nested = cls.NESTED.get(name)
+            if nested is not None and value is not None:
+                value = [nested[0].from_dict(item) for item in value] if isinstance(nested, list) else nested.from_dict(value)
+            fields[name] = value
+        return cls(**fields)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:2])
+        return f"{type(self).__name__}({fields}, ...)"
+
+class Article(ReportNode):
+    __slots__ = ("title", "date", "summary", "relevance", "source")
+    LABELS = [("title", "Title"), ("date", "Date"), ("summary", "Summary"), ("relevance", "Relevance"), ("source", "Source")]
+
+class TableRow(ReportNode):
+    __slots__ = ("title", "makeup", "change", "effect")
+
+class SubSection(ReportNode):
+    __slots__ = (
+        "number", "title", "header", "sub_header", "summary",
+        "makeup", "change", "effect", "statistic", "article"
+    )
+    NESTED = {"article": Article}
+    # (attribute, label) pairs for the rendered "Sub-Section <label>" keys, in report order
+    LABELS = [
+        ("title", "Title"), ("header", "Header"), ("sub_header", "Sub-Header"), ("summary", "Summary"),
+        ("makeup", "Makeup"), ("change", "Change"), ("effect", "Effect"), ("statistic", "Statistic")
+    ]
+
+class Section(ReportNode):
+    __slots__ = (
+        "number", "title", "header", "sub_header", "theme", "summary",
+        "makeup", "change", "effect", "insight", "statistic", "recommendation",
+        "article", "table", "sub_sections"
+    )
+    NESTED = {"article": Article, "table": [TableRow], "sub_sections": [SubSection]}
+    LISTS = ("table", "sub_sections")
+    # (attribute, label) pairs for the rendered "Section <label>" keys, in report order
+    LABELS = [
+        ("title", "Title"), ("header", "Header"), ("sub_header", "Sub-Header"), ("theme", "Theme"),
+        ("summary", "Summary"), ("makeup", "Makeup"), ("change", "Change"), ("effect", "Effect"),
+        ("insight", "Insight"), ("statistic", "Statistic"), ("recommendation", "Recommendation")
+    ]
+
+class Report(ReportNode):
+    """
+    One report, built once from the LLM stage outputs. combine, format_combine,
+    csv_content and the table CSV export all render from this (format_combine
+    from its formatted copy), and it round-trips through JSON for checkpoints.
+    """
+    __slots__ = (
+        "client", "website", "about_client", "main_question", "report", "year",
+        "title", "sub_title", "executive_summary", "key_findings", "call_to_action",
+        "report_change_title", "report_change", "report_table",
+        "sections", "conclusion", "recommendations"
+    )
+    NESTED = {"report_table": [TableRow], "sections": [Section]}
+    LISTS = ("key_findings", "report_table", "sections", "recommendations")
+
+    @classmethod
+    def from_structured(cls, change_effect, section_assets, report_assets, report_tables):
+        """Merges the typed Change Effect Maths and Prompt 2-4 outputs by section/sub-section number."""
+        sections = {}
+
+        def article(source):
+            if source is None:
+                return None
+            return Article(**{name: getattr(source, name) for name in Article.__slots__})
+
+        for thinking in change_effect.sections:
+            sections[thinking.number] = Section(
+                number=thinking.number,
+                title=thinking.title,
+                summary=thinking.summary,
+                makeup=thinking.makeup,
+                change=thinking.change or "",
+                effect=thinking.effect or "",
+                article=article(thinking.related_article),
+                table=[],
+                sub_sections=[
+                    SubSection(
+                        number=sub.number,
+                        title=sub.title,
+                        summary=sub.summary,
+                        makeup=sub.makeup,
+                        change=sub.change,
+                        effect=sub.effect or "",
+                        article=article(sub.related_article)
+                    )
+                    for sub in thinking.sub_sections
+                ]
+            )
+
+        for assets in section_assets.sections:
+            section = sections.setdefault(assets.number, Section(number=assets.number))
+            section.theme = assets.theme
+            section.header = assets.header
+            section.sub_header = assets.sub_header
+            section.insight = assets.insight
+            section.statistic = assets.statistic
+            section.recommendation = assets.recommendation
+            subs = {sub.number: sub for sub in section.sub_sections}
+            for sub_assets in assets.sub_sections:
+                sub = subs.get(sub_assets.number)
+                if sub is None:
+                    sub = subs[sub_assets.number] = SubSection(number=sub_assets.number)
+                    section.sub_sections.append(sub)
+                sub.header = sub_assets.header
+                sub.sub_header = sub_assets.sub_header
+                sub.statistic = sub_assets.statistic
+            section.sub_sections.sort(key=lambda sub: sub.number)
+
+        for section in sections.values():
+            section.table = [
+                TableRow(title=row.title, makeup=row.makeup, change=row.change, effect=row.effect)
+                for row in report_tables.section_tables.get(section.title, [])
+            ]
+
+        return cls(
+            title=report_assets.title,
+            sub_title=report_assets.sub_title,
+            executive_summary=report_assets.executive_summary,
+            key_findings=list(report_assets.key_findings),
+            call_to_action=report_assets.call_to_action,
+            report_change_title=report_tables.report_change_title,
+            report_change=report_tables.report_change,
+            report_table=[
+                TableRow(title=row.title, makeup=row.makeup, change=row.change, effect=row.effect)
+                for row in report_tables.report_table
+            ],
+            sections=[sections[number] for number in sorted(sections)],
+            conclusion=report_assets.conclusion,
+            recommendations=list(report_assets.recommendations)
+        )
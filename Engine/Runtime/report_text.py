@@ -0,0 +1,209 @@
+import re
+from Engine.Runtime.report_model import Report, Section, SubSection, TableRow, Article
+
+# Report-level "Key:" labels → Report attribute
+REPORT_LABELS = {
+    "Client": "client", "Website": "website", "About Client": "about_client",
+    "Main Question": "main_question", "Report": "report", "Year": "year",
+    "Report Title": "title", "Report Sub-Title": "sub_title", "Executive Summary": "executive_summary",
+    "Key Findings": "key_findings", "Call to Action": "call_to_action",
+    "Report Change Title": "report_change_title", "Report Change": "report_change",
+    "Conclusion": "conclusion", "Recommendations": "recommendations"
+}
+# format_combine's header block; these only count on a line of their own, so prose can't start one
+HEADER_LABELS = {"Client", "Website", "About Client", "Main Question", "Report", "Year"}
+LIST_ATTRIBUTES = {"key_findings", "recommendations"}
+
+def _node_labels(prefix: str, node_class) -> dict:
+    labels = {f"{prefix} {label}": attr for attr, label in node_class.LABELS}
+    labels.update({f"{prefix} Related Article {label}": f"article.{attr}" for attr, label in Article.LABELS})
+    return labels
+
+SECTION_LABELS = _node_labels("Section", Section)
+SUB_SECTION_LABELS = _node_labels("Sub-Section", SubSection)
+TABLE_ROW_LABELS = {"Title": "title", "Makeup": "makeup", "Change": "change", "Effect": "effect"}
+# Block markers: the value (if any) is handled by the scanner, not stored on a node
+MARKERS = {"Section #", "Sub-Section #", "Report Table", "Section Tables", "Section Related Article", "Sub-Section Related Article"}
+LABELS = set(REPORT_LABELS) | set(SECTION_LABELS) | set(SUB_SECTION_LABELS) | MARKERS
+
+# The prompt outputs open their blocks with "Section 2:" / "Sub-Section 3:"
+BLOCK_HEADER = re.compile(r"^(Sub-)?Section (\d+):$")
+
+def _key_value(text: str):
+    label, colon, value = text.partition(":")
+    if not colon or (value and not value[0].isspace()):
+        return None
+    if label not in LABELS:
+        label = label.replace("MakeUp", "Makeup")
+        if label not in LABELS:
+            return None
+    return label, value.strip()
+
+def _fields(line: str):
+    """The (label, value) fields on a line, or None if it does not start with a known label."""
+    field = _key_value(line)
+    if field is None:
+        return None
+    if field[0] in HEADER_LABELS and field[1]:
+        return None
+    if " | " in field[1]:
+        # format_combine joins Makeup | Change | Effect onto one line
+        parts = [_key_value(part.strip()) for part in line.split(" | ")]
+        if all(parts):
+            return parts
+    return [field]
+
+def _joined(lines: list) -> str:
+    return "\n".join(lines).rstrip("\n")
+
+def scan_report_text(text: str):
+    """
+    Scans report text line by line and yields (label, value) events in text order.
+    Handles all three layouts the Zapier stages exchange: the prompt 1-4 outputs
+    ("Section 2:" blocks, inline values), combine's output ("Section #: 2", intro
+    values on the line below their key) and format_combine's output (every value
+    below its key, Makeup | Change | Effect on one line). A value runs until the
+    next known label; blank lines inside it are kept as paragraph breaks. A bare
+    "Title:" line inside a Section Tables block is yielded as ("Section Table", title).
+    """
+    label, lines = None, []
+    in_section_tables = False
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            if lines:
+                lines.append("")  # a paragraph break inside the current value
+            continue
+
+        fields = _fields(line)
+        if fields is None:
+            header = BLOCK_HEADER.match(line)
+            if header is None and in_section_tables and line.endswith(":"):
+                header_event = ("Section Table", line[:-1].strip())
+            elif header is not None:
+                header_event = ("Sub-Section #" if header.group(1) else "Section #", header.group(2))
+            elif label is not None:
+                lines.append(line)
+                continue
+            else:
+                continue
+            if label is not None:
+                yield label, _joined(lines)
+            label, lines = None, []
+            in_section_tables = in_section_tables and header_event[0] == "Section Table"
+            yield header_event
+            continue
+
+        if label is not None:
+            yield label, _joined(lines)
+        for field_label, value in fields[:-1]:
+            yield field_label, value
+        label, value = fields[-1]
+        lines = [value] if value else []
+        if label == "Section Tables":
+            in_section_tables = True
+        elif not label.startswith("Sub-Section ") or label[len("Sub-Section "):] not in TABLE_ROW_LABELS:
+            in_section_tables = False
+
+    if label is not None:
+        yield label, _joined(lines)
+
+def parse_report_text(text: str) -> Report:
+    """
+    Builds a Report from the text a Zapier step hands over, so every text-facing
+    run_prompt renders from the same model as the in-process pipeline. Sections and
+    sub-sections are merged by number, so the concatenated prompt outputs combine
+    into one tree. Titled section tables (prompt 4) attach to the section with that
+    title. The first non-empty value for a field wins.
+    """
+    report = Report()
+    sections = {}
+    section = sub = None
+    table = None  # "report" or "section" while inside a table block
+    table_title = None
+    titled_tables = {}
+
+    def section_for(number: int) -> Section:
+        if number not in sections:
+            sections[number] = Section(number=number)
+        return sections[number]
+
+    def sub_section_for(parent: Section, number: int) -> SubSection:
+        for existing in parent.sub_sections:
+            if existing.number == number:
+                return existing
+        created = SubSection(number=number)
+        parent.sub_sections.append(created)
+        return created
+
+    def assign(node, attr: str, value: str):
+        if attr.startswith("article."):
+            if node.article is None:
+                node.article = Article()
+            node, attr = node.article, attr[len("article."):]
+        if not getattr(node, attr):
+            setattr(node, attr, value)
+
+    def add_row(rows: list, prefix: str, label: str, value: str):
+        name = TABLE_ROW_LABELS.get(label[len(prefix) + 1:])
+        if name == "title" or not rows:
+            rows.append(TableRow())
+        if name and not getattr(rows[-1], name):
+            setattr(rows[-1], name, value)
+
+    for label, value in scan_report_text(text):
+        if label == "Report Table":
+            table = "report"
+            continue
+        if label == "Section Tables":
+            table, table_title = "section", None
+            continue
+        if label == "Section Table":
+            table_title = value
+            continue
+
+        if table == "report" and label.startswith("Section ") and label[len("Section "):] in TABLE_ROW_LABELS:
+            add_row(report.report_table, "Section", label, value)
+            continue
+        if table == "section" and label.startswith("Sub-Section ") and label[len("Sub-Section "):] in TABLE_ROW_LABELS:
+            if table_title is not None:
+                add_row(titled_tables.setdefault(table_title, []), "Sub-Section", label, value)
+            elif section is not None:
+                add_row(section.table, "Sub-Section", label, value)
+            continue
+        table = None
+
+        if label == "Section #":
+            if value.isdigit():
+                section, sub = section_for(int(value)), None
+        elif label == "Sub-Section #":
+            number = value.split(".")
+            if not all(part.isdigit() for part in number):
+                continue
+            if len(number) == 2:
+                section = section_for(int(number[0]))
+            if section is not None:
+                sub = sub_section_for(section, int(number[-1]))
+        elif label in MARKERS or not value:
+            continue
+        elif label in SUB_SECTION_LABELS:
+            if sub is not None:
+                assign(sub, SUB_SECTION_LABELS[label], value)
+        elif label in SECTION_LABELS:
+            if section is not None:
+                assign(section, SECTION_LABELS[label], value)
+        else:
+            attr = REPORT_LABELS[label]
+            if attr in LIST_ATTRIBUTES:
+                value = [line for line in value.split("\n") if line.strip()]
+            assign(report, attr, value)
+
+    for title, rows in titled_tables.items():
+        for owner in sections.values():
+            if owner.title == title and not owner.table:
+                owner.table = rows
+    for owner in sections.values():
+        owner.sub_sections.sort(key=lambda item: item.number)
+    report.sections = [sections[number] for number in sorted(sections)]
+    return report
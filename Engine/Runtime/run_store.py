@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from logger import logger
+
+# One file per box: every gunicorn worker opens the same WAL-mode database,
+# so a status lookup sees runs started by any worker.
+RUN_STORE_PATH = os.getenv("RUN_STORE_PATH", "/tmp/panelitix_runs.sqlite3")
+
+TERMINAL_STAGES = {"completed", "failed"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    prompt TEXT,
+    stage TEXT NOT NULL,
+    artifact_path TEXT,
+    error TEXT,
+    queue_wait_seconds REAL,
+    duration_seconds REAL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+)
+"""
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+def _connection() -> sqlite3.Connection:
+    global _schema_ready
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(RUN_STORE_PATH, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                conn.execute(_SCHEMA)
+                _schema_ready = True
+    return conn
+
+def record_run(run_id: str, prompt: str, stage: str = "queued"):
+    """Creates (or resets) the status row for a run."""
+    now = _now()
+    try:
+        _connection().execute(
+            """
+            INSERT INTO runs (run_id, prompt, stage, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(run_id) DO UPDATE SET
+                prompt = excluded.prompt, stage = excluded.stage, error = NULL,
+                artifact_path = NULL, started_at = NULL, finished_at = NULL,
+                duration_seconds = NULL, updated_at = excluded.updated_at
+            """,
+            (run_id, prompt, stage, now, now)
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Run store insert failed for {run_id}: {e}")
+
+def update_run(run_id: str, stage: str = None, **fields):
+    """
+    Updates a run's status row. Moving to "running" stamps started_at; moving to
+    "completed"/"failed" stamps finished_at and the run duration.
+    Extra fields may be artifact_path, error or queue_wait_seconds.
+    """
+    now = _now()
+    updates = {"updated_at": now}
+    updates.update({k: v for k, v in fields.items() if k in ("artifact_path", "error", "queue_wait_seconds")})
+    if stage:
+        updates["stage"] = stage
+        if stage == "running":
+            updates["started_at"] = now
+
+    try:
+        conn = _connection()
+        if stage in TERMINAL_STAGES:
+            updates["finished_at"] = now
+            row = conn.execute("SELECT started_at, created_at FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row:
+                began = datetime.fromisoformat(row["started_at"] or row["created_at"])
+                updates["duration_seconds"] = round((datetime.fromisoformat(now) - began).total_seconds(), 3)
+
+        assignments = ", ".join(f"{column} = ?" for column in updates)
+        cursor = conn.execute(f"UPDATE runs SET {assignments} WHERE run_id = ?", (*updates.values(), run_id))
+        if cursor.rowcount == 0:
+            logger.debug(f"📭 Run store has no row for {run_id}; update skipped")
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Run store update failed for {run_id}: {e}")
+
+def get_run(run_id: str):
+    """Returns the status row for a run as a dict, or None if it is unknown."""
+    row = _connection().execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    return dict(row) if row else None
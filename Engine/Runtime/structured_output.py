@@ -0,0 +1,436 @@
+import re
+import json
+from dataclasses import dataclass, field
+
+SECTION_KEY = re.compile(r"^Section (\d+)$", re.IGNORECASE)
+SUB_SECTION_KEY = re.compile(r"^Sub-Section (\d+)$", re.IGNORECASE)
+
+ARTICLE_FIELDS = (
+    ("title", "Title"),
+    ("date", "Date"),
+    ("summary", "Summary"),
+    ("relevance", "Relevance"),
+    ("source", "Source"),
+)
+
+class StructuredOutputError(ValueError):
+    """Raised when an LLM response does not have the shape its stage expects."""
+
+# ─────────────────────────────────────────────
+# Field helpers
+# ─────────────────────────────────────────────
+def _text(data: dict, key: str, where: str, required: bool = True, aliases=()) -> str:
+    for name in (key, *aliases):
+        value = data.get(name)
+        if value is not None:
+            break
+    if value is None:
+        if required:
+            raise StructuredOutputError(f"{where}: missing '{key}'")
+        return ""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise StructuredOutputError(f"{where}: '{key}' must be text, got {type(value).__name__}")
+    return str(value).strip()
+
+def _percent(data: dict, key: str, where: str, aliases=()) -> str:
+    """Kept as text even when it doesn't parse: the maths counts such a value as zero, and validate_makeups flags it."""
+    return _text(data, key, where, aliases=aliases)
+
+def _text_list(data: dict, key: str, where: str) -> list:
+    value = data.get(key)
+    if isinstance(value, str):
+        value = [line for line in value.splitlines() if line.strip()]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise StructuredOutputError(f"{where}: '{key}' must be a list of text")
+    return [item.strip() for item in value]
+
+def _numbered(data: dict, pattern, where: str) -> list:
+    """Returns (number, block) pairs for the 'Section N' / 'Sub-Section N' keys, in numeric order."""
+    blocks = []
+    for key, value in data.items():
+        match = pattern.match(key.strip())
+        if not match:
+            continue
+        if not isinstance(value, dict):
+            raise StructuredOutputError(f"{where}: '{key}' must be an object")
+        blocks.append((int(match.group(1)), value))
+    return sorted(blocks, key=lambda block: block[0])
+
+def _object(data, where: str) -> dict:
+    if not isinstance(data, dict):
+        raise StructuredOutputError(f"{where}: expected a JSON object, got {type(data).__name__}")
+    return data
+
+def render_text(value, indent: int = 0) -> str:
+    """Renders JSON-shaped data as the indented 'Key: value' text the prompt templates and Zapier consume."""
+    lines = []
+    pad = "  " * indent
+    for key, item in value.items():
+        if isinstance(item, dict):
+            lines.append(f"{pad}{key}:")
+            lines.append(render_text(item, indent + 1))
+        elif isinstance(item, list):
+            lines.append(f"{pad}{key}:")
+            for entry in item:
+                lines.append(render_text(entry, indent + 1) if isinstance(entry, dict) else f"{pad}  {entry}")
+        else:
+            lines.append(f"{pad}{key}: {item}")
+    return "\n".join(line for line in lines if line)
+
+class StructuredOutput:
+    """Shared serialisers: `to_json()` reproduces the shape the prompt asked for."""
+
+    def to_json(self) -> dict:
+        raise NotImplementedError
+
+    def to_json_text(self) -> str:
+        return json.dumps(self.to_json(), indent=2, ensure_ascii=False)
+
+    def to_text(self) -> str:
+        return render_text(self.to_json())
+
+# ─────────────────────────────────────────────
+# Prompt 1 Thinking (and the Change Effect Maths output built from it)
+# ─────────────────────────────────────────────
+@dataclass
+class RelatedArticle:
+    title: str = ""
+    date: str = ""
+    summary: str = ""
+    relevance: str = ""
+    source: str = ""
+
+    @classmethod
+    def from_json(cls, data, prefix: str, where: str):
+        if not isinstance(data, dict):
+            return None
+        return cls(**{attr: _text(data, f"{prefix} {label}", where, required=False) for attr, label in ARTICLE_FIELDS})
+
+    def to_json(self, prefix: str) -> dict:
+        return {f"{prefix} {label}": getattr(self, attr) for attr, label in ARTICLE_FIELDS}
+
+@dataclass
+class ThinkingSubSection:
+    number: int
+    title: str
+    summary: str
+    makeup: str
+    change: str
+    effect: str = None
+    related_article: RelatedArticle = None
+
+    @classmethod
+    def from_json(cls, number: int, data: dict, where: str):
+        where = f"{where} / Sub-Section {number}"
+        return cls(
+            number=number,
+            title=_text(data, "Sub-Section Title", where),
+            summary=_text(data, "Sub-Section Summary", where),
+            makeup=_percent(data, "Sub-Section MakeUp", where, aliases=("Sub-Section Makeup",)),
+            change=_percent(data, "Sub-Section Change", where),
+            effect=_text(data, "Sub-Section Effect", where, required=False) or None,
+            related_article=RelatedArticle.from_json(
+                data.get("Sub-Section Related Article"), "Sub-Section Related Article", where
+            )
+        )
+
+    def to_json(self) -> dict:
+        block = {
+            "Sub-Section Title": self.title,
+            "Sub-Section Summary": self.summary,
+            "Sub-Section MakeUp": self.makeup,
+            "Sub-Section Change": self.change
+        }
+        if self.effect is not None:
+            block["Sub-Section Effect"] = self.effect
+        if self.related_article is not None:
+            block["Sub-Section Related Article"] = self.related_article.to_json("Sub-Section Related Article")
+        return block
+
+@dataclass
+class ThinkingSection:
+    number: int
+    title: str
+    summary: str
+    makeup: str
+    sub_sections: list = field(default_factory=list)
+    change: str = None
+    effect: str = None
+    related_article: RelatedArticle = None
+
+    @classmethod
+    def from_json(cls, number: int, data: dict):
+        where = f"Section {number}"
+        sub_sections = [
+            ThinkingSubSection.from_json(sub_number, block, where)
+            for sub_number, block in _numbered(data, SUB_SECTION_KEY, where)
+        ]
+        if not sub_sections:
+            raise StructuredOutputError(f"{where}: no sub-sections")
+        return cls(
+            number=number,
+            title=_text(data, "Section Title", where),
+            summary=_text(data, "Section Summary", where),
+            makeup=_percent(data, "Section MakeUp", where, aliases=("Section Makeup",)),
+            sub_sections=sub_sections,
+            change=_text(data, "Section Change", where, required=False) or None,
+            effect=_text(data, "Section Effect", where, required=False) or None,
+            related_article=RelatedArticle.from_json(data.get("Section Related Article"), "Section Related Article", where)
+        )
+
+    def to_json(self) -> dict:
+        block = {
+            "Section Title": self.title,
+            "Section Summary": self.summary,
+            "Section MakeUp": self.makeup
+        }
+        if self.change is not None:
+            block["Section Change"] = self.change
+        if self.effect is not None:
+            block["Section Effect"] = self.effect
+        if self.related_article is not None:
+            block["Section Related Article"] = self.related_article.to_json("Section Related Article")
+        for sub in self.sub_sections:
+            block[f"Sub-Section {sub.number}"] = sub.to_json()
+        return block
+
+@dataclass
+class Prompt1Thinking(StructuredOutput):
+    """Prompt 1's sections; after Change Effect Maths the change/effect fields and `report_change` are filled."""
+    sections: list
+    report_change: str = None
+
+    @classmethod
+    def from_json(cls, data):
+        data = _object(data, "Prompt 1 Thinking")
+        sections = [ThinkingSection.from_json(number, block) for number, block in _numbered(data, SECTION_KEY, "Prompt 1 Thinking")]
+        if not sections:
+            raise StructuredOutputError("Prompt 1 Thinking: no 'Section N' objects")
+        return cls(sections=sections)
+
+    def to_json(self) -> dict:
+        return {f"Section {section.number}": section.to_json() for section in self.sections}
+
+@dataclass
+class SectionMakeupRepair(StructuredOutput):
+    """Prompt 1's makeup repair call: one section's corrected MakeUps and Changes."""
+    number: int
+    makeup: str
+    sub_sections: dict  # sub-section number -> (makeup, change)
+
+    @classmethod
+    def from_json(cls, data):
+        where = "Prompt 1 MakeUp Repair"
+        blocks = _numbered(_object(data, where), SECTION_KEY, where)
+        if len(blocks) != 1:
+            raise StructuredOutputError(f"{where}: expected exactly one 'Section N' object, got {len(blocks)}")
+        number, block = blocks[0]
+        where = f"{where} / Section {number}"
+        sub_sections = {
+            sub_number: (
+                _percent(sub, "Sub-Section MakeUp", f"{where} / Sub-Section {sub_number}", aliases=("Sub-Section Makeup",)),
+                _percent(sub, "Sub-Section Change", f"{where} / Sub-Section {sub_number}")
+            )
+            for sub_number, sub in _numbered(block, SUB_SECTION_KEY, where)
+        }
+        if not sub_sections:
+            raise StructuredOutputError(f"{where}: no sub-sections")
+        return cls(number=number, makeup=_percent(block, "Section MakeUp", where, aliases=("Section Makeup",)), sub_sections=sub_sections)
+
+    def to_json(self) -> dict:
+        block = {"Section MakeUp": self.makeup}
+        for number, (makeup, change) in self.sub_sections.items():
+            block[f"Sub-Section {number}"] = {"Sub-Section MakeUp": makeup, "Sub-Section Change": change}
+        return {f"Section {self.number}": block}
+
+# ─────────────────────────────────────────────
+# Prompt 2 Section Assets
+# ─────────────────────────────────────────────
+@dataclass
+class AssetSubSection:
+    number: int
+    header: str
+    sub_header: str
+    statistic: str
+
+    @classmethod
+    def from_json(cls, number: int, data: dict, where: str):
+        where = f"{where} / Sub-Section {number}"
+        return cls(
+            number=number,
+            header=_text(data, "Sub-Section Header", where),
+            sub_header=_text(data, "Sub-Section Sub-Header", where),
+            statistic=_text(data, "Sub-Section Statistic", where)
+        )
+
+    def to_json(self) -> dict:
+        return {
+            "Sub-Section Header": self.header,
+            "Sub-Section Sub-Header": self.sub_header,
+            "Sub-Section Statistic": self.statistic
+        }
+
+@dataclass
+class AssetSection:
+    number: int
+    theme: str
+    header: str
+    sub_header: str
+    insight: str
+    statistic: str
+    recommendation: str
+    sub_sections: list = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, number: int, data: dict):
+        where = f"Section {number}"
+        return cls(
+            number=number,
+            theme=_text(data, "Section Theme", where),
+            header=_text(data, "Section Header", where),
+            sub_header=_text(data, "Section Sub-Header", where),
+            insight=_text(data, "Section Insight", where),
+            statistic=_text(data, "Section Statistic", where),
+            recommendation=_text(data, "Section Recommendation", where),
+            sub_sections=[
+                AssetSubSection.from_json(sub_number, block, where)
+                for sub_number, block in _numbered(data, SUB_SECTION_KEY, where)
+            ]
+        )
+
+    def to_json(self) -> dict:
+        block = {
+            "Section Theme": self.theme,
+            "Section Header": self.header,
+            "Section Sub-Header": self.sub_header,
+            "Section Insight": self.insight,
+            "Section Statistic": self.statistic,
+            "Section Recommendation": self.recommendation
+        }
+        for sub in self.sub_sections:
+            block[f"Sub-Section {sub.number}"] = sub.to_json()
+        return block
+
+@dataclass
+class SectionAssets(StructuredOutput):
+    sections: list
+
+    @classmethod
+    def from_json(cls, data):
+        data = _object(data, "Prompt 2 Section Assets")
+        sections = [AssetSection.from_json(number, block) for number, block in _numbered(data, SECTION_KEY, "Prompt 2 Section Assets")]
+        if not sections:
+            raise StructuredOutputError("Prompt 2 Section Assets: no 'Section N' objects")
+        return cls(sections=sections)
+
+    def to_json(self) -> dict:
+        return {f"Section {section.number}": section.to_json() for section in self.sections}
+
+# ─────────────────────────────────────────────
+# Prompt 3 Report Assets
+# ─────────────────────────────────────────────
+@dataclass
+class ReportAssets(StructuredOutput):
+    title: str
+    sub_title: str
+    executive_summary: str
+    key_findings: list
+    call_to_action: str
+    conclusion: str
+    recommendations: list
+
+    @classmethod
+    def from_json(cls, data):
+        where = "Prompt 3 Report Assets"
+        data = _object(data, where)
+        return cls(
+            title=_text(data, "Report Title", where),
+            sub_title=_text(data, "Report Sub-Title", where),
+            executive_summary=_text(data, "Executive Summary", where),
+            key_findings=_text_list(data, "Key Findings", where),
+            call_to_action=_text(data, "Call to Action", where),
+            conclusion=_text(data, "Conclusion", where),
+            recommendations=_text_list(data, "Recommendations", where)
+        )
+
+    def to_json(self) -> dict:
+        return {
+            "Report Title": self.title,
+            "Report Sub-Title": self.sub_title,
+            "Executive Summary": self.executive_summary,
+            "Key Findings": list(self.key_findings),
+            "Call to Action": self.call_to_action,
+            "Conclusion": self.conclusion,
+            "Recommendations": list(self.recommendations)
+        }
+
+# ─────────────────────────────────────────────
+# Prompt 4 Tables
+# ─────────────────────────────────────────────
+@dataclass
+class TableRow:
+    title: str
+    makeup: str
+    change: str
+    effect: str
+
+    @classmethod
+    def from_json(cls, data, prefix: str, where: str):
+        data = _object(data, where)
+        return cls(
+            title=_text(data, f"{prefix} Title", where),
+            makeup=_percent(data, f"{prefix} Makeup", where, aliases=(f"{prefix} MakeUp",)),
+            change=_percent(data, f"{prefix} Change", where),
+            effect=_percent(data, f"{prefix} Effect", where)
+        )
+
+    def to_json(self, prefix: str) -> dict:
+        return {
+            f"{prefix} Title": self.title,
+            f"{prefix} Makeup": self.makeup,
+            f"{prefix} Change": self.change,
+            f"{prefix} Effect": self.effect
+        }
+
+@dataclass
+class ReportTables(StructuredOutput):
+    report_change_title: str
+    report_change: str
+    report_table: list
+    section_tables: dict
+
+    @classmethod
+    def from_json(cls, data):
+        where = "Prompt 4 Tables"
+        data = _object(data, where)
+        report_change = _object(data.get("Report Change"), f"{where} / Report Change")
+        report_table = data.get("Report Table")
+        section_tables = _object(data.get("Section Tables"), f"{where} / Section Tables")
+        if not isinstance(report_table, list) or not report_table:
+            raise StructuredOutputError(f"{where}: 'Report Table' must be a non-empty list")
+
+        tables = {}
+        for title, rows in section_tables.items():
+            if not isinstance(rows, list):
+                raise StructuredOutputError(f"{where}: section table '{title}' must be a list")
+            tables[title.strip()] = [TableRow.from_json(row, "Sub-Section", f"{where} / {title}") for row in rows]
+
+        return cls(
+            report_change_title=_text(report_change, "Report Change Title", where),
+            report_change=_percent(report_change, "Report Change", where),
+            report_table=[TableRow.from_json(row, "Section", f"{where} / Report Table") for row in report_table],
+            section_tables=tables
+        )
+
+    def to_json(self) -> dict:
+        return {
+            "Report Change": {
+                "Report Change Title": self.report_change_title,
+                "Report Change": self.report_change
+            },
+            "Report Table": [row.to_json("Section") for row in self.report_table],
+            "Section Tables": {
+                title: [row.to_json("Sub-Section") for row in rows]
+                for title, rows in self.section_tables.items()
+            }
+        }
@@ -1,11 +1,10 @@
 import uuid
 import json
-from openai import OpenAI
 from logger import logger
 from Engine.Files.write_supabase_file import write_supabase_file
-
-def safe_escape(value):
-    return str(value).replace("{", "{{").replace("}", "}}")
+from Engine.Files.prompt_templates import render_prompt
+from Engine.Runtime.llm_gateway import chat_completion
+from Engine.Runtime.run_store import update_run
 
 def run_prompt(data):
     try:
@@ -15,22 +14,19 @@ def run_prompt(data):
         client_name = data["client"]
         website = data["client_website_url"]
 
-        # Load prompt template
-        with open("Prompts/Client_Context/client_context.txt", "r", encoding="utf-8") as f:
-            template = f.read()
-
-        # Format prompt with escaped input
-        prompt = template.format(
-            client=safe_escape(client_name),
-            client_website_url=safe_escape(website)
+        # Render the precompiled prompt template
+        prompt = render_prompt(
+            "Client_Context/client_context.txt",
+            client=client_name,
+            client_website_url=website
         )
 
         # Send prompt to OpenAI
-        client = OpenAI()
-        response = client.chat.completions.create(
+        response = chat_completion(
             model="gpt-4",
             temperature=0.2,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            bypass_cache=bool(data.get("bypass_llm_cache"))
         )
 
         raw_result = response.choices[0].message.content.strip()
@@ -47,7 +43,9 @@ def run_prompt(data):
 
         supabase_path = f"Predictive_Report/Ai_Responses/Client_Context/{run_id}.txt"
         write_supabase_file(supabase_path, formatted_result)
+        update_run(run_id, artifact_path=supabase_path)
         logger.info(f"AI response written to Supabase at {supabase_path}")
 
     except Exception:
         logger.exception("Error in run_prompt")
+        return {"status": "error", "message": "Failed to write Client Context"}
@@ -1,6 +1,6 @@
-import time
 from logger import logger
 from Engine.Files.read_supabase_file import read_supabase_file
+from Engine.Runtime.completion_registry import wait_for_completion
 
 MAX_RETRIES = 6
 RETRY_DELAY_SECONDS = 2  # 2, 4, 8, 16, 32, 64 seconds
@@ -71,7 +71,8 @@ def run_prompt(data):
 
             except Exception as e:
                 logger.warning(f"File not yet available. Retry {retries + 1} of {MAX_RETRIES}. Error: {str(e)}")
-                time.sleep(RETRY_DELAY_SECONDS * (2 ** retries))
+                # Returns as soon as an in-process writer lands; otherwise re-polls storage after the backoff
+                wait_for_completion(supabase_path, RETRY_DELAY_SECONDS * (2 ** retries))
                 retries += 1
 
         logger.error(f"❌ Max retries exceeded. File not found for run_id: {run_id}")
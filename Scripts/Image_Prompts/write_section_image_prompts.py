@@ -1,38 +1,30 @@
 import uuid
 import json
-from openai import OpenAI
 from logger import logger
 from Engine.Files.write_supabase_file import write_supabase_file
-
-def safe_escape(value):
-    return str(value).replace("{", "{{").replace("}", "}}")
+from Engine.Files.prompt_templates import render_prompt
+from Engine.Runtime.llm_gateway import chat_completion
+from Engine.Runtime.run_store import update_run
 
 def run_prompt(data):
     try:
         run_id = data.get("run_id") or str(uuid.uuid4())
         data["run_id"] = run_id  # ensure it's injected if missing
 
-        # Extract and escape all inputs
-        client = safe_escape(data["client"])
-        client_context = safe_escape(data["client_context"])
-        prompt_2_section_assets = safe_escape(data["prompt_2_section_assets"])
-
-        # Load and populate prompt template
-        with open("Prompts/Image_Prompts/section_image_prompts.txt", "r", encoding="utf-8") as f:
-            template = f.read()
-
-        prompt = template.format(
-            client=client,
-            client_context=client_context,
-            prompt_2_section_assets=prompt_2_section_assets
+        # Render the precompiled prompt template
+        prompt = render_prompt(
+            "Image_Prompts/section_image_prompts.txt",
+            client=data["client"],
+            client_context=data["client_context"],
+            prompt_2_section_assets=data["prompt_2_section_assets"]
         )
 
         # Send prompt to OpenAI
-        client_openai = OpenAI()
-        response = client_openai.chat.completions.create(
+        response = chat_completion(
             model="gpt-4",
             temperature=0.2,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            bypass_cache=bool(data.get("bypass_llm_cache"))
         )
 
         raw_result = response.choices[0].message.content.strip()
@@ -48,6 +40,7 @@ def run_prompt(data):
         # Write AI response to Supabase
         supabase_path = f"Predictive_Report/Ai_Responses/Section_Image_Prompts/{run_id}.txt"
         write_supabase_file(supabase_path, formatted)
+        update_run(run_id, artifact_path=supabase_path)
         logger.info(f"✅ AI response written to Supabase: {supabase_path}")
 
         return {"status": "processing", "run_id": run_id}
@@ -1,20 +1,9 @@
 import uuid
-import re
 from logger import logger
 from Engine.Files.write_supabase_file import write_supabase_file
-from Engine.Files.read_supabase_file import read_supabase_file
-
-# Load American to British dictionary
-def load_american_to_british_dict(filepath):
-    mapping = {}
-    with open(filepath, 'r', encoding='utf-8') as file:
-        for line in file:
-            if ':' in line:
-                us, uk = line.strip().rstrip(',').split(':')
-                mapping[us.strip().strip('"')] = uk.strip().strip('"')
-    return mapping
-
-american_to_british = load_american_to_british_dict("Prompts/American_to_British/american_to_british.txt")
+from Engine.Files.british_english import convert_many_to_british_english
+from Engine.Runtime.report_model import Report, ReportNode
+from Engine.Runtime.report_text import parse_report_text
 
 # Case formatting helpers
 def to_title_case(text):
@@ -86,156 +75,177 @@ asset_formatters = {
     "Recommendations": format_bullet_points,
 }
 
-# Convert to British English
-def convert_to_british_english(text):
-    def replace_match(match):
-        us_word = match.group(0)
-        lowercase_us = us_word.lower()
-        if lowercase_us in american_to_british:
-            british = american_to_british[lowercase_us]
-            if us_word.isupper():
-                return british.upper()
-            elif us_word[0].isupper():
-                return british.capitalize()
-            else:
-                return british
-        return us_word
-
-    pattern = r'\b(' + '|'.join(re.escape(word) for word in american_to_british.keys()) + r')\b'
-    return re.sub(pattern, replace_match, text, flags=re.IGNORECASE)
-
-# Reformat assets with spacing preserved before each new block except Report Table/Section Tables
-
-def reformat_assets(text):
-    inline_keys = {
-        "Section #:", "Section Makeup:", "Section Change:", "Section Effect:",
-        "Sub-Section #:", "Sub-Section Makeup:", "Sub-Section Change:", "Sub-Section Effect:"
-    }
+# Post-formatting: ensure a blank line above and no blank line below for specific headers
+def normalise_table_headers(text, keyword):
     lines = text.split('\n')
-    formatted_lines = []
-    inside_report_table = False
-    inside_section_tables = False
+    new_lines = []
     i = 0
-
     while i < len(lines):
-        stripped = lines[i].strip()
-
-        # --- Block scope entry ---
-        if stripped == "Report Table:":
-            inside_report_table = True
-            inside_section_tables = False
-            formatted_lines.append(stripped)
-            i += 1
-            continue
-
-        if stripped == "Section Tables:":
-            inside_report_table = False
-            inside_section_tables = True
-            formatted_lines.append(stripped)
-            i += 1
-            continue
+        if lines[i].strip() == keyword:
+            if new_lines and new_lines[-1].strip() != "":
+                new_lines.append("")  # ensure blank line before
+            new_lines.append(keyword)
+            # skip any blank line after
+            if i + 1 < len(lines) and lines[i + 1].strip() == "":
+                i += 1
+        else:
+            new_lines.append(lines[i])
+        i += 1
+    return '\n'.join(new_lines)
 
-        # --- Block scope exit ---
-        if stripped.startswith("Section #:") or stripped.startswith("Sub-Section #:"):
-            inside_report_table = False
-            inside_section_tables = False
+def render_header(client, website, context, question, report, year):
+    return f"""Client:
+{to_title_case(client)}
 
-        # --- Format Report Table entries ---
-        if (
-            inside_report_table and
-            i + 3 < len(lines) and
-            stripped.startswith("Section Title:") and
-            lines[i + 1].strip().startswith("Section Makeup:") and
-            lines[i + 2].strip().startswith("Section Change:") and
-            lines[i + 3].strip().startswith("Section Effect:")
-        ):
-            formatted_lines.append("")
-            formatted_lines.append(lines[i].strip())
-            combined = (
-                lines[i + 1].strip() + " | " +
-                lines[i + 2].strip() + " | " +
-                lines[i + 3].strip()
-            )
-            formatted_lines.append(combined)
-            i += 4
-            continue
+Website:
+{website}
 
-        # --- Format Section Tables entries ---
-        if (
-            inside_section_tables and
-            i + 3 < len(lines) and
-            stripped.startswith("Sub-Section Title:") and
-            lines[i + 1].strip().startswith("Sub-Section Makeup:") and
-            lines[i + 2].strip().startswith("Sub-Section Change:") and
-            lines[i + 3].strip().startswith("Sub-Section Effect:")
-        ):
-            formatted_lines.append("")
-            formatted_lines.append(lines[i].strip())
-            combined = (
-                lines[i + 1].strip() + " | " +
-                lines[i + 2].strip() + " | " +
-                lines[i + 3].strip()
-            )
-            formatted_lines.append(combined)
-            i += 4
-            continue
+About Client:
+{to_paragraph_case(context)}
 
-        # --- Format outside tables: combine Section Makeup + Change + Effect only ---
-        if (
-            not inside_report_table and not inside_section_tables and
-            i + 2 < len(lines) and
-            stripped.startswith("Section Makeup:") and
-            lines[i + 1].strip().startswith("Section Change:") and
-            lines[i + 2].strip().startswith("Section Effect:")
-        ):
-            formatted_lines.append("")
-            combined = (
-                lines[i].strip() + " | " +
-                lines[i + 1].strip() + " | " +
-                lines[i + 2].strip()
-            )
-            formatted_lines.append(combined)
-            i += 3
-            continue
+Main Question:
+{to_title_case(question)}
 
-        if (
-            not inside_report_table and not inside_section_tables and
-            i + 2 < len(lines) and
-            stripped.startswith("Sub-Section Makeup:") and
-            lines[i + 1].strip().startswith("Sub-Section Change:") and
-            lines[i + 2].strip().startswith("Sub-Section Effect:")
-        ):
-            formatted_lines.append("")
-            combined = (
-                lines[i].strip() + " | " +
-                lines[i + 1].strip() + " | " +
-                lines[i + 2].strip()
-            )
-            formatted_lines.append(combined)
-            i += 3
-            continue
+Report:
+{to_title_case(report)}
 
-        # --- Standard formatting ---
-        if ':' in lines[i]:
-            key, value = lines[i].split(':', 1)
-            full_key = f"{key.strip()}:"
-            value = value.strip()
-            if full_key in inline_keys:
-                formatted_lines.append(lines[i])
-            else:
-                # Add a blank line before the key only if previous line is not already blank
-                if formatted_lines and formatted_lines[-1].strip() != "":
-                    formatted_lines.append("")
-                formatted_lines.append(f"{full_key}")
-                if value:
-                    formatter = asset_formatters.get(key.strip(), lambda x: x)
-                    formatted_lines.append(formatter(value))
-        else:
-            formatted_lines.append(lines[i])
+Year:
+{year}
 
-        i += 1
+"""
 
-    return '\n'.join(formatted_lines)
+def format_report(report: Report, client="", website="", context="", question="", report_name="", year="") -> Report:
+    """
+    Returns a formatted copy of the report: British spelling on every text field (one
+    batch pass), then the asset_formatters casing on the section and sub-section fields.
+    Intro/outro values keep their wording, and the header fields are cased like
+    render_header.
+    """
+    formatted = Report.from_dict(report.to_dict())
+
+    # Gather every text field, convert them in one pass, write them back
+    setters = []
+    def collect(node):
+        for name in node.__slots__:
+            value = getattr(node, name)
+            if isinstance(value, str) and value:
+                setters.append((value, lambda text, node=node, name=name: setattr(node, name, text)))
+            elif isinstance(value, ReportNode):
+                collect(value)
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    if isinstance(item, ReportNode):
+                        collect(item)
+                    elif isinstance(item, str) and item:
+                        setters.append((item, lambda text, items=value, i=i: items.__setitem__(i, text)))
+    collect(formatted)
+    for (_, assign), text in zip(setters, convert_many_to_british_english(text for text, _ in setters)):
+        assign(text)
+
+    def apply_casing(prefix, node):
+        for attr, label in node.LABELS:
+            formatter = asset_formatters.get(f"{prefix} {label}")
+            if formatter and getattr(node, attr):
+                setattr(node, attr, formatter(getattr(node, attr)))
+        if node.article is not None:
+            for attr, label in node.article.LABELS:
+                formatter = asset_formatters.get(f"{prefix} Related Article {label}")
+                if getattr(node.article, attr):
+                    setattr(node.article, attr, formatter(getattr(node.article, attr)))
+
+    for section in formatted.sections:
+        apply_casing("Section", section)
+        for sub in section.sub_sections:
+            apply_casing("Sub-Section", sub)
+
+    formatted.client = to_title_case(client)
+    formatted.website = website
+    formatted.about_client = to_paragraph_case(context)
+    formatted.main_question = to_title_case(question)
+    formatted.report = to_title_case(report_name)
+    formatted.year = year
+    return formatted
+
+def render_formatted_text(report: Report) -> str:
+    """Renders a formatted report as the format_combine artifact (header, then one block per key)."""
+    lines = []
+
+    def block(key, value):
+        if lines and lines[-1].strip() != "":
+            lines.append("")
+        lines.append(f"{key}:")
+        lines.extend(value.split("\n") if value else [])
+
+    def table(keyword, prefix, rows):
+        lines.append(keyword)
+        for row in rows:
+            lines.append("")
+            lines.append(f"{prefix} Title: {row.title}")
+            lines.append(f"{prefix} Makeup: {row.makeup} | {prefix} Change: {row.change} | {prefix} Effect: {row.effect}")
+
+    def node_fields(prefix, node):
+        for attr, label in node.LABELS:
+            if attr in ("change", "effect"):
+                continue
+            value = getattr(node, attr)
+            if attr == "makeup":
+                if node.makeup and node.change and node.effect:
+                    lines.append("")
+                    lines.append(f"{prefix} Makeup: {node.makeup} | {prefix} Change: {node.change} | {prefix} Effect: {node.effect}")
+                else:
+                    lines.extend(
+                        f"{prefix} {key}: {getattr(node, key.lower())}"
+                        for key in ("Makeup", "Change", "Effect") if getattr(node, key.lower())
+                    )
+            elif value:
+                block(f"{prefix} {label}", value)
+        if node.article is not None:
+            for attr, label in node.article.LABELS:
+                block(f"{prefix} Related Article {label}", getattr(node.article, attr))
+
+    for key, value in [
+        ("Report Title", report.title), ("Report Sub-Title", report.sub_title),
+        ("Executive Summary", report.executive_summary), ("Key Findings", "\n".join(report.key_findings)),
+        ("Call to Action", report.call_to_action), ("Report Change Title", report.report_change_title),
+        ("Report Change", report.report_change)
+    ]:
+        if value:
+            block(key, value)
+    if report.report_table:
+        table("Report Table:", "Section", report.report_table)
+
+    for section in report.sections:
+        lines.append("")
+        lines.append(f"Section #: {section.number}")
+        node_fields("Section", section)
+        if section.table:
+            table("Section Tables:", "Sub-Section", section.table)
+        for sub in section.sub_sections:
+            lines.append("")
+            lines.append(f"Sub-Section #: {section.number}.{sub.number}")
+            node_fields("Sub-Section", sub)
+
+    lines.append("")
+    for key, value in [("Conclusion", report.conclusion), ("Recommendations", "\n".join(report.recommendations))]:
+        if value:
+            block(key, value)
+
+    body = "\n".join(lines)
+    body = normalise_table_headers(body, "Report Table:")
+    body = normalise_table_headers(body, "Section Tables:")
+    header = render_header(report.client, report.website, report.about_client, report.main_question, report.report, report.year)
+    return f"{header}{body.strip()}"
+
+def formatted_path(run_id: str) -> str:
+    return f"Predictive_Report/Ai_Responses/Format_Combine/{run_id}.txt"
+
+def write_formatted_report(run_id: str, report: Report, path: str = None) -> str:
+    """`path` overrides the Ai_Responses location (what-if rewrites the delivered copy)."""
+    final_text = render_formatted_text(report)
+    supabase_path = path or formatted_path(run_id)
+    write_supabase_file(supabase_path, final_text)
+    logger.info(f"✅ New formatted file written to: {supabase_path}")
+    return final_text
 
 # Format full report
 def run_prompt(data):
@@ -252,58 +262,11 @@ def run_prompt(data):
         if not combine:
             raise ValueError("Missing 'combine' content in input data.")
 
-        combine_text = convert_to_british_english(combine)
-        combine_text = reformat_assets(combine_text)
-
-        # Post-formatting: ensure a blank line above and no blank line below for specific headers
-        def normalise_table_headers(text, keyword):
-            lines = text.split('\n')
-            new_lines = []
-            i = 0
-            while i < len(lines):
-                if lines[i].strip() == keyword:
-                    if new_lines and new_lines[-1].strip() != "":
-                        new_lines.append("")  # ensure blank line before
-                    new_lines.append(keyword)
-                    # skip any blank line after
-                    if i + 1 < len(lines) and lines[i + 1].strip() == "":
-                        i += 1
-                else:
-                    new_lines.append(lines[i])
-                i += 1
-            return '\n'.join(new_lines)
-
-        combine_text = normalise_table_headers(combine_text, "Report Table:")
-        combine_text = normalise_table_headers(combine_text, "Section Tables:")
-
-        header = f"""Client:
-{to_title_case(client)}
-
-Website:
-{website}
-
-About Client:
-{to_paragraph_case(context)}
-
-Main Question:
-{to_title_case(question)}
-
-Report:
-{to_title_case(report)}
-
-Year:
-{year}
-
-"""
-        final_text = f"{header}{combine_text.strip()}"
-        supabase_path = f"Predictive_Report/Ai_Responses/Format_Combine/{run_id}.txt"
-        write_supabase_file(supabase_path, final_text)
-        logger.info(f"✅ New formatted file written to: {supabase_path}")
-        try:
-            content = read_supabase_file(supabase_path)
-        except Exception as e:
-            logger.warning(f"⚠️ Could not read file back from Supabase: {e}")
-            content = final_text
+        formatted = format_report(
+            parse_report_text(combine),
+            client=client, website=website, context=context, question=question, report_name=report, year=year
+        )
+        content = write_formatted_report(run_id, formatted)
         return {
             "status": "success",
             "run_id": run_id,
@@ -1,91 +1,73 @@
 import os
-import requests
-from Engine.Files.auth import get_supabase_headers
+from Engine.Files.supabase_client import get_storage_client
+from Engine.Files.artifact_compression import deliver_decompressed
+from Engine.Runtime.finaliser import run_operations, FINALISER_CONCURRENCY
 from logger import logger
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_BUCKET = "panelitix"
 SUPABASE_ROOT_FOLDER = os.getenv("SUPABASE_ROOT_FOLDER")
 
-def move_supabase_file(from_path, to_path, skipped_files):
-    headers = get_supabase_headers()
-    get_url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{from_path}"
-    get_resp = requests.get(get_url, headers=headers)
-    if get_resp.status_code != 200:
-        logger.warning(f"❌ Failed to fetch {from_path}")
-        skipped_files.append(from_path)
-        return
-
-    put_url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{to_path}"
-    put_resp = requests.put(put_url, headers=headers, data=get_resp.content)
-    if put_resp.status_code not in (200, 201):
-        logger.warning(f"❌ Failed to write {to_path}")
-        skipped_files.append(from_path)
-        return
+def move_supabase_file(from_path, to_path):
+    client = get_storage_client()
+    moved = deliver_decompressed(client, from_path, to_path)
+    if moved is None:
+        moved = client.move_object(from_path, to_path)
+    if not moved:
+        logger.warning(f"❌ Failed to move {from_path} → {to_path}")
+        return False
 
     logger.info(f"✅ Moved file: {from_path} → {to_path}")
-    delete_url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{from_path}"
-    requests.delete(delete_url, headers=headers)
+    return True
 
-def move_folder_contents(src_prefix, dst_prefix, skipped_files):
+def list_folder_moves(src_prefix, dst_prefix):
+    """Returns the (from_path, to_path) pairs needed to move every file under src_prefix into dst_prefix."""
     if not dst_prefix:
         logger.warning(f"⚠️ No destination provided for source: {src_prefix}")
-        return
-    headers = get_supabase_headers()
-    list_url = f"{SUPABASE_URL}/storage/v1/object/list/{SUPABASE_BUCKET}?prefix={src_prefix}"
-    resp = requests.get(list_url, headers=headers)
+        return []
+    resp = get_storage_client().list(f"{src_prefix.rstrip('/')}/")
     if resp.status_code != 200:
         logger.warning(f"❌ Failed to list files in: {src_prefix}")
-        return
+        return []
 
-    files = [item for item in resp.json() if not item["name"].endswith(".keep")]
+    files = [
+        item for item in resp.json()
+        if not item["name"].endswith((".keep", ".emptyFolderPlaceholder")) and item.get("id")
+    ]
     if not files:
         logger.info(f"📬 No files to move in: {src_prefix}")
-        return
+        return []
 
     logger.info(f"📦 Found {len(files)} files in: {src_prefix}")
+    moves = []
     for item in files:
         filename = item["name"].split("/")[-1]
-        from_path = item["name"]
+        from_path = f"{src_prefix.rstrip('/')}/{filename}"
         to_path = f"{dst_prefix}/{filename}"
-        move_supabase_file(from_path, to_path, skipped_files)
-
-def copy_supabase_file(from_path, to_path, skipped_files):
-    headers = get_supabase_headers()
-    get_url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{from_path}"
-    get_resp = requests.get(get_url, headers=headers)
-    if get_resp.status_code != 200:
-        logger.warning(f"❌ Failed to copy from {from_path}")
-        skipped_files.append(from_path)
-        return
-
-    put_url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{to_path}"
-    put_resp = requests.put(put_url, headers=headers, data=get_resp.content)
-    if put_resp.status_code not in (200, 201):
-        logger.warning(f"❌ Failed to copy to {to_path}")
-        skipped_files.append(from_path)
-        return
+        moves.append((from_path, to_path))
+    return moves
+
+def copy_supabase_file(from_path, to_path):
+    if not get_storage_client().copy_object(from_path, to_path):
+        logger.warning(f"❌ Failed to copy {from_path} → {to_path}")
+        return False
 
     logger.info(f"✅ Copied file: {from_path} → {to_path}")
+    return True
+
+def delete_keep_file(folder):
+    # ✅ Ensure root prefix
+    if not folder.startswith(SUPABASE_ROOT_FOLDER):
+        folder = f"{SUPABASE_ROOT_FOLDER}/{folder}"
+    keep_file = f"{folder.rstrip('/')}/.keep"
 
-def delete_keep_files(folder_paths):
-    headers = get_supabase_headers()
-    for folder in folder_paths:
-        # ✅ Ensure root prefix
-        if not folder.startswith(SUPABASE_ROOT_FOLDER):
-            folder = f"{SUPABASE_ROOT_FOLDER}/{folder}"
-        keep_file = f"{folder.rstrip('/')}/.keep"
-        url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{keep_file}"
-
-        logger.info(f"🧹 Attempting delete of .keep: {keep_file}")
-        resp = requests.delete(url, headers=headers)
-
-        if resp.status_code in (200, 204):
-            logger.info(f"🧹 Deleted .keep file: {keep_file}")
-        elif resp.status_code == 404:
-            logger.debug(f"📬 No .keep file to delete in: {keep_file}")
-        else:
-            logger.warning(f"⚠️ Failed to delete .keep file: {keep_file} | Status: {resp.status_code}")
+    logger.info(f"🧹 Attempting delete of .keep: {keep_file}")
+    resp = get_storage_client().delete(keep_file)
+
+    if resp.status_code in (200, 204):
+        logger.info(f"🧹 Deleted .keep file: {keep_file}")
+    elif resp.status_code == 404:
+        logger.debug(f"📬 No .keep file to delete in: {keep_file}")
+    else:
+        logger.warning(f"⚠️ Failed to delete .keep file: {keep_file} | Status: {resp.status_code}")
 
 def run_prompt(data: dict) -> dict:
     run_ids = {
@@ -110,7 +92,6 @@ def run_prompt(data: dict) -> dict:
     for key in target_map:
         if not target_map[key].startswith(SUPABASE_ROOT_FOLDER):
             target_map[key] = f"{SUPABASE_ROOT_FOLDER}/{target_map[key]}"
-    skipped_files = []
 
     file_jobs = [
         ("Client_Context", run_ids["client_context"], "Outputs", "client_context", "txt"),
@@ -127,24 +108,52 @@ def run_prompt(data: dict) -> dict:
         ("Section_Image_Prompts", run_ids["section_image_prompts"], "Outputs", "section_image_prompts", "txt"),
     ]
 
+    operations = []
     for folder, run_id, dest_key, prefix, ext in file_jobs:
         from_path = f"{SUPABASE_ROOT_FOLDER}/Predictive_Report/Ai_Responses/{folder}/{run_id}.{ext}"
         to_folder = target_map.get(dest_key)
         if to_folder:
             to_path = f"{to_folder}/{prefix}_{run_id}_.{ext}"
-            move_supabase_file(from_path, to_path, skipped_files)
+            operations.append(("move", from_path, move_supabase_file, (from_path, to_path)))
+
+    folder_moves = [
+        (f"{SUPABASE_ROOT_FOLDER}/Predictive_Report/Logos", target_map.get("Logos", "")),
+        (f"{SUPABASE_ROOT_FOLDER}/Predictive_Report/Question_Context", target_map.get("Question_Context", "")),
+        (f"{SUPABASE_ROOT_FOLDER}/Predictive_Report/Ai_Responses/Report_and_Section_Tables", target_map.get("Report_Tables", target_map.get("Report_and_Section_Tables", ""))),
+    ]
+    folder_file_moves = []
+
+    def collect_folder_moves(src_prefix, dst_prefix):
+        folder_file_moves.extend(list_folder_moves(src_prefix, dst_prefix))
+
+    listings = run_operations([("list", src, collect_folder_moves, (src, dst)) for src, dst in folder_moves])
+    for from_path, to_path in folder_file_moves:
+        operations.append(("move", from_path, move_supabase_file, (from_path, to_path)))
 
-    move_folder_contents(f"{SUPABASE_ROOT_FOLDER}/Predictive_Report/Logos", target_map.get("Logos", ""), skipped_files)
-    move_folder_contents(f"{SUPABASE_ROOT_FOLDER}/Predictive_Report/Question_Context", target_map.get("Question_Context", ""), skipped_files)
-    move_folder_contents(f"{SUPABASE_ROOT_FOLDER}/Predictive_Report/Ai_Responses/Report_and_Section_Tables", target_map.get("Report_Tables", target_map.get("Report_and_Section_Tables", "")), skipped_files)
+    logo_path = f"{SUPABASE_ROOT_FOLDER}/General_Files/Panelitix_Logo.png"
+    operations.append(("copy", logo_path, copy_supabase_file, (logo_path, f"{target_map.get('Logos', '')}/Panelitix_Logo.png")))
 
-    copy_supabase_file(f"{SUPABASE_ROOT_FOLDER}/General_Files/Panelitix_Logo.png",f"{target_map.get('Logos', '')}/Panelitix_Logo.png",skipped_files)
+    finalised = run_operations(operations, concurrency=FINALISER_CONCURRENCY)
 
-    delete_keep_files(folder_paths)
+    # The .keep placeholders only go once every file has landed, so no folder is ever seen empty mid-move
+    cleanup = run_operations([("delete_keep", folder, delete_keep_file, (folder,)) for folder in folder_paths], concurrency=FINALISER_CONCURRENCY)
+
+    skipped_files = [outcome["path"] for outcome in finalised["operations"] if not outcome["ok"]]
+    destinations = {path: args[1] for kind, path, _, args in operations if kind == "move"}
+    delivered_files = {
+        outcome["path"]: destinations[outcome["path"]]
+        for outcome in finalised["operations"] if outcome["ok"] and outcome["path"] in destinations
+    }
 
     return {
         "status": "started",
         "message": "File move operations triggered. You can verify moved files via 2nd webhook.",
         "expected_folders": folder_paths,
-        "skipped_files": skipped_files
+        "skipped_files": skipped_files,
+        "delivered_files": delivered_files,
+        "timings": {
+            "total_seconds": round(listings["total_seconds"] + finalised["total_seconds"] + cleanup["total_seconds"], 3),
+            "listing_seconds": listings["total_seconds"],
+            "operations": finalised["operations"] + cleanup["operations"]
+        }
     }
@@ -2,10 +2,9 @@ import os
 import requests
 from logger import logger
 from collections import defaultdict
-from Engine.Files.auth import get_supabase_headers
+from Engine.Files.supabase_client import get_storage_client, storage_configured
+from Engine.Files.artifact_compression import deliver_decompressed
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_BUCKET = "panelitix"
 SUPABASE_ROOT_FOLDER = os.getenv("SUPABASE_ROOT_FOLDER")
 
 SOURCE_FOLDERS = [
@@ -21,19 +20,15 @@ TARGET_SUFFIXES = [
 ]
 
 def list_files_in_folder(folder_path: str):
-    if not SUPABASE_URL:
+    if not storage_configured():
         logger.error("❌ SUPABASE_URL is not set in environment variables.")
         raise ValueError("SUPABASE_URL not configured")
 
     folder_path = folder_path.rstrip("/") + "/"
-    url = f"{SUPABASE_URL}/storage/v1/object/list/{SUPABASE_BUCKET}"
-    headers = get_supabase_headers()
-    headers["Content-Type"] = "application/json"
-    payload = {"prefix": folder_path, "limit": 1000}
 
     try:
         logger.info(f"📂 Listing files in folder: {folder_path}")
-        response = requests.post(url, headers=headers, json=payload)
+        response = get_storage_client().list(folder_path, limit=1000)
         response.raise_for_status()
         files = response.json()
         return [f["name"].split("/")[-1] for f in files if not f["name"].endswith("/")]
@@ -43,19 +38,16 @@ def list_files_in_folder(folder_path: str):
 
 def find_target_folders(expected_folders_str: str):
     logger.info("🔍 Starting Stage 2: Write target folder validation")
-    headers = get_supabase_headers()
-    headers["Content-Type"] = "application/json"
+    client = get_storage_client()
     target_lookup = {}
 
     all_expected = expected_folders_str.split(",")
     relevant_targets = [f for f in all_expected if any(f.rstrip("/").endswith(suffix) for suffix in TARGET_SUFFIXES)]
 
     for folder in relevant_targets:
-        url = f"{SUPABASE_URL}/storage/v1/object/list/{SUPABASE_BUCKET}"
-        payload = {"prefix": folder, "limit": 1}
         try:
             logger.info(f"🔎 Checking folder: {folder}")
-            response = requests.post(url, headers=headers, json=payload)
+            response = client.list(folder, limit=1)
             response.raise_for_status()
             files = response.json()
             if files and any(not f["name"].endswith("/") for f in files):
@@ -71,7 +63,7 @@ def find_target_folders(expected_folders_str: str):
 
 def copy_and_delete_files(stage_1_results: dict, expected_folders_str: str):
     logger.info("🚀 Starting Stage 3: File copy and cleanup")
-    headers = get_supabase_headers()
+    client = get_storage_client()
     expected_folders = expected_folders_str.split(",")
     # ✅ Ensure all target folders have the root prefix
     expected_folders = [
@@ -102,37 +94,16 @@ def copy_and_delete_files(stage_1_results: dict, expected_folders_str: str):
             source_path = f"{source_folder}/{file_name}"
             target_path = f"{target_folder}/{file_name}"
 
-            # Download
+            # Server-side move (falls back to a streamed copy + delete)
             try:
-                logger.info(f"⬇️ Downloading: {source_path}")
-                download_url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{source_path}"
-                file_response = requests.get(download_url, headers=headers)
-                file_response.raise_for_status()
-                file_bytes = file_response.content
+                logger.info(f"🚚 Moving: {source_path} → {target_path}")
+                moved = deliver_decompressed(client, source_path, target_path)
+                if moved is None:
+                    moved = client.move_object(source_path, target_path)
+                if not moved:
+                    logger.error(f"❌ Failed to move {source_path} → {target_path}")
             except requests.RequestException as e:
-                logger.error(f"❌ Failed to download {source_path}: {e}")
-                continue
-
-            # Upload
-            try:
-                logger.info(f"⬆️ Uploading: {target_path}")
-                upload_url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{target_path}"
-                upload_headers = headers.copy()
-                upload_headers["Content-Type"] = "application/octet-stream"
-                upload_response = requests.post(upload_url, headers=upload_headers, data=file_bytes)
-                upload_response.raise_for_status()
-            except requests.RequestException as e:
-                logger.error(f"❌ Failed to upload to {target_path}: {e}")
-                continue
-
-            # Delete original
-            try:
-                logger.info(f"🗑️ Deleting: {source_path}")
-                delete_url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{source_path}"
-                delete_response = requests.delete(delete_url, headers=headers)
-                delete_response.raise_for_status()
-            except requests.RequestException as e:
-                logger.error(f"❌ Failed to delete {source_path}: {e}")
+                logger.error(f"❌ Failed to move {source_path} → {target_path}: {e}")
 
 def run_prompt(payload: dict) -> dict:
     logger.info("🚀 Starting Stage 1: Source folder file lookup")
@@ -1,7 +1,8 @@
 import json
-import time
 from logger import logger
 from Engine.Files.read_supabase_file import read_supabase_file
+from Engine.Files.document_loader import loads_json
+from Engine.Runtime.completion_registry import wait_for_completion
 
 MAX_RETRIES = 6
 RETRY_DELAY_SECONDS = 2  # 2, 4, 8, 16, 32, 64 seconds
@@ -33,6 +34,20 @@ def flatten_json_like_text(text: str) -> str:
 
     return "\n".join(result)
 
+def split_change_effect(content: str):
+    """
+    Returns (report_change, sections JSON text) from a Change_Effect_Maths file with
+    one parse. Files written before it became a single JSON object hold two blocks,
+    {"Report Change": ...} then the sections.
+    """
+    content = content.strip()
+    if "}\n\n{" in content:
+        report_block, sections_block = content.split("}\n\n{", 1)
+        return loads_json(report_block + "}", stage="read_change_effect_maths").get("Report Change", ""), "{" + sections_block
+    document = loads_json(content, stage="read_change_effect_maths")
+    report_change = document.pop("Report Change", "")
+    return report_change, json.dumps(document, indent=2, ensure_ascii=False)
+
 def run_prompt(data):
     try:
         run_id = data.get("run_id")
@@ -48,28 +63,22 @@ def run_prompt(data):
                 content = read_supabase_file(supabase_path)
                 logger.info(f"✅ File retrieved successfully from Supabase for run_id: {run_id}")
 
-                # Separate Report Change and main content
-                split_blocks = content.strip().split("}\n\n{", 1)
-                if len(split_blocks) != 2:
-                    raise ValueError("Unexpected file structure: Expected two JSON blocks.")
-
-                # Reconstruct valid JSON strings
-                report_change_json = json.loads(split_blocks[0] + "}")
-                full_json_string = "{" + split_blocks[1]
+                report_change, sections_text = split_change_effect(content)
 
                 # Flatten content for Zapier display
-                flattened = flatten_json_like_text("{" + split_blocks[1]).replace("{:", "")
+                flattened = flatten_json_like_text(sections_text).replace("{:", "")
 
                 return {
                     "status": "success",
                     "run_id": run_id,
                     "change_effect_maths": flattened,
-                    "report_change": report_change_json.get("Report Change", "")
+                    "report_change": report_change
                 }
 
             except Exception as e:
                 logger.warning(f"File not yet available. Retry {retries + 1} of {MAX_RETRIES}. Error: {str(e)}")
-                time.sleep(RETRY_DELAY_SECONDS * (2 ** retries))
+                # Returns as soon as an in-process writer lands; otherwise re-polls storage after the backoff
+                wait_for_completion(supabase_path, RETRY_DELAY_SECONDS * (2 ** retries))
                 retries += 1
 
         logger.error(f"❌ Max retries exceeded. File not found for run_id: {run_id}")
@@ -1,10 +1,7 @@
 import os
-import requests
-from Engine.Files.auth import get_supabase_headers
+from Engine.Files.supabase_client import get_storage_client
 from logger import logger
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_BUCKET = "panelitix"
 SUPABASE_ROOT_FOLDER = os.getenv("SUPABASE_ROOT_FOLDER")
 
 def folder_exists(path: str) -> bool:
@@ -13,12 +10,10 @@ def folder_exists(path: str) -> bool:
     """
     full_path = f"{SUPABASE_ROOT_FOLDER}/{path}"
     keep_file_path = f"{full_path}/.keep"
-    url = f"{SUPABASE_URL}/storage/v1/object/info/{SUPABASE_BUCKET}/{keep_file_path}"
-    headers = get_supabase_headers()
 
     try:
         logger.info(f"🔍 Checking folder: {path}")
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = get_storage_client().info(keep_file_path, timeout=10)
         if resp.status_code == 200:
             logger.info(f"✅ Folder exists: {path}")
             return True
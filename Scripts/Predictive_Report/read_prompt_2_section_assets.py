@@ -1,6 +1,7 @@
-import time
 from logger import logger
 from Engine.Files.read_supabase_file import read_supabase_file
+from Engine.Runtime.completion_registry import is_completed, wait_for_completion
+from Engine.Runtime.partial_artifacts import get_partial
 
 MAX_RETRIES = 6
 RETRY_DELAY_SECONDS = 2  # 2, 4, 8, 16, 32, 64 seconds
@@ -53,6 +54,11 @@ def run_prompt(data):
         while retries < MAX_RETRIES:
             try:
                 logger.info(f"Attempting to read Supabase file: {supabase_path} (Attempt {retries + 1})")
+                if data.get("allow_partial") and not is_completed(supabase_path):
+                    # Still streaming in this process: hand back what has arrived so far
+                    partial = get_partial(supabase_path)
+                    if partial is not None:
+                        return {"status": "partial", "run_id": run_id, **partial.snapshot(include_content=True)}
                 content = read_supabase_file(supabase_path)
                 logger.info(f"✅ File retrieved successfully from Supabase for run_id: {run_id}")
 
@@ -66,7 +72,8 @@ def run_prompt(data):
 
             except Exception as e:
                 logger.warning(f"File not yet available. Retry {retries + 1} of {MAX_RETRIES}. Error: {str(e)}")
-                time.sleep(RETRY_DELAY_SECONDS * (2 ** retries))
+                # Returns as soon as an in-process writer lands; otherwise re-polls storage after the backoff
+                wait_for_completion(supabase_path, RETRY_DELAY_SECONDS * (2 ** retries))
                 retries += 1
 
         logger.error(f"❌ Max retries exceeded. File not found for run_id: {run_id}")
@@ -0,0 +1,240 @@
+import uuid
+from logger import logger
+from Engine.Runtime.pipeline import run_pipeline, PipelineError
+from Engine.Runtime.run_store import update_run
+from Engine.Runtime.report_model import Report
+from Scripts.Website_Year import website, year
+from Scripts.Client_Context import write_client_context, read_client_context
+from Scripts.Image_Prompts import (
+    write_section_image_prompts, read_section_image_prompts,
+    write_report_image_prompts, read_report_image_prompts,
+    format_image_prompts
+)
+from Scripts.Predictive_Report import (
+    read_question_context,
+    write_prompt_1_thinking, write_change_effect_maths,
+    write_prompt_2_section_assets, write_prompt_3_report_assets, write_prompt_4_tables,
+    combine, format_combine, csv_content, report_and_section_table_csv,
+    write_create_folders, move_files_1, what_if
+)
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+def check_result(stage: str, result) -> dict:
+    result = result or {}
+    if result.get("status") == "error" or "error" in result:
+        raise RuntimeError(f"{stage}: {result.get('message') or result.get('error')}")
+    return result
+
+def write_then_read(stage: str, writer, reader, payload: dict):
+    """
+    Runs a write_* stage and its matching read_* stage under a fresh run_id.
+    The write lands in-process, so the read is served from the completion registry
+    instead of polling Supabase.
+    """
+    run_id = str(uuid.uuid4())
+    check_result(stage, writer.run_prompt({**payload, "run_id": run_id}))
+    return run_id, check_result(stage, reader.run_prompt({"run_id": run_id}))
+
+def write_structured(writer, payload: dict):
+    """
+    Runs a JSON-mode write_* stage under a fresh run_id and returns its validated,
+    typed output directly; the artifact is still written for external readers.
+    """
+    run_id = str(uuid.uuid4())
+    return run_id, writer.run_structured({**payload, "run_id": run_id})
+
+# ─────────────────────────────────────────────
+# Stages (each takes a context snapshot, returns new context keys)
+# Prompt 1's numeric follow-up (change_effect_maths) is what later stages consume
+# as "prompt_1_thinking", since it carries the makeup/change/effect values.
+# The JSON-mode stages pass their typed outputs along; the text renderings only
+# feed the prompt templates. From combine on, every artifact renders from one
+# Report model (format_combine works on its formatted copy).
+# ─────────────────────────────────────────────
+def website_stage(ctx):
+    result = check_result("website", website.run_prompt(ctx))
+    return {"client_website": result["normalized_website"]}
+
+def year_stage(ctx):
+    return {"year": check_result("year", year.run_prompt(ctx))["year"]}
+
+def client_context_stage(ctx):
+    run_id, result = write_then_read("client_context", write_client_context, read_client_context, ctx)
+    return {"client_context": result["client_context"], "client_context_run_id": run_id}
+
+def question_context_stage(ctx):
+    result = check_result("question_context", read_question_context.run_prompt(ctx))
+    return {"question_context": result["question_context"]}
+
+def create_folders_stage(ctx):
+    run_id = str(uuid.uuid4())
+    expected_paths = write_create_folders.build_expected_paths(ctx)
+    write_create_folders.background_create_folders(run_id, expected_paths)
+    return {"expected_folders": ",".join(expected_paths)}
+
+def prompt_1_stage(ctx):
+    run_id, thinking = write_structured(write_prompt_1_thinking, ctx)
+    return {"thinking": thinking, "prompt_1_thinking_run_id": run_id}
+
+def change_effect_maths_stage(ctx):
+    run_id = str(uuid.uuid4())
+    change_effect = write_change_effect_maths.background_task(run_id, {"prompt_1_thinking": ctx["thinking"]})
+    if change_effect is None:
+        raise RuntimeError("change_effect_maths: failed to process Prompt 1 Thinking")
+    return {
+        "change_effect": change_effect,
+        "change_effect_maths": change_effect.to_text(),
+        "report_change": change_effect.report_change,
+        "change_effect_maths_run_id": run_id
+    }
+
+def prompt_2_stage(ctx):
+    payload = {**ctx, "prompt_1_thinking": ctx["change_effect_maths"]}
+    run_id, section_assets = write_structured(write_prompt_2_section_assets, payload)
+    return {
+        "section_assets": section_assets,
+        "prompt_2_section_assets": section_assets.to_text(),
+        "prompt_2_section_assets_run_id": run_id
+    }
+
+def prompt_3_stage(ctx):
+    payload = {**ctx, "prompt_1_thinking": ctx["change_effect_maths"]}
+    run_id, report_assets = write_structured(write_prompt_3_report_assets, payload)
+    return {
+        "report_assets": report_assets,
+        "prompt_3_report_assets": report_assets.to_text(),
+        "prompt_3_report_assets_run_id": run_id
+    }
+
+def prompt_4_stage(ctx):
+    payload = {**ctx, "prompt_1_thinking": ctx["change_effect_maths"]}
+    run_id, report_tables = write_structured(write_prompt_4_tables, payload)
+    return {"report_tables": report_tables, "prompts_4_tables_run_id": run_id}
+
+def section_image_prompts_stage(ctx):
+    run_id, result = write_then_read("section_image_prompts", write_section_image_prompts, read_section_image_prompts, ctx)
+    return {"section_image_prompts": result["section_image_prompts"], "section_image_prompts_run_id": run_id}
+
+def report_image_prompts_stage(ctx):
+    run_id, result = write_then_read("report_image_prompts", write_report_image_prompts, read_report_image_prompts, ctx)
+    return {"report_image_prompts": result["report_image_prompts"], "report_image_prompts_run_id": run_id}
+
+def combine_stage(ctx):
+    run_id = str(uuid.uuid4())
+    report = Report.from_structured(ctx["change_effect"], ctx["section_assets"], ctx["report_assets"], ctx["report_tables"])
+    return {"report_model": report, "combine": combine.combine_report(run_id, report), "combine_run_id": run_id}
+
+def format_combine_stage(ctx):
+    run_id = str(uuid.uuid4())
+    formatted = format_combine.format_report(
+        ctx["report_model"],
+        client=ctx["client"].strip(),
+        website=ctx["client_website"].strip(),
+        context=ctx["client_context"].strip(),
+        question=ctx["main_question"].strip(),
+        report_name=ctx.get("report", "").strip(),
+        year=str(ctx["year"]).strip()
+    )
+    return {
+        "formatted_report": formatted,
+        "format_combine": format_combine.write_formatted_report(run_id, formatted),
+        "format_combine_run_id": run_id
+    }
+
+def format_image_prompts_stage(ctx):
+    result = check_result("format_image_prompts", format_image_prompts.run_prompt({
+        "report_image_prompts": ctx["report_image_prompts"],
+        "section_image_prompts": ctx["section_image_prompts"]
+    }))
+    return {"format_image_prompts": result["formatted_content"], "format_image_prompts_run_id": result["run_id"]}
+
+def csv_content_stage(ctx):
+    run_id = str(uuid.uuid4())
+    csv_content.write_report_model_csv(run_id, ctx["formatted_report"])
+    return {"csv_content_run_id": run_id}
+
+def tables_stage(ctx):
+    result = report_and_section_table_csv.write_report_tables(str(uuid.uuid4()), ctx["formatted_report"])
+    return {"report_table": result["report_table"], "section_tables": result["section_tables"], "tables_run_id": result["run_id"]}
+
+def move_files_stage(ctx):
+    result = move_files_1.run_prompt(ctx)
+    return {"skipped_files": result["skipped_files"], "delivered_files": result["delivered_files"]}
+
+def effect_tree_stage(ctx):
+    # Kept so /runs/<run_id>/what-if can adjust one sub-section without re-running the report.
+    # Runs after move_files: what-if rewrites the delivered copies, never the swept Ai_Responses ones.
+    report = ctx["formatted_report"]
+    staged = {
+        "change_effect_maths": f"{write_change_effect_maths.SAVE_DIR}/{ctx['change_effect_maths_run_id']}.txt",
+        "format_combine": format_combine.formatted_path(ctx["format_combine_run_id"]),
+        "csv_content": csv_content.csv_path(ctx["csv_content_run_id"]),
+        "report_table": report_and_section_table_csv.report_table_path(ctx["tables_run_id"], report),
+        **{
+            f"section_table_{section.number}": report_and_section_table_csv.section_table_path(ctx["tables_run_id"], section)
+            for section in report.sections
+        }
+    }
+    what_if.keep_effect_tree(ctx["run_id"], ctx["thinking"], report=report, artifacts=what_if.delivered_paths(staged, ctx["delivered_files"]))
+    return {}
+
+STAGES = [
+    ("website", [], website_stage),
+    ("year", [], year_stage),
+    ("client_context", [], client_context_stage),
+    ("question_context", [], question_context_stage),
+    ("create_folders", [], create_folders_stage),
+    ("prompt_1_thinking", ["client_context", "question_context"], prompt_1_stage),
+    ("change_effect_maths", ["prompt_1_thinking"], change_effect_maths_stage),
+    ("prompt_2_section_assets", ["change_effect_maths"], prompt_2_stage),
+    ("prompt_4_tables", ["change_effect_maths"], prompt_4_stage),
+    ("prompt_3_report_assets", ["prompt_2_section_assets"], prompt_3_stage),
+    ("section_image_prompts", ["prompt_2_section_assets"], section_image_prompts_stage),
+    ("report_image_prompts", ["prompt_3_report_assets"], report_image_prompts_stage),
+    ("combine", ["prompt_2_section_assets", "prompt_3_report_assets", "prompt_4_tables"], combine_stage),
+    ("format_combine", ["combine", "website", "year"], format_combine_stage),
+    ("format_image_prompts", ["section_image_prompts", "report_image_prompts"], format_image_prompts_stage),
+    ("csv_content", ["format_combine"], csv_content_stage),
+    ("report_and_section_table_csv", ["format_combine"], tables_stage),
+    ("move_files", [
+        "create_folders", "csv_content", "report_and_section_table_csv", "format_image_prompts"
+    ], move_files_stage),
+    ("effect_tree", ["move_files"], effect_tree_stage),
+]
+
+# ─────────────────────────────────────────────
+# Main Entry
+# ─────────────────────────────────────────────
+def run_prompt(data: dict) -> dict:
+    run_id = data.get("run_id") or str(uuid.uuid4())
+    logger.info(f"📦 Running full predictive report pipeline for run_id: {run_id}")
+
+    context = {**data, "run_id": run_id}
+
+    def on_progress(running):
+        update_run(run_id, f"running: {', '.join(running)}")
+
+    try:
+        timings = run_pipeline(STAGES, context, on_progress=on_progress)
+    except PipelineError as e:
+        logger.exception(f"❌ Report pipeline failed at stage: {e.stage}")
+        return {
+            "status": "error",
+            "run_id": run_id,
+            "message": str(e),
+            "failed_stage": e.stage,
+            "completed_stages": e.completed
+        }
+
+    logger.info(f"✅ Report pipeline finished in {timings['total']}s for run_id: {run_id}")
+    return {
+        "status": "success",
+        "run_id": run_id,
+        "expected_folders": context["expected_folders"].split(","),
+        "report_table": context.get("report_table"),
+        "section_tables": context.get("section_tables", []),
+        "skipped_files": context.get("skipped_files", []),
+        "timings": timings
+    }
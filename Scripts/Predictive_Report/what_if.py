@@ -0,0 +1,108 @@
+import os
+import json
+import time
+from logger import logger
+from Engine.Files.read_supabase_file import read_supabase_file
+from Engine.Files.write_supabase_file import write_supabase_file
+from Engine.Files.document_loader import loads_json
+from Engine.Runtime.dispatcher import submit_background, QueueFullError
+from Engine.Runtime.effect_tree import EffectTree, register_effect_tree, get_effect_tree
+from Scripts.Predictive_Report import csv_content, format_combine, report_and_section_table_csv
+from Scripts.Predictive_Report.write_change_effect_maths import render_change_effect
+
+SUPABASE_ROOT_FOLDER = os.getenv("SUPABASE_ROOT_FOLDER")
+CHECKPOINT_DIR = "Predictive_Report/Ai_Responses/What_If"
+
+# ─────────────────────────────────────────────
+# Effect tree storage
+# ─────────────────────────────────────────────
+def save_checkpoint(run_id: str, checkpoint: dict):
+    write_supabase_file(f"{CHECKPOINT_DIR}/{run_id}.json", json.dumps(checkpoint, ensure_ascii=False))
+
+def delivered_paths(staged: dict, delivered_files: dict) -> dict:
+    """
+    Maps each staged artifact (name -> Ai_Responses path) to where move_files delivered
+    it. The staging copies are gone by then, so artifacts that were not delivered are
+    left out and never rewritten.
+    """
+    paths = {}
+    for name, path in staged.items():
+        target = delivered_files.get(f"{SUPABASE_ROOT_FOLDER}/{path}")
+        if target:
+            paths[name] = target[len(SUPABASE_ROOT_FOLDER) + 1:]
+    return paths
+
+def keep_effect_tree(run_id: str, thinking, report=None, artifacts: dict = None) -> EffectTree:
+    """Holds a finished run's effect tree in memory and checkpoints it so any worker can pick it up."""
+    tree = register_effect_tree(run_id, EffectTree(thinking, report=report, artifacts=artifacts))
+    save_checkpoint(run_id, tree.to_checkpoint())
+    return tree
+
+def load_effect_tree(run_id: str) -> EffectTree:
+    tree = get_effect_tree(run_id)
+    if tree is None:
+        logger.info(f"🌳 Effect tree for {run_id} not in memory; loading checkpoint")
+        tree = register_effect_tree(run_id, EffectTree.from_checkpoint(loads_json(read_supabase_file(f"{CHECKPOINT_DIR}/{run_id}.json"), stage="what_if")))
+    return tree
+
+# ─────────────────────────────────────────────
+# Persist: rewrite only what a delta touched
+# ─────────────────────────────────────────────
+def persist(run_id: str, tree: EffectTree):
+    """Rewrites the delivered copies (tree.artifacts: artifact name -> path) of everything the pending deltas changed."""
+    with tree.persist_lock:
+        snapshot = tree.snapshot()
+        if not snapshot["dirty_sections"]:
+            return  # an earlier persist already wrote this revision
+        paths = tree.artifacts
+        start = time.perf_counter()
+
+        if paths.get("change_effect_maths"):
+            write_supabase_file(paths["change_effect_maths"], render_change_effect(snapshot["output"]))
+
+        report = snapshot["report"]
+        if report is not None:
+            if paths.get("format_combine"):
+                format_combine.write_formatted_report(run_id, report, path=paths["format_combine"])
+            if paths.get("report_table"):
+                report_and_section_table_csv.write_report_table(run_id, report, path=paths["report_table"])
+            numbers = {snapshot["output"].sections[index].number for index in snapshot["dirty_sections"]}
+            for section in report.sections:
+                path = paths.get(f"section_table_{section.number}")
+                if section.number in numbers and path:
+                    report_and_section_table_csv.write_section_table(run_id, section, path=path)
+            if paths.get("csv_content"):
+                csv_content.write_report_model_csv(run_id, report, path=paths["csv_content"])
+
+        save_checkpoint(run_id, snapshot["checkpoint"])
+        logger.info(
+            f"🌳 What-if revision {snapshot['revision']} written for {run_id} "
+            f"({len(snapshot['dirty_sections'])} section(s), {time.perf_counter() - start:.2f}s)"
+        )
+
+# ─────────────────────────────────────────────
+# Main Entry
+# ─────────────────────────────────────────────
+def run_prompt(data: dict) -> dict:
+    """
+    Applies one sub-section delta to a finished run: {"run_id", "section", "sub_section",
+    "makeup" and/or "change"}. Returns the recomputed values straight away; the
+    changed artifacts are rewritten in the background (inline when that lane is full).
+    """
+    run_id = data.get("run_id")
+    if not run_id:
+        return {"status": "error", "message": "Missing run_id"}
+    try:
+        tree = load_effect_tree(run_id)
+        result = tree.apply_delta(data.get("section"), data.get("sub_section"), makeup=data.get("makeup"), change=data.get("change"))
+    except Exception as e:
+        logger.error(f"❌ What-if failed for {run_id}: {e}")
+        return {"status": "error", "run_id": run_id, "message": str(e)}
+
+    try:
+        submit_background(persist, run_id, tree)
+    except QueueFullError:
+        logger.warning(f"🚦 Background lane full; persisting what-if {run_id} inline")
+        persist(run_id, tree)
+    logger.info(f"🌳 What-if {run_id} Sub-Section {data.get('section')}.{data.get('sub_section')} → Report Change {result['report_change']} ({result['compute_ms']} ms)")
+    return {"status": "success", "run_id": run_id, **result}
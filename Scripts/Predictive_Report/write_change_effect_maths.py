@@ -1,138 +1,75 @@
 import uuid
-import yaml
 import json
-from threading import Thread
 from logger import logger
-from decimal import Decimal, ROUND_HALF_UP
 from Engine.Files.write_supabase_file import write_supabase_file
-
-# --- Formatters ---
-def format_integer_percent(value) -> str:
-    return f"{int(round(Decimal(value)))}%"
-
-def format_decimal_percent(value) -> str:
-    return f"{Decimal(value).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)}%"
-
-def quantize_1dp(value) -> Decimal:
-    return Decimal(value).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+from Engine.Files.document_loader import load_document
+from Engine.Runtime.dispatcher import submit_background, QueueFullError
+from Engine.Runtime.run_store import record_run, update_run
+from Engine.Runtime.structured_output import Prompt1Thinking
+from Engine.Runtime.change_effect import compute_change_effect, change_effect_sensitivity, CHANGE_EFFECT_SENSITIVITY_ENABLED
+
+SAVE_DIR = "Predictive_Report/Ai_Responses/Change_Effect_Maths"
+
+# --- Input loading ---
+def load_prompt_1_thinking(raw) -> Prompt1Thinking:
+    """
+    Accepts the typed Prompt 1 output from in-process callers, its JSON object,
+    or (from Zapier) the JSON/flattened text returned by read_prompt_1_thinking.
+    """
+    if isinstance(raw, Prompt1Thinking):
+        return raw
+    if isinstance(raw, str):
+        raw = load_document(raw, stage="write_change_effect_maths")
+    return Prompt1Thinking.from_json(raw)
 
 # --- Core transformation ---
-def build_structured_output(prompt_1_thinking: dict) -> dict:
-    result = {}
-
-    for section_key in sorted(prompt_1_thinking.keys()):
-        if not section_key.lower().startswith("section "):
-            continue
-        section_data = prompt_1_thinking[section_key]
-        sub_sections = {}
-        sub_section_effects = []
-
-        section_title = section_data.get("Section Title", "").strip()
-        section_summary = section_data.get("Section Summary", "").strip()
-        section_makeup_str = section_data.get("Section MakeUp", "0%").strip().replace('%', '')
-
-        try:
-            section_makeup = quantize_1dp(section_makeup_str)
-        except Exception:
-            section_makeup = Decimal("0.0")
-
-        section_output = {
-            "Section Title": section_title,
-            "Section Summary": section_summary,
-            "Section MakeUp": format_integer_percent(section_makeup),
-            "Section Change": None,
-            "Section Effect": None
-        }
-
-        if "Section Related Article" in section_data:
-            section_output["Section Related Article"] = section_data["Section Related Article"]
-
-        for sub_key in sorted(section_data.keys()):
-            sub_data = section_data[sub_key]
-            if (
-                isinstance(sub_data, dict)
-                and sub_key.lower().startswith("sub-section ")
-                and "Sub-Section Title" in sub_data
-            ):
-                sub_output = {}
-                sub_output["Sub-Section Title"] = sub_data.get("Sub-Section Title", "").strip()
-                sub_output["Sub-Section Summary"] = sub_data.get("Sub-Section Summary", "").strip()
-
-                sub_makeup_str = sub_data.get("Sub-Section MakeUp", "0%").strip().replace('%', '')
-                sub_change_str = sub_data.get("Sub-Section Change", "0%").strip().replace('%', '')
-
-                try:
-                    sub_makeup = quantize_1dp(sub_makeup_str)
-                    sub_change = Decimal(int(round(float(sub_change_str))))  # force integer
-                    raw_effect = (sub_makeup / Decimal(100)) * sub_change
-                    sub_effect = quantize_1dp(raw_effect)
-                except Exception:
-                    sub_makeup = Decimal("0.0")
-                    sub_change = Decimal("0")
-                    sub_effect = Decimal("0.0")
-
-                sub_output["Sub-Section MakeUp"] = format_integer_percent(sub_makeup)
-                sub_output["Sub-Section Change"] = format_decimal_percent(sub_change)
-                sub_output["Sub-Section Effect"] = format_decimal_percent(sub_effect)
-
-                if "Sub-Section Related Article" in sub_data:
-                    sub_output["Sub-Section Related Article"] = sub_data["Sub-Section Related Article"]
+def build_structured_output(prompt_1_thinking: Prompt1Thinking) -> Prompt1Thinking:
+    return compute_change_effect(prompt_1_thinking)
 
-                sub_sections[sub_key] = sub_output
-                sub_section_effects.append(sub_effect)
-
-        # Final section-level computation
-        section_change = quantize_1dp(sum(sub_section_effects))
-        section_effect = quantize_1dp((section_makeup / Decimal(100)) * section_change)
-
-        section_output["Section Change"] = format_decimal_percent(section_change)
-        section_output["Section Effect"] = format_decimal_percent(section_effect)
-
-        for sub_key, sub_data in sub_sections.items():
-            section_output[sub_key] = sub_data
-
-        result[section_key] = section_output
-
-    return result
+def render_change_effect(structured_output: Prompt1Thinking) -> str:
+    """The Change_Effect_Maths artifact: one JSON object, the Report Change first, then the sections."""
+    return json.dumps({"Report Change": structured_output.report_change, **structured_output.to_json()}, indent=2, ensure_ascii=False)
 
 # --- Write logic ---
 def background_task(run_id: str, raw_data: dict):
-    filename = f"{run_id}.txt"
-    supabase_path = f"Predictive_Report/Ai_Responses/Change_Effect_Maths/{filename}"
+    """Computes and stores the change/effect maths; returns the typed result (None on failure)."""
+    supabase_path = f"{SAVE_DIR}/{run_id}.txt"
+    update_run(run_id, "running")
+    structured_output = None
+    error = None
 
     try:
-        raw_prompt = raw_data.get("prompt_1_thinking", "")
-        prompt_data = yaml.safe_load(raw_prompt)
+        prompt_data = load_prompt_1_thinking(raw_data.get("prompt_1_thinking", ""))
         structured_output = build_structured_output(prompt_data)
+        full_text_output = render_change_effect(structured_output)
 
-        # Calculate Report Change from Section Effects
-        section_effects = []
-        for section_data in structured_output.values():
-            effect_str = section_data.get("Section Effect", "0.0%").replace('%', '').strip()
-            try:
-                section_effects.append(Decimal(effect_str))
-            except Exception:
-                section_effects.append(Decimal("0.0"))
-
-        report_change = quantize_1dp(sum(section_effects))
-        report_change_formatted = format_decimal_percent(report_change)
-
-        # Create report change block
-        report_change_block = json.dumps({"Report Change": report_change_formatted}, indent=2)
-
-        # Full structured output block
-        structured_output_block = json.dumps(structured_output, indent=2)
-
-        # Combine and write both to file
-        full_text_output = f"{report_change_block}\n\n{structured_output_block}"
+        if raw_data.get("sensitivity", CHANGE_EFFECT_SENSITIVITY_ENABLED):
+            bands = change_effect_sensitivity(prompt_data)
+            write_supabase_file(
+                f"Predictive_Report/Ai_Responses/Change_Effect_Sensitivity/{run_id}.json",
+                json.dumps(bands, indent=2)
+            )
 
     except Exception as e:
+        structured_output = None
         full_text_output = f"Failed to process data: {str(e)}"
+        error = full_text_output
         logger.error(full_text_output)
 
-    write_supabase_file(supabase_path, full_text_output)
+    try:
+        write_supabase_file(supabase_path, full_text_output)
+    except Exception as e:
+        update_run(run_id, "failed", error=str(e))
+        raise
+    update_run(run_id, "failed" if error else "completed", artifact_path=supabase_path, error=error)
+    return structured_output
 
 def run_prompt(data):
     run_id = str(uuid.uuid4())
-    Thread(target=background_task, args=(run_id, data)).start()
+    record_run(run_id, "write_change_effect_maths")
+    try:
+        submit_background(background_task, run_id, data)
+    except QueueFullError as e:
+        update_run(run_id, "failed", error=str(e))
+        raise
     return {"run_id": run_id}
@@ -1,13 +1,11 @@
 import os
 import uuid
-import threading
-import requests
 from datetime import datetime
-from Engine.Files.auth import get_supabase_headers
+from Engine.Files.supabase_client import get_storage_client
+from Engine.Runtime.dispatcher import submit_background
+from Engine.Runtime.run_store import record_run, update_run
 from logger import logger
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_BUCKET = "panelitix"
 SUPABASE_ROOT_FOLDER = os.getenv("SUPABASE_ROOT_FOLDER")
 
 def normalise_path_segment(segment):
@@ -20,20 +18,17 @@ def create_folder(path):
     """Create a folder by uploading a .keep file inside it."""
     full_path = f"{SUPABASE_ROOT_FOLDER}/{path}"
     keep_file_path = f"{full_path}/.keep"
-    url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{keep_file_path}"
-    headers = get_supabase_headers()
-    headers["Content-Type"] = "text/plain"
+    client = get_storage_client()
 
     try:
         # Check if it already exists
-        check_url = f"{SUPABASE_URL}/storage/v1/object/info/{SUPABASE_BUCKET}/{keep_file_path}"
-        check_resp = requests.get(check_url, headers=headers, timeout=5)
+        check_resp = client.info(keep_file_path, timeout=5)
         if check_resp.status_code == 200:
             logger.info(f"📂 Folder already exists: {path}")
             return
 
         # Attempt upload
-        response = requests.put(url, headers=headers, data=b"", timeout=10)
+        response = client.put(keep_file_path, b"", content_type="text/plain", timeout=10)
         if response.status_code not in (200, 201):
             logger.warning(f"⚠️ Folder creation failed: {path} ({response.status_code}) - {response.text}")
         else:
@@ -73,17 +68,19 @@ def build_expected_paths(data):
     expected_paths += [f"{dated_path}/{folder}" for folder in subfolders]
     return expected_paths
 
-def background_create_folders(paths):
+def background_create_folders(run_id, paths):
+    update_run(run_id, "running")
     for path in paths:
         create_folder(path)
+    update_run(run_id, "completed")
 
 def run_prompt(data: dict) -> dict:
     run_id = str(uuid.uuid4())
     expected_paths = build_expected_paths(data)
 
     # Launch background folder creation
-    thread = threading.Thread(target=background_create_folders, args=(expected_paths,))
-    thread.start()
+    record_run(run_id, "write_create_folders")
+    submit_background(background_create_folders, run_id, expected_paths)
 
     logger.info(f"🚀 Kicked off background folder creation for run_id: {run_id}")
     return {
@@ -0,0 +1,36 @@
+import uuid
+from logger import logger
+from Engine.Files.write_supabase_file import write_supabase_file
+from Engine.Runtime.dispatcher import submit_background, QueueFullError
+from Engine.Runtime.run_store import record_run, update_run
+from Engine.Runtime.elasticity import elasticity_rows, elasticity_csv
+
+# --- Write logic ---
+def background_task(run_id: str, raw_data: dict):
+    """
+    Computes the elasticity price change for one report (the payload itself) or a
+    batch (`reports`), and stores the elasticity_csv. Returns the rows (None on failure).
+    """
+    supabase_path = f"Predictive_Report/Ai_Responses/Elasticity_Analysis/{run_id}.csv"
+    update_run(run_id, "running")
+
+    try:
+        rows = elasticity_rows(raw_data.get("reports") or [raw_data])
+        write_supabase_file(path=supabase_path, content=elasticity_csv(rows).encode("utf-8"), content_type="text/csv")
+    except Exception as e:
+        logger.error(f"❌ Elasticity analysis failed: {e}")
+        update_run(run_id, "failed", error=str(e))
+        return None
+
+    update_run(run_id, "completed", artifact_path=supabase_path)
+    return rows
+
+def run_prompt(data):
+    run_id = data.get("run_id") or str(uuid.uuid4())
+    record_run(run_id, "write_elasticity_analysis")
+    try:
+        submit_background(background_task, run_id, data)
+    except QueueFullError as e:
+        update_run(run_id, "failed", error=str(e))
+        raise
+    return {"run_id": run_id}
@@ -1,73 +1,145 @@
 import uuid
 import json
-from openai import OpenAI
 from logger import logger
 from Engine.Files.write_supabase_file import write_supabase_file
+from Engine.Files.prompt_templates import render_prompt
+from Engine.Runtime.llm_gateway import structured_completion, LLM_STREAMING_ENABLED
+from Engine.Runtime.partial_artifacts import open_partial, close_partial
+from Engine.Runtime.run_store import update_run
+from Engine.Runtime.structured_output import Prompt1Thinking, SectionMakeupRepair, render_text
+from Engine.Runtime.makeup_validator import (
+    validate_makeups, renormalise_makeups, apply_repair, log_validation,
+    MAKEUP_VALIDATION_ENABLED, MAKEUP_REPAIR_ATTEMPTS
+)
 
-def safe_escape(value):
-    return str(value).replace("{", "{{").replace("}", "}}")
+# --- MakeUp validation & targeted repair ---
+def repair_section(data: dict, thinking: Prompt1Thinking, number: int, issues: list) -> Prompt1Thinking:
+    """Re-generates one section's MakeUps/Changes with a small prompt instead of re-running Prompt 1."""
+    section = next(section for section in thinking.sections if section.number == number)
+    context = {
+        "Section Title": section.title,
+        "Section Summary": section.summary,
+        "Section MakeUp": section.makeup,
+        **{
+            f"Sub-Section {sub.number}": {
+                "Sub-Section Title": sub.title,
+                "Sub-Section Summary": sub.summary,
+                "Sub-Section MakeUp": sub.makeup,
+                "Sub-Section Change": sub.change
+            }
+            for sub in section.sub_sections
+        }
+    }
+    prompt = render_prompt(
+        "Predictive_Report/prompt_1_makeup_repair.txt",
+        target_variable=data["target_variable"],
+        commodity=data["commodity"],
+        region=data["region"],
+        time_range=data["time_range"],
+        section=render_text({f"Section {number}": context}),
+        section_makeups="\n".join(f"Section {other.number} ({other.title}): {other.makeup}" for other in thinking.sections),
+        issues="\n".join(f"- {issue}" for issue in issues),
+        section_number=number
+    )
+    repair = structured_completion(
+        model="gpt-4o",
+        temperature=0.2,
+        messages=[{"role": "user", "content": prompt}],
+        output_type=SectionMakeupRepair,
+        bypass_cache=bool(data.get("bypass_llm_cache"))
+    )
+    if repair.number != number:
+        raise ValueError(f"repair returned Section {repair.number} for Section {number}")
+    return apply_repair(thinking, repair)
 
-def run_prompt(data):
-    try:
-        run_id = data.get("run_id") or str(uuid.uuid4())
-        data["run_id"] = run_id  # ensure it's injected if missing
+def validate_thinking(data: dict, thinking: Prompt1Thinking):
+    """
+    Checks Prompt 1's makeups/changes; re-generates only the sections that cannot be
+    rescaled, then rescales small drifts. Returns (thinking, first validation report).
+    """
+    validation = first = validate_makeups(thinking)
+    for _ in range(MAKEUP_REPAIR_ATTEMPTS):
+        broken = [section for section in validation["sections"] if section["status"] == "repair"]
+        if not broken:
+            break
+        log_validation(validation)
+        for section in broken:
+            try:
+                thinking = repair_section(data, thinking, section["number"], section["issues"])
+                logger.info(f"🔧 Prompt 1 Section {section['number']} MakeUps re-generated")
+            except Exception as e:
+                logger.error(f"❌ Prompt 1 Section {section['number']} repair failed: {e}")
+        validation = validate_makeups(thinking)
 
-        # Extract and escape all inputs
-        client = safe_escape(data["client"])
-        client_context = safe_escape(data["client_context"])
-        main_question = safe_escape(data["main_question"])
-        question_context = safe_escape(data["question_context"])
-        number_sections = safe_escape(data["number_sections"])
-        number_sub_sections = safe_escape(data["number_sub_sections"])
-        target_variable = safe_escape(data["target_variable"])
-        commodity = safe_escape(data["commodity"])
-        region = safe_escape(data["region"])
-        time_range = safe_escape(data["time_range"])
-        reference_age_range = safe_escape(data["reference_age_range"])
-        today_date = safe_escape(data["today_date"])
+    log_validation(validation)
+    drifted = [section["number"] for section in validation["sections"] if section["status"] != "ok"]
+    if drifted or validation["status"] != "ok":
+        # Anything still unrepaired is rescaled too, with unparseable values counting as zero
+        thinking = renormalise_makeups(thinking, drifted, report=validation["status"] != "ok")
+    return thinking, first
 
-        # Load and populate prompt template
-        with open("Prompts/Predictive_Report/prompt_1_thinking.txt", "r", encoding="utf-8") as f:
-            template = f.read()
+def run_structured(data: dict) -> Prompt1Thinking:
+    """Generates, validates and stores Prompt 1 Thinking; returns the typed output for in-process callers."""
+    run_id = data["run_id"]
+    supabase_path = f"Predictive_Report/Ai_Responses/Prompt_1_Thinking/{run_id}.txt"
 
-        prompt = template.format(
-            client=client,
-            client_context=client_context,
-            main_question=main_question,
-            question_context=question_context,
-            number_sections=number_sections,
-            number_sub_sections=number_sub_sections,
-            target_variable=target_variable,
-            commodity=commodity,
-            region=region,
-            time_range=time_range,
-            reference_age_range=reference_age_range,
-            today_date=today_date
-        )
+    # Render the precompiled prompt template
+    prompt = render_prompt(
+        "Predictive_Report/prompt_1_thinking.txt",
+        client=data["client"],
+        client_context=data["client_context"],
+        main_question=data["main_question"],
+        question_context=data["question_context"],
+        number_sections=data["number_sections"],
+        number_sub_sections=data["number_sub_sections"],
+        target_variable=data["target_variable"],
+        commodity=data["commodity"],
+        region=data["region"],
+        time_range=data["time_range"],
+        reference_age_range=data["reference_age_range"],
+        today_date=data["today_date"]
+    )
+
+    # Optionally stream into an in-memory partial artifact that status and read_* callers can see
+    partial = None
+    if data.get("stream", LLM_STREAMING_ENABLED):
+        partial = open_partial(supabase_path)
+        update_run(run_id, artifact_path=supabase_path)
 
-        # Send prompt to OpenAI
-        client_openai = OpenAI()
-        response = client_openai.chat.completions.create(
+    try:
+        # Request JSON output from OpenAI, validated once into Prompt1Thinking
+        thinking = structured_completion(
             model="gpt-4o",
             temperature=0.2,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            output_type=Prompt1Thinking,
+            bypass_cache=bool(data.get("bypass_llm_cache")),
+            partial=partial
         )
 
-        raw_result = response.choices[0].message.content.strip()
-
-        # Try parsing the response into JSON if possible
-        try:
-            parsed = json.loads(raw_result)
-            formatted = json.dumps(parsed, indent=2)
-        except json.JSONDecodeError:
-            logger.warning("AI response is not valid JSON. Writing raw output.")
-            formatted = raw_result
+        if data.get("validate_makeups", MAKEUP_VALIDATION_ENABLED):
+            thinking, validation = validate_thinking(data, thinking)
+            if any(section["status"] != "ok" for section in validation["sections"]) or validation["status"] != "ok":
+                write_supabase_file(
+                    f"Predictive_Report/Ai_Responses/Prompt_1_Validation/{run_id}.json",
+                    json.dumps(validation, indent=2, ensure_ascii=False)
+                )
 
         # Write AI response to Supabase
-        supabase_path = f"Predictive_Report/Ai_Responses/Prompt_1_Thinking/{run_id}.txt"
-        write_supabase_file(supabase_path, formatted)
-        logger.info(f"✅ AI response written to Supabase: {supabase_path}")
+        write_supabase_file(supabase_path, thinking.to_json_text())
+    finally:
+        if partial is not None:
+            close_partial(supabase_path)
+    update_run(run_id, artifact_path=supabase_path)
+    logger.info(f"✅ AI response written to Supabase: {supabase_path}")
+    return thinking
+
+def run_prompt(data):
+    try:
+        run_id = data.get("run_id") or str(uuid.uuid4())
+        data["run_id"] = run_id  # ensure it's injected if missing
 
+        run_structured(data)
         return {"status": "processing", "run_id": run_id}
 
     except Exception:
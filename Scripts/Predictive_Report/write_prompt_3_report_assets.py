@@ -1,65 +1,62 @@
 import uuid
-import json
-from openai import OpenAI
 from logger import logger
 from Engine.Files.write_supabase_file import write_supabase_file
+from Engine.Files.prompt_templates import render_prompt
+from Engine.Runtime.llm_gateway import structured_completion, LLM_STREAMING_ENABLED
+from Engine.Runtime.partial_artifacts import open_partial, close_partial
+from Engine.Runtime.run_store import update_run
+from Engine.Runtime.structured_output import ReportAssets
 
-def safe_escape(value):
-    return str(value).replace("{", "{{").replace("}", "}}")
+def run_structured(data: dict) -> ReportAssets:
+    """Generates, validates and stores Prompt 3 Report Assets; returns the typed output for in-process callers."""
+    run_id = data["run_id"]
+    supabase_path = f"Predictive_Report/Ai_Responses/Prompt_3_Report_Assets/{run_id}.txt"
 
-def run_prompt(data):
-    try:
-        run_id = data.get("run_id") or str(uuid.uuid4())
-        data["run_id"] = run_id  # ensure it's injected if missing
+    # Render the precompiled prompt template
+    prompt = render_prompt(
+        "Predictive_Report/prompt_3_report_assets.txt",
+        client=data["client"],
+        client_context=data["client_context"],
+        main_question=data["main_question"],
+        question_context=data["question_context"],
+        tone_of_voice=data["tone_of_voice"],
+        special_instructions=data["special_instructions"],
+        prompt_1_thinking=data["prompt_1_thinking"],
+        prompt_2_section_assets=data["prompt_2_section_assets"]
+    )
 
-        # Extract and escape all inputs
-        client = safe_escape(data["client"])
-        client_context = safe_escape(data["client_context"])
-        main_question = safe_escape(data["main_question"])
-        question_context = safe_escape(data["question_context"])
-        tone_of_voice = safe_escape(data["tone_of_voice"])
-        special_instructions = safe_escape(data["special_instructions"])
-        prompt_1_thinking = safe_escape(data["prompt_1_thinking"])
-        prompt_2_section_assets = safe_escape(data["prompt_2_section_assets"])
+    # Optionally stream into an in-memory partial artifact that status and read_* callers can see
+    partial = None
+    if data.get("stream", LLM_STREAMING_ENABLED):
+        partial = open_partial(supabase_path)
+        update_run(run_id, artifact_path=supabase_path)
 
-        # Load and populate prompt template
-        with open("Prompts/Predictive_Report/prompt_3_report_assets.txt", "r", encoding="utf-8") as f:
-            template = f.read()
-
-        prompt = template.format(
-            client=client,
-            client_context=client_context,
-            main_question=main_question,
-            question_context=question_context,
-            tone_of_voice=tone_of_voice,
-            special_instructions=special_instructions,
-            prompt_1_thinking=prompt_1_thinking,
-            prompt_2_section_assets=prompt_2_section_assets
-        )
-
-        # Send prompt to OpenAI
-        client_openai = OpenAI()
-        response = client_openai.chat.completions.create(
+    try:
+        # Request JSON output from OpenAI, validated once into ReportAssets
+        report_assets = structured_completion(
             model="gpt-4o",
             temperature=0.2,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            output_type=ReportAssets,
+            bypass_cache=bool(data.get("bypass_llm_cache")),
+            partial=partial
         )
 
-        raw_result = response.choices[0].message.content.strip()
-
-        # Try parsing the response into JSON if possible
-        try:
-            parsed = json.loads(raw_result)
-            formatted = json.dumps(parsed, indent=2)
-        except json.JSONDecodeError:
-            logger.warning("AI response is not valid JSON. Writing raw output.")
-            formatted = raw_result
-
         # Write AI response to Supabase
-        supabase_path = f"Predictive_Report/Ai_Responses/Prompt_3_Report_Assets/{run_id}.txt"
-        write_supabase_file(supabase_path, formatted)
-        logger.info(f"✅ AI response written to Supabase: {supabase_path}")
+        write_supabase_file(supabase_path, report_assets.to_json_text())
+    finally:
+        if partial is not None:
+            close_partial(supabase_path)
+    update_run(run_id, artifact_path=supabase_path)
+    logger.info(f"✅ AI response written to Supabase: {supabase_path}")
+    return report_assets
+
+def run_prompt(data):
+    try:
+        run_id = data.get("run_id") or str(uuid.uuid4())
+        data["run_id"] = run_id  # ensure it's injected if missing
 
+        run_structured(data)
         return {"status": "processing", "run_id": run_id}
 
     except Exception:
@@ -1,9 +1,22 @@
 from flask import Flask, request, jsonify
 import importlib
-import threading
 import os
+import time
+import uuid
 from logger import logger
+from Engine.Runtime.dispatcher import blocking_lane, background_lane, QueueFullError
+from Engine.Runtime.run_store import record_run, update_run, get_run
+from Engine.Runtime.llm_cache import cache_stats
+from Engine.Runtime.partial_artifacts import get_partial
+from Engine.Files.prompt_templates import load_prompt_templates
+from Engine.Files.british_english import get_converter
+from Engine.Files.document_loader import parse_stats
+from Engine.Files.artifact_cache import artifact_cache_stats
+from Engine.Files.write_receipt import write_verify_stats
+from Engine.Files.content_index import dedup_stats
+from Engine.Files.artifact_compression import compression_stats
 from Scripts.Predictive_Report.ingest_typeform import process_typeform_submission
+from Scripts.Predictive_Report import what_if
 
 app = Flask(__name__)
 
@@ -14,6 +27,10 @@ if not RENDER_ENV.startswith("/"):
 
 logger.info(f"📡 Flask binding RENDER_ENV route: {RENDER_ENV}")
 
+# --- PROMPT TEMPLATES & SPELLING DICTIONARY (compiled once; a broken template fails the boot) ---
+load_prompt_templates()
+get_converter()
+
 # --- PROMPT ROUTING CONFIG ---
 BLOCKING_PROMPTS = {
     "website",
@@ -22,6 +39,7 @@ BLOCKING_PROMPTS = {
     "read_question_context",
     "read_prompt_1_thinking",
     "write_change_effect_maths",
+    "write_elasticity_analysis",
     "read_change_effect_maths",
     "read_prompt_2_section_assets",
     "read_prompt_3_report_assets",
@@ -47,6 +65,7 @@ PROMPT_MODULES = {
     "read_question_context": "Scripts.Predictive_Report.read_question_context",
     "write_prompt_1_thinking": "Scripts.Predictive_Report.write_prompt_1_thinking",
     "write_change_effect_maths": "Scripts.Predictive_Report.write_change_effect_maths",
+    "write_elasticity_analysis": "Scripts.Predictive_Report.write_elasticity_analysis",
     "read_change_effect_maths": "Scripts.Predictive_Report.read_change_effect_maths",
     "read_prompt_1_thinking": "Scripts.Predictive_Report.read_prompt_1_thinking",
     "write_prompt_2_section_assets": "Scripts.Predictive_Report.write_prompt_2_section_assets",
@@ -67,9 +86,24 @@ PROMPT_MODULES = {
     "write_create_folders": "Scripts.Predictive_Report.write_create_folders",
     "read_create_folders": "Scripts.Predictive_Report.read_create_folders",
     "move_files_1": "Scripts.Predictive_Report.move_files_1",
-    "move_files_2": "Scripts.Predictive_Report.move_files_2"
+    "move_files_2": "Scripts.Predictive_Report.move_files_2",
+    "run_report": "Scripts.Predictive_Report.run_report"
 }
 
+# --- DISPATCH HELPERS ---
+def busy_response(error: QueueFullError):
+    logger.warning(f"🚦 Rejecting prompt: {error}")
+    response = jsonify({"error": str(error), "lane": error.lane, "retry_after": error.retry_after})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+def with_queue_wait(response, future):
+    queue_wait = future.timing.get("queue_wait_seconds")
+    if queue_wait is not None:
+        response.headers["X-Queue-Wait-Ms"] = str(int(queue_wait * 1000))
+    return response
+
 # --- ROUTES ---
 @app.route(RENDER_ENV, methods=["POST"])
 def dynamic_ingest_typeform():
@@ -99,32 +133,125 @@ def dispatch_prompt():
         logger.info(f"Dispatching prompt asynchronously: {prompt_name}")
         result_container = {}
 
-        import uuid
         if prompt_name not in BLOCKING_PROMPTS:
             run_id = data.get("run_id") or str(uuid.uuid4())
             data["run_id"] = run_id
             result_container["run_id"] = run_id
+            record_run(run_id, prompt_name)
+
+        tracked_run_id = result_container.get("run_id")
+        enqueued_at = time.perf_counter()
 
         def run_and_capture():
+            if tracked_run_id:
+                update_run(tracked_run_id, "running", queue_wait_seconds=round(time.perf_counter() - enqueued_at, 3))
             try:
-                result = module.run_prompt(data)
-                result_container.update(result or {})
-            except Exception:
+                result = module.run_prompt(data) or {}
+                result_container.update(result)
+                if tracked_run_id:
+                    if result.get("status") == "error":
+                        update_run(tracked_run_id, "failed", error=result.get("message"))
+                    else:
+                        update_run(tracked_run_id, "completed")
+            except QueueFullError as e:
+                # a blocking prompt hands this back as a 429; a tracked run can't, so record it first
+                if tracked_run_id:
+                    update_run(tracked_run_id, "failed", error=str(e))
+                raise
+            except Exception as e:
                 logger.exception("Background prompt execution failed.")
+                if tracked_run_id:
+                    update_run(tracked_run_id, "failed", error=str(e))
 
-        thread = threading.Thread(target=run_and_capture)
-        thread.start()
+        lane = blocking_lane if prompt_name in BLOCKING_PROMPTS else background_lane
+        try:
+            future = lane.submit(run_and_capture)
+            if prompt_name in BLOCKING_PROMPTS:
+                future.result()
+        except QueueFullError as e:
+            if tracked_run_id:
+                update_run(tracked_run_id, "failed", error=str(e))
+            return busy_response(e)
 
         if prompt_name in BLOCKING_PROMPTS:
-            thread.join()
-            return jsonify(result_container)
+            return with_queue_wait(jsonify(result_container), future)
 
         return jsonify({
             "status": "processing",
             "message": "Script launched, run_id will be available via follow-up.",
-            "run_id": result_container.get("run_id")
+            "run_id": result_container.get("run_id"),
+            "queue_depth": background_lane.depth
         })
 
     except Exception as e:
         logger.exception("Error in dispatch_prompt")
         return jsonify({"error": str(e)}), 500
+
+
+@app.route("/runs/<run_id>", methods=["GET"])
+def run_status(run_id):
+    try:
+        run = get_run(run_id)
+        if not run:
+            return jsonify({"error": f"Unknown run_id: {run_id}"}), 404
+        partial = get_partial(run["artifact_path"]) if run.get("artifact_path") else None
+        if partial is not None:
+            run["partial"] = partial.snapshot()
+        return jsonify(run)
+    except Exception as e:
+        logger.exception("Error in run_status")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/runs/<run_id>/partial", methods=["GET"])
+def run_partial(run_id):
+    run = get_run(run_id)
+    if not run:
+        return jsonify({"error": f"Unknown run_id: {run_id}"}), 404
+    partial = get_partial(run["artifact_path"]) if run.get("artifact_path") else None
+    if partial is None:
+        return jsonify({"error": f"No streaming artifact for run_id: {run_id}", "stage": run["stage"]}), 404
+    return jsonify(partial.snapshot(include_content=True))
+
+
+@app.route("/runs/<run_id>/what-if", methods=["POST"])
+def run_what_if(run_id):
+    data = {**request.get_json(force=True), "run_id": run_id}
+    try:
+        future = blocking_lane.submit(what_if.run_prompt, data)
+        result = future.result()
+    except QueueFullError as e:
+        return busy_response(e)
+    if result["status"] == "error":
+        return jsonify(result), 400
+    return with_queue_wait(jsonify(result), future)
+
+
+@app.route("/stats/llm-cache", methods=["GET"])
+def llm_cache_stats():
+    return jsonify(cache_stats())
+
+
+@app.route("/stats/parse", methods=["GET"])
+def parse_timing_stats():
+    return jsonify(parse_stats())
+
+
+@app.route("/stats/artifact-cache", methods=["GET"])
+def artifact_cache_statistics():
+    return jsonify(artifact_cache_stats())
+
+
+@app.route("/stats/write-verify", methods=["GET"])
+def write_verify_statistics():
+    return jsonify(write_verify_stats())
+
+
+@app.route("/stats/dedup", methods=["GET"])
+def dedup_statistics():
+    return jsonify(dedup_stats())
+
+
+@app.route("/stats/compression", methods=["GET"])
+def compression_statistics():
+    return jsonify(compression_stats())
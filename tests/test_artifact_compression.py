@@ -0,0 +1,33 @@
+import gzip
+import pytest
+from Engine.Files import artifact_compression
+from Engine.Files.artifact_compression import encode_artifact, decode_artifact, ARTIFACT_COMPRESSION_MIN_BYTES
+
+PATH = "Predictive_Report/Ai_Responses/Combine/run.txt"
+TEXT = ("Section Title:\nRegional demand rose through the year.\n" * 2000).encode("utf-8")
+
+def test_legacy_plain_text_objects_come_back_unchanged():
+    for data in (TEXT, b"", "Café – naïve".encode("utf-8")):
+        assert decode_artifact(PATH, data) == (data, None, 0.0)
+
+def test_objects_outside_the_artifact_prefixes_are_never_sniffed():
+    data = gzip.compress(TEXT)
+    assert decode_artifact("Logos/run/logo.png", data)[0] == data
+    assert decode_artifact("Predictive_Report/Ai_Responses/Combine/run.png", data)[0] == data
+
+@pytest.mark.parametrize("algorithm", ["gzip", "zstd"])
+def test_encode_decode_round_trip(monkeypatch, algorithm):
+    if algorithm == "zstd":
+        pytest.importorskip("zstandard")
+    monkeypatch.setattr(artifact_compression, "ARTIFACT_COMPRESSION", algorithm)
+    stored, encoding, _ = encode_artifact(PATH, TEXT)
+    assert encoding == algorithm and len(stored) < len(TEXT)
+    assert encode_artifact(PATH, TEXT)[0] == stored  # deterministic, so dedup still matches
+    assert decode_artifact(PATH, stored)[:2] == (TEXT, algorithm)
+
+def test_small_or_off_artifacts_are_stored_plain(monkeypatch):
+    monkeypatch.setattr(artifact_compression, "ARTIFACT_COMPRESSION", "gzip")
+    small = TEXT[:ARTIFACT_COMPRESSION_MIN_BYTES - 1]
+    assert encode_artifact(PATH, small)[:2] == (small, None)
+    monkeypatch.setattr(artifact_compression, "ARTIFACT_COMPRESSION", "off")
+    assert encode_artifact(PATH, TEXT)[:2] == (TEXT, None)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from dataclasses import replace
+from Engine.Runtime.structured_output import Prompt1Thinking, ThinkingSection, ThinkingSubSection
+from Engine.Runtime.change_effect import compute_change_effect, format_tenths, format_tenths_integer, divide_half_up
+
+def thinking(section_makeup: str, subs: list) -> Prompt1Thinking:
+    return Prompt1Thinking(sections=[ThinkingSection(
+        number=1, title="Section 1", summary="", makeup=section_makeup,
+        sub_sections=[
+            ThinkingSubSection(number=n, title=f"Sub-Section {n}", summary="", makeup=makeup, change=change)
+            for n, (makeup, change) in enumerate(subs, start=1)
+        ]
+    )])
+
+def figures(output: Prompt1Thinking) -> list:
+    """The report change, then each section's and sub-section's makeup / change / effect."""
+    lines = [output.report_change]
+    for section in output.sections:
+        lines.append(f"{section.makeup} / {section.change} / {section.effect}")
+        lines += [f"  {sub.makeup} / {sub.change} / {sub.effect}" for sub in section.sub_sections]
+    return lines
+
+# Expected figures come from the pre-vectorisation write_change_effect_maths.build_structured_output
+@pytest.mark.parametrize("sections, expected", [
+    (  # signed zero products
+        [("33.35%", [("0.0%", "-3%"), ("-0.0%", "2%"), ("100%", "0%")])],
+        ["0.0%", "33% / 0.0% / 0.0%", "  0% / -3.0% / -0.0%", "  0% / 2.0% / -0.0%", "  100% / 0.0% / 0.0%"],
+    ),
+    (  # half-up / half-even boundaries
+        [("33.35%", [("12.25%", "2.5%"), ("12.35%", "-2.5%"), ("75.4%", "1.5%")])],
+        ["0.5%", "33% / 1.5% / 0.5%", "  12% / 2.0% / 0.2%", "  12% / -2.0% / -0.2%", "  75% / 2.0% / 1.5%"],
+    ),
+    (  # values that fail to parse count as zero, makeup included
+        [("33.35%", [("abc", "5%"), ("50%", "n/a"), ("50%", "4%")])],
+        ["0.7%", "33% / 2.0% / 0.7%", "  0% / 0.0% / 0.0%", "  0% / 0.0% / 0.0%", "  50% / 4.0% / 2.0%"],
+    ),
+    (
+        [
+            ("30.75%", [("100%", "-2.95%"), ("0.3%", "-3.72%")]),
+            ("45%", [("26%", "-0.2%"), ("74.24%", "+4.2%")]),
+            ("25%", [("36.76%", "-11.05%"), ("63.2%", "-1.41%")]),
+        ],
+        [
+            "-0.7%",
+            "31% / -3.0% / -0.9%", "  100% / -3.0% / -3.0%", "  0% / -4.0% / -0.0%",
+            "45% / 3.0% / 1.4%", "  26% / 0.0% / 0.0%", "  74% / 4.0% / 3.0%",
+            "25% / -4.6% / -1.2%", "  37% / -11.0% / -4.0%", "  63% / -1.0% / -0.6%",
+        ],
+    ),
+])
+def test_matches_the_legacy_decimal_output(sections, expected):
+    sample = Prompt1Thinking(sections=[
+        replace(thinking(makeup, subs).sections[0], number=number, title=f"Section {number}")
+        for number, (makeup, subs) in enumerate(sections, start=1)
+    ])
+    assert figures(compute_change_effect(sample)) == expected
+
+def test_unparseable_values_survive_from_json_and_count_as_zero():
+    sample = thinking("33.35%", [("abc", "5%"), ("50%", "n/a"), ("50%", "4%")])
+    parsed = Prompt1Thinking.from_json(sample.to_json())
+    assert [(sub.makeup, sub.change) for sub in parsed.sections[0].sub_sections] == [("abc", "5%"), ("50%", "n/a"), ("50%", "4%")]
+    output, zeroed = compute_change_effect(parsed), compute_change_effect(thinking("33.35%", [("0%", "5%"), ("50%", "0%"), ("50%", "4%")]))
+    assert output.report_change == zeroed.report_change
+    assert [sub.effect for sub in output.sections[0].sub_sections] == [sub.effect for sub in zeroed.sections[0].sub_sections]
+
+def test_fixed_point_helpers():
+    assert format_tenths(123) == "12.3%"
+    assert format_tenths(-5) == "-0.5%"
+    assert format_tenths(0, negative=True) == "-0.0%"
+    assert [format_tenths_integer(tenths) for tenths in (125, 135, -125, 124)] == ["12%", "14%", "-12%", "12%"]
+    assert divide_half_up(np.array([150, -150, 149]), 100).tolist() == [2, -2, 1]
@@ -0,0 +1,48 @@
+import os
+import pytest
+from Engine.Files import content_index
+from Engine.Files.content_index import ContentIndex, deduplicate_upload, remember_content, CONTENT_DEDUP_COPY_MIN_BYTES
+from Engine.Files.local_storage import LocalStorageClient
+from Engine.Files.write_receipt import content_hash
+
+DATA = os.urandom(CONTENT_DEDUP_COPY_MIN_BYTES + 1)
+DIGEST = content_hash(DATA)
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(content_index, "_index", ContentIndex())
+    monkeypatch.setattr(content_index, "CONTENT_DEDUP_ENABLED", True)
+    return LocalStorageClient(str(tmp_path))
+
+def stored(client, key: str, data: bytes = DATA):
+    client.put(key, data)
+    remember_content(key, content_hash(data), len(data), "image/png")
+
+def test_repeat_upload_is_skipped_when_storage_confirms_it(client):
+    stored(client, "root/a.png")
+    assert deduplicate_upload(client, "root/a.png", DIGEST, len(DATA), "image/png") == "skipped"
+
+def test_repeat_upload_goes_ahead_when_the_object_changed_elsewhere(client):
+    stored(client, "root/a.png")
+    os.remove(client.path_for("root/a.png"))  # deleted by another process
+    assert deduplicate_upload(client, "root/a.png", DIGEST, len(DATA), "image/png") is None
+    with open(client.path_for("root/a.png"), "wb") as f:
+        f.write(b"rewritten")
+    assert deduplicate_upload(client, "root/a.png", DIGEST, len(DATA), "image/png") is None
+
+def test_identical_content_is_copied_server_side(client):
+    stored(client, "root/run1/a.png")
+    assert deduplicate_upload(client, "root/run2/a.png", DIGEST, len(DATA), "image/png") == "copied"
+    assert client.get("root/run2/a.png").content == DATA
+    # A different content type is not a match
+    assert deduplicate_upload(client, "root/run3/a.png", DIGEST, len(DATA), "text/plain") is None
+
+def test_small_objects_always_upload(client):
+    small = b"hi"
+    stored(client, "root/x.txt", small)
+    assert deduplicate_upload(client, "root/x.txt", content_hash(small), len(small), "image/png") is None
+
+def test_disabled_dedup_never_skips(client, monkeypatch):
+    monkeypatch.setattr(content_index, "CONTENT_DEDUP_ENABLED", False)
+    stored(client, "root/a.png")
+    assert deduplicate_upload(client, "root/a.png", DIGEST, len(DATA), "image/png") is None
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from dataclasses import replace
+from Engine.Runtime.change_effect import compute_change_effect
+from Engine.Runtime.effect_tree import EffectTree
+from Engine.Runtime.report_model import Report, Section, SubSection, TableRow
+from Benchmarks.change_effect import sample_thinking
+from Scripts.Predictive_Report import what_if
+
+def edited(thinking, section: int, sub_section: int, **values):
+    sections = list(thinking.sections)
+    target = sections[section - 1]
+    sections[section - 1] = replace(target, sub_sections=[
+        replace(sub, **values) if sub.number == sub_section else sub for sub in target.sub_sections
+    ])
+    return replace(thinking, sections=sections)
+
+def report_for(output) -> Report:
+    return Report(
+        report_change=output.report_change, report_change_title="Total",
+        report_table=[TableRow(title=s.title, makeup=s.makeup, change=s.change, effect=s.effect) for s in output.sections],
+        sections=[
+            Section(
+                number=s.number, title=s.title, makeup=s.makeup, change=s.change, effect=s.effect,
+                table=[TableRow(title=u.title, makeup=u.makeup, change=u.change, effect=u.effect) for u in s.sub_sections],
+                sub_sections=[SubSection(number=u.number, title=u.title, makeup=u.makeup, change=u.change, effect=u.effect) for u in s.sub_sections]
+            )
+            for s in output.sections
+        ]
+    )
+
+def test_deltas_match_a_full_recompute():
+    rng = np.random.default_rng(7)
+    thinking = sample_thinking(6, 5, rng)
+    tree = EffectTree(thinking, report=report_for(compute_change_effect(thinking)))
+    for _ in range(200):
+        section, sub_section = int(rng.integers(1, 7)), int(rng.integers(1, 6))
+        values = {}
+        if rng.random() < 0.6:
+            values["makeup"] = f"{rng.uniform(0, 40):.2f}%"
+        if not values or rng.random() < 0.5:
+            values["change"] = f"{rng.integers(-20, 20)}%"
+        result = tree.apply_delta(section, sub_section, **values)
+        thinking = edited(thinking, section, sub_section, **values)
+        full = compute_change_effect(thinking)
+        assert tree.output == full
+        assert result["report_change"] == full.report_change
+    # The Report the CSVs are written from carries the same values
+    assert tree.report == report_for(tree.output)
+
+def test_bad_deltas_leave_the_tree_unchanged():
+    thinking = sample_thinking(2, 2, np.random.default_rng(0))
+    tree = EffectTree(thinking)
+    before = tree.output
+    for args, values in [((1, 9), {"change": "1%"}), ((1, 1), {}), ((1, 1), {"makeup": "abc"}), (("x", 1), {"change": "1%"})]:
+        with pytest.raises(ValueError):
+            tree.apply_delta(*args, **values)
+    assert tree.output == before and tree.revision == 0
+
+def test_checkpoint_round_trip():
+    thinking = sample_thinking(3, 3, np.random.default_rng(2))
+    tree = EffectTree(thinking, report=report_for(compute_change_effect(thinking)), artifacts={"csv_content": "Out/c.csv"})
+    tree.apply_delta(2, 1, change="7%")
+    restored = EffectTree.from_checkpoint(tree.to_checkpoint())
+    assert (restored.output, restored.report, restored.artifacts, restored.revision) == (tree.output, tree.report, tree.artifacts, 1)
+
+def test_only_delivered_artifacts_are_recorded(monkeypatch):
+    monkeypatch.setattr(what_if, "SUPABASE_ROOT_FOLDER", "root")
+    staged = {"csv_content": "Predictive_Report/Ai_Responses/csv_Content/c.csv", "report_table": "Predictive_Report/Ai_Responses/Tables/r.csv"}
+    delivered = {"root/Predictive_Report/Ai_Responses/csv_Content/c.csv": "root/Client/InDesign_Import_csv/csv_content_c_.csv"}
+    assert what_if.delivered_paths(staged, delivered) == {"csv_content": "Client/InDesign_Import_csv/csv_content_c_.csv"}
+
+def test_persist_rewrites_only_delivered_paths(monkeypatch):
+    written = {}
+    def write(path, content, content_type=None):
+        written[path] = content
+    for module in (what_if, what_if.csv_content, what_if.format_combine, what_if.report_and_section_table_csv):
+        monkeypatch.setattr(module, "write_supabase_file", write)
+
+    thinking = sample_thinking(3, 2, np.random.default_rng(4))
+    tree = EffectTree(thinking, report=report_for(compute_change_effect(thinking)), artifacts={
+        "csv_content": "Client/csv/c.csv", "report_table": "Client/Tables/r.csv", "section_table_2": "Client/Tables/s2.csv",
+        "format_combine": "Client/Report/f.txt"
+    })
+    tree.apply_delta(2, 1, change="9%")
+    what_if.persist("run", tree)
+    assert sorted(written) == [
+        "Client/Report/f.txt", "Client/Tables/r.csv", "Client/Tables/s2.csv", "Client/csv/c.csv", f"{what_if.CHECKPOINT_DIR}/run.json"
+    ]
+    assert written["Client/Report/f.txt"] == what_if.format_combine.render_formatted_text(tree.report)
+    assert "Sub-Section Change: 9.0%" in written["Client/Report/f.txt"]
+
+    written.clear()
+    what_if.persist("run", tree)  # nothing new to write
+    assert written == {}
@@ -0,0 +1,18 @@
+import numpy as np
+from Engine.Runtime.elasticity import elasticity_rows
+from Benchmarks.elasticity import sample_reports
+
+def row(supply: str, demand: str) -> dict:
+    return elasticity_rows([{"supply_percentage": supply, "demand_percentage": demand}])[0]
+
+def test_price_change_uses_unrounded_supply_and_demand():
+    result = row("-0.25%", "0.05%")
+    assert (result["supply_change"], result["demand_change"], result["elasticity_change"]) == ("-0.25%", "0.05%", "0.4%")
+    assert "[0.3% / 0.7] = 0.43%, rounded to 0.4%" in result["elasticity_calculation"]
+
+def test_calculation_text():
+    assert row("-0.2%", "2.7%")["elasticity_calculation"].endswith("= [2.9% / 0.7] = 4.14%, rounded to 4.1%.")
+
+def test_batched_rows_match_per_report_rows():
+    reports = sample_reports(50, np.random.default_rng(1))
+    assert elasticity_rows(reports) == [row for report in reports for row in elasticity_rows([report])]
@@ -0,0 +1,28 @@
+import os
+from Engine.Files.local_storage import LocalStorageClient
+
+def test_move_and_copy_refuse_an_existing_destination(tmp_path):
+    client = LocalStorageClient(str(tmp_path))
+    client.put("a/x.txt", b"new")
+    client.put("a/y.txt", b"old")
+    for transfer in (client.move, client.copy):
+        response = transfer("a/x.txt", "a/y.txt")
+        assert response.status_code == 400 and response.json()["error"] == "Duplicate"
+    assert client.get("a/y.txt").content == b"old"
+
+def test_move_object_falls_back_to_an_overwrite(tmp_path):
+    client = LocalStorageClient(str(tmp_path))
+    client.put("a/x.txt", b"new")
+    client.put("a/y.txt", b"old")
+    assert client.copy_object("a/x.txt", "a/y.txt")
+    client.put("a/y.txt", b"old")
+    assert client.move_object("a/x.txt", "a/y.txt")
+    assert client.get("a/y.txt").content == b"new"
+    assert not os.path.exists(client.path_for("a/x.txt"))
+
+def test_reads_return_bytes_unless_streamed(tmp_path):
+    client = LocalStorageClient(str(tmp_path), mmap_bytes=4)
+    client.put("a/x.txt", b"hello world")
+    assert client.get("a/x.txt").content == b"hello world"
+    with client.get("a/x.txt", stream=True) as response:
+        assert b"".join(bytes(chunk) for chunk in response.iter_content(4)) == b"hello world"
@@ -0,0 +1,50 @@
+import numpy as np
+from Engine.Runtime.structured_output import Prompt1Thinking, ThinkingSection, ThinkingSubSection
+from Engine.Runtime.makeup_validator import largest_remainder, validate_makeups, renormalise_makeups
+
+def thinking(*sections) -> Prompt1Thinking:
+    return Prompt1Thinking(sections=[
+        ThinkingSection(
+            number=number, title=f"Section {number}", summary="", makeup=makeup,
+            sub_sections=[
+                ThinkingSubSection(number=n, title=f"Sub-Section {n}", summary="", makeup=sub_makeup, change=change)
+                for n, (sub_makeup, change) in enumerate(subs, start=1)
+            ]
+        )
+        for number, (makeup, subs) in enumerate(sections, start=1)
+    ])
+
+def test_largest_remainder_sums_to_target_per_group():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        groups = np.sort(rng.integers(0, 5, 30))
+        values = rng.uniform(0, 50, 30)
+        result = largest_remainder(values, groups, 5)
+        totals = np.bincount(groups, weights=result, minlength=5)
+        assert all(total == 100 for total, count in zip(totals, np.bincount(groups, minlength=5)) if count)
+        # Never more than one unit away from the exact share
+        exact = values * 100 / np.bincount(groups, weights=values, minlength=5)[groups]
+        assert np.all(np.abs(result - exact) < 1)
+
+def test_largest_remainder_ties_go_to_the_earlier_value_and_zero_groups_stay_zero():
+    assert largest_remainder([1, 1, 1], [0, 0, 0], 1).tolist() == [34, 33, 33]
+    assert largest_remainder([0, 0, 2, 2], [0, 0, 1, 1], 2).tolist() == [0, 0, 50, 50]
+
+def test_validate_makeups_statuses():
+    validation = validate_makeups(thinking(
+        ("40%", [("60%", "2%"), ("40%", "-1%")]),        # ok
+        ("35%", [("50%", "1%"), ("52%", "1%")]),         # 102%: renormalise
+        ("25%", [("80%", "1%"), ("abc", "1%")]),         # unparseable: repair
+        ("10%", [("50%", "500%"), ("50%", "1%")]),       # change beyond the limit: repair
+    ))
+    assert [section["status"] for section in validation["sections"]] == ["ok", "renormalise", "repair", "repair"]
+    assert validation["sections"][1]["sub_section_total"] == 102
+    assert validation["status"] == "renormalise" and validation["section_total"] == 110
+
+def test_renormalise_only_touches_chosen_sections():
+    original = thinking(("50%", [("50%", "1%"), ("52%", "1%")]), ("60%", [("30%", "1%"), ("30%", "1%")]))
+    fixed = renormalise_makeups(original, section_numbers=[1])
+    assert [sub.makeup for sub in fixed.sections[0].sub_sections] == ["49%", "51%"]
+    assert fixed.sections[1].sub_sections == original.sections[1].sub_sections
+    assert [section.makeup for section in fixed.sections] == ["45%", "55%"]
+    assert validate_makeups(fixed)["sections"][0]["status"] == "ok"
@@ -0,0 +1,38 @@
+import json
+from Engine.Runtime.partial_artifacts import PartialArtifact
+
+SECTIONS = {
+    "Section 1": {"Section Title": "Demand {rising}", "Sub-Sections": [{"Title": "A \"quoted\" ] bracket"}]},
+    "Section \"2\"": {"Section Title": "Back\\slash", "Notes": ["}", "{"]},
+}
+
+def feed_in_chunks(text: str, size: int) -> PartialArtifact:
+    partial = PartialArtifact("Predictive_Report/Ai_Responses/Test/run.txt")
+    for start in range(0, len(text), size):
+        partial.feed(text[start:start + size])
+    return partial
+
+def test_blocks_complete_as_their_closing_brace_lands():
+    text = json.dumps(SECTIONS, indent=2)
+    partial = PartialArtifact("path")
+    cut = text.index("\n  },") + len("\n  }")
+    partial.feed(text[:cut - 1])
+    assert partial.sections == {}
+    partial.feed(text[cut - 1:cut])
+    assert list(partial.sections) == ["Section 1"]
+    partial.feed(text[cut:])
+    assert partial.sections == SECTIONS
+    assert partial.text == text
+
+def test_braces_and_quotes_inside_strings_are_ignored_for_any_chunking():
+    text = json.dumps(SECTIONS)
+    for size in (1, 2, 3, 7, len(text)):
+        assert feed_in_chunks(text, size).sections == SECTIONS
+
+def test_reset_clears_scanner_state():
+    partial = PartialArtifact("path")
+    partial.feed('{"Section 1": {"Title": "half')
+    partial.reset()
+    partial.feed(json.dumps({"Section 2": {"Title": "x"}}))
+    assert partial.sections == {"Section 2": {"Title": "x"}}
+    assert partial.snapshot()["sections_complete"] == ["Section 2"]
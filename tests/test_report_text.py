@@ -0,0 +1,91 @@
+import pytest
+from Engine.Runtime.report_text import scan_report_text, parse_report_text
+from Scripts.Predictive_Report.csv_content import SECTION_COLUMNS, report_rows
+from Scripts.Predictive_Report.format_combine import render_formatted_text
+from Scripts.Predictive_Report import combine, format_combine
+from Scripts.Predictive_Report.combine import render_combined_text
+from Benchmarks.csv_content import sample_format_combine, legacy_parse_sections_and_subsections, strip_excluded_blocks
+
+@pytest.mark.parametrize("sections, sub_sections", [(1, 1), (3, 4), (12, 10)])
+def test_rows_match_the_legacy_csv_content_parser(sections, sub_sections):
+    text = sample_format_combine(sections, sub_sections)
+    rows = [{column: row[column] for column in SECTION_COLUMNS} for row in report_rows(parse_report_text(text))]
+    assert rows == legacy_parse_sections_and_subsections(strip_excluded_blocks(text))
+
+def test_formatted_and_combined_text_round_trip():
+    report = parse_report_text(sample_format_combine(3, 2))
+    assert parse_report_text(render_formatted_text(report)) == report
+    assert parse_report_text(render_combined_text(report)).sections == report.sections
+
+def test_prompt_output_blocks_merge_by_section_number():
+    text = "\n".join([
+        "Section 2:", "Section Title: Costs", "Sub-Section 1:", "Sub-Section Title: Energy",
+        "Section 1:", "Section Title: Demand",
+        "Section 2:", "Section Theme: Pressure", "Sub-Section 1:", "Sub-Section Summary: Prices rose.", "They kept rising.",
+    ])
+    report = parse_report_text(text)
+    assert [(section.number, section.title) for section in report.sections] == [(1, "Demand"), (2, "Costs")]
+    costs = report.sections[1]
+    assert costs.theme == "Pressure"
+    assert [(sub.title, sub.summary) for sub in costs.sub_sections] == [("Energy", "Prices rose.\nThey kept rising.")]
+
+def test_prose_starting_with_a_header_label_does_not_open_a_field():
+    events = list(scan_report_text("Executive Summary:\nReport: the market grew.\nClient:\nAcme"))
+    assert events == [("Executive Summary", "Report: the market grew."), ("Client", "Acme")]
+
+def test_pipe_joined_table_fields_split_into_separate_events():
+    events = list(scan_report_text("Section Makeup: 10% | Section Change: +1% | Section Effect: +0.1%"))
+    assert events == [("Section Makeup", "10%"), ("Section Change", "+1%"), ("Section Effect", "+0.1%")]
+
+# Zapier prompt text with the paragraph breaks inside flattened JSON values still escaped
+ESCAPED_REPORT_ASSETS = (
+    "Report Title: The Colour Report\nReport Sub-Title: Five Years Out\n"
+    "Executive Summary: Para one about color.\\n\\nPara two.\nKey Findings: - One\nCall to Action: Act now.\n"
+    "Conclusion: Demand holds.\\n\\nSupply tightens.\nRecommendations: - Plan"
+)
+ESCAPED_THINKING = (
+    "Section 1:\nSection Title: Demand\nSection Summary: Prices rose.\nSection MakeUp: 100%\n"
+    "Sub-Section 1:\nSub-Section Title: Energy\nSub-Section MakeUp: 100%\nSub-Section Change: 2%\n"
+)
+# produced by the pre-report-model combine.py and format_combine.py on the inputs above
+LEGACY_COMBINE = (
+    'Report Title:\nThe Colour Report\nReport Sub-Title:\nFive Years Out\nExecutive Summary:\nPara one about color.\n\n'
+    'Para two.\nKey Findings:\n- One\nCall to Action:\nAct now.\n\n'
+    'Section #: 1\nSection Title: Demand\nSection Summary: Prices rose.\nSection Makeup: 100%\n\n'
+    'Sub-Section #: 1.1\nSub-Section Title: Energy\nSub-Section Makeup: 100%\nSub-Section Change: 2%\n\n'
+    'Conclusion:\nDemand holds.\n\n'
+    'Supply tightens.\nRecommendations:\n- Plan'
+)
+LEGACY_FORMAT_COMBINE = (
+    'Client:\nAcme Ltd\n\n'
+    'Website:\nacme.example\n\n'
+    'About Client:\nAbout us.\n\n'
+    'Main Question:\nWhat Next\n\n'
+    'Report:\nOutlook\n\n'
+    'Year:\n2025\n\n'
+    'Report Title:\nThe Colour Report\n\n'
+    'Report Sub-Title:\nFive Years Out\n\n'
+    'Executive Summary:\nPara one about colour.\n\n'
+    'Para two.\n\n'
+    'Key Findings:\n- One\n\n'
+    'Call to Action:\nAct now.\n\n'
+    'Section #: 1\n\n'
+    'Section Title:\nDemand\n\n'
+    'Section Summary:\nPrices rose.\nSection Makeup: 100%\n\n'
+    'Sub-Section #: 1.1\n\n'
+    'Sub-Section Title:\nEnergy\nSub-Section Makeup: 100%\nSub-Section Change: 2%\n\n'
+    'Conclusion:\nDemand holds.\n\n'
+    'Supply tightens.\n\n'
+    'Recommendations:\n- Plan'
+)
+
+def test_escaped_paragraphs_match_the_legacy_combine_and_format_combine(monkeypatch):
+    for module in (combine, format_combine):
+        monkeypatch.setattr(module, "write_supabase_file", lambda path, content, content_type=None: None)
+    combined = combine.run_prompt({"prompt_1_thinking": ESCAPED_THINKING, "prompt_3_report_assets": ESCAPED_REPORT_ASSETS})["structured_output"]
+    assert combined == LEGACY_COMBINE
+    formatted = format_combine.run_prompt({
+        "client": "acme ltd", "client_website_url": "acme.example", "client_context": "about us.",
+        "main_question": "what next", "report": "outlook", "year": "2025", "combine": combined,
+    })["formatted_content"]
+    assert formatted == LEGACY_FORMAT_COMBINE